@@ -3,11 +3,15 @@ from agents.discharge_agent import DischargeAgent
 from agents.id_agent import IDAgent
 from agents.pharmacy_agent import PharmacyAgent
 from agents.claim_form_agent import ClaimFormAgent
+from agents.combined_agent import CombinedAgent
+from agents.packed_agent import PackedAgent
 
 __all__ = [
     "BillAgent",
     "DischargeAgent", 
     "IDAgent",
     "PharmacyAgent",
-    "ClaimFormAgent"
+    "ClaimFormAgent",
+    "CombinedAgent",
+    "PackedAgent"
 ]
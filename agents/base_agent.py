@@ -1,22 +1,96 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Callable, Type
+import json
 from llm_client import LLMClient
+from structured_output import OutputModel, describe_schema, is_salvaged, mark_salvaged
+from rule_extractor import RuleExtractor
+from text_prep import estimate_tokens
+from config import settings
+from models import DocumentType
 
 class BaseAgent(ABC):
-    def __init__(self):
-        self.llm_client = LLMClient()
+    prompt_version = "3"
+    document_type: Optional[DocumentType] = None
+    output_model: Optional[Type[OutputModel]] = None
+    schema: Dict[str, Any] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.output_model is not None:
+            cls.schema = describe_schema(cls.output_model)
+    
+    def __init__(self, llm_client: Optional[LLMClient] = None, rule_extractor: Optional[RuleExtractor] = None):
+        self.llm_client = llm_client or LLMClient()
+        self.rule_extractor = rule_extractor or RuleExtractor()
+        self.field_stats: Dict[str, Dict[str, int]] = {
+            field: {"rules": 0, "llm": 0} for field in self.schema
+        }
+    
+    @property
+    def caller(self) -> str:
+        return f"{self.document_type.value}_agent" if self.document_type else "agent"
+    
+    def format_schema(self, fields: Optional[List[str]] = None) -> str:
+        schema = self.schema if fields is None else {field: self.schema[field] for field in fields}
+        return json.dumps(schema, indent=4)
     
     @abstractmethod
     def get_system_prompt(self) -> str:
         pass
     
     @abstractmethod
-    def get_extraction_prompt(self, text: str) -> str:
+    def get_extraction_prompt(self, text: str, fields: Optional[List[str]] = None) -> str:
         pass
     
-    async def extract(self, text: str) -> Dict[str, Any]:
+    def extract_with_rules(self, text: str) -> Dict[str, Any]:
+        if not settings.RULE_EXTRACTION_ENABLED or self.document_type is None:
+            return {}
+        
+        extracted = self.rule_extractor.extract(self.document_type, text)
+        return {field: value for field, value in extracted.items() if field in self.schema}
+    
+    def record_field_sources(self, rule_data: Dict[str, Any]) -> List[str]:
+        missing = [field for field in self.schema if field not in rule_data]
+        for field in rule_data:
+            self.field_stats[field]["rules"] += 1
+        for field in missing:
+            self.field_stats[field]["llm"] += 1
+        return missing
+    
+    def merge_with_rules(self, result: Dict[str, Any], rule_data: Dict[str, Any]) -> Dict[str, Any]:
+        if not rule_data:
+            return result
+        
+        merged = {field: result.get(field) for field in self.schema}
+        merged.update(rule_data)
+        merged = {field: merged.get(field) for field in self.schema}
+        return mark_salvaged(merged) if is_salvaged(result) else merged
+    
+    async def extract(self, text: str, on_field: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        rule_data = self.extract_with_rules(text)
+        missing = self.record_field_sources(rule_data)
+        if on_field:
+            for field, value in rule_data.items():
+                on_field(field, value)
+        
+        if not missing:
+            return {field: rule_data[field] for field in self.schema}
+        
         system_prompt = self.get_system_prompt()
-        user_prompt = self.get_extraction_prompt(text)
+        user_prompt = self.get_extraction_prompt(text, missing if rule_data else None)
+        max_tokens = self.output_model.token_limit(estimate_tokens(text)) if self.output_model else None
+        
+        if settings.LLM_STREAMING_ENABLED:
+            result = await self.llm_client.generate_json_stream(
+                user_prompt, system_prompt, on_field=on_field, caller=self.caller, schema=self.output_model,
+                max_tokens=max_tokens
+            )
+        else:
+            result = await self.llm_client.generate_json(
+                user_prompt, system_prompt, caller=self.caller, schema=self.output_model, max_tokens=max_tokens
+            )
         
-        result = await self.llm_client.generate_json(user_prompt, system_prompt)
-        return result
+        return self.merge_with_rules(result, rule_data)
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return self.field_stats
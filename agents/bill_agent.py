@@ -1,32 +1,23 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from agents.base_agent import BaseAgent
+from agents.schemas import BillData
+from models import DocumentType
 
 class BillAgent(BaseAgent):
+    document_type = DocumentType.BILL
+    output_model = BillData
+    
     def get_system_prompt(self) -> str:
         return """You are an expert at extracting structured data from medical bills and invoices.
 Extract all relevant information accurately. Use null for missing values."""
     
-    def get_extraction_prompt(self, text: str) -> str:
+    def get_extraction_prompt(self, text: str, fields: Optional[List[str]] = None) -> str:
         return f"""Extract structured data from this medical bill.
 
 Document text:
 {text}
 
 Return ONLY valid JSON with these fields:
-{{
-    "patient_name": "string or null",
-    "patient_id": "string or null",
-    "bill_number": "string or null",
-    "bill_date": "YYYY-MM-DD or null",
-    "hospital_name": "string or null",
-    "total_amount": "float or null",
-    "items": [
-        {{
-            "description": "string",
-            "amount": "float"
-        }}
-    ],
-    "payment_status": "paid|pending|partial or null"
-}}
+{self.format_schema(fields)}
 
 Use null for any field you cannot extract."""
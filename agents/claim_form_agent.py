@@ -1,29 +1,23 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from agents.base_agent import BaseAgent
+from agents.schemas import ClaimFormData
+from models import DocumentType
 
 class ClaimFormAgent(BaseAgent):
+    document_type = DocumentType.CLAIM_FORM
+    output_model = ClaimFormData
+    
     def get_system_prompt(self) -> str:
         return """You are an expert at extracting structured data from insurance claim forms.
 Extract all claim-related information accurately."""
     
-    def get_extraction_prompt(self, text: str) -> str:
+    def get_extraction_prompt(self, text: str, fields: Optional[List[str]] = None) -> str:
         return f"""Extract structured data from this insurance claim form.
 
 Document text:
 {text}
 
 Return ONLY valid JSON with these fields:
-{{
-    "patient_name": "string or null",
-    "patient_id": "string or null",
-    "claim_number": "string or null",
-    "claim_date": "YYYY-MM-DD or null",
-    "insurance_company": "string or null",
-    "policy_number": "string or null",
-    "claimed_amount": "float or null",
-    "diagnosis": "string or null",
-    "treatment_date": "YYYY-MM-DD or null",
-    "provider_name": "string or null"
-}}
+{self.format_schema(fields)}
 
 Use null for any field you cannot extract."""
@@ -0,0 +1,70 @@
+from typing import Annotated, Dict, Any, Optional, Tuple, ClassVar
+from pydantic import BeforeValidator, Field
+from agents.base_agent import BaseAgent
+from llm_client import LLMClient
+from classifier import DOCUMENT_CATEGORIES, parse_classification
+from models import DocumentType, Classification
+from structured_output import OutputModel, coerce_output, is_salvaged, mark_salvaged, normalize_choice
+from text_prep import estimate_tokens
+
+class CombinedOutput(OutputModel):
+    max_tokens: ClassVar[int] = 2000
+    tokens_per_input_token: ClassVar[float] = 2.0
+    document_type: Annotated[DocumentType, BeforeValidator(normalize_choice)] = DocumentType.OTHER
+    confidence: Optional[float] = None
+    extracted_data: Dict[str, Any] = Field(default_factory=dict)
+
+class CombinedAgent(BaseAgent):
+    caller = "combined_agent"
+    
+    def __init__(self, agents: Dict[DocumentType, BaseAgent], llm_client: Optional[LLMClient] = None):
+        super().__init__(llm_client)
+        self.agents = agents
+    
+    def get_system_prompt(self) -> str:
+        return """You are an expert at classifying medical claim documents and extracting structured data from them.
+Classify the document first, then extract the fields defined for that document type. Use null for missing values."""
+    
+    def format_schemas(self) -> str:
+        sections = []
+        for doc_type, agent in self.agents.items():
+            sections.append(f"{doc_type.value}:\n{agent.format_schema()}")
+        return "\n\n".join(sections)
+    
+    def get_extraction_prompt(self, text: str, filename: str = "") -> str:
+        return f"""Classify this medical document into ONE of these categories:
+{DOCUMENT_CATEGORIES}
+
+Then extract structured data using the fields defined for that category:
+
+{self.format_schemas()}
+
+Document filename: {filename}
+
+Document text:
+{text}
+
+Return ONLY valid JSON in this exact format:
+{{"document_type": "bill|discharge_summary|id_card|pharmacy_bill|claim_form|other", "confidence": 0.95, "extracted_data": {{fields for the chosen category}}}}
+
+Use an empty object for extracted_data when the category is "other".
+Use null for any field you cannot extract."""
+    
+    async def classify_and_extract(self, text: str, filename: str) -> Tuple[Classification, Dict[str, Any]]:
+        system_prompt = self.get_system_prompt()
+        user_prompt = self.get_extraction_prompt(text, filename)
+        
+        result = await self.llm_client.generate_json(
+            user_prompt, system_prompt, caller=self.caller, schema=CombinedOutput,
+            max_tokens=CombinedOutput.token_limit(estimate_tokens(text))
+        )
+        return self.parse_result(result)
+    
+    def parse_result(self, result: Dict[str, Any]) -> Tuple[Classification, Dict[str, Any]]:
+        classification = parse_classification(result)
+        agent = self.agents.get(classification.document_type)
+        if agent is None or agent.output_model is None:
+            return classification, {}
+        
+        extracted_data = coerce_output(agent.output_model, result.get("extracted_data"))
+        return classification, mark_salvaged(extracted_data) if is_salvaged(result) else extracted_data
@@ -1,29 +1,23 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from agents.base_agent import BaseAgent
+from agents.schemas import DischargeData
+from models import DocumentType
 
 class DischargeAgent(BaseAgent):
+    document_type = DocumentType.DISCHARGE_SUMMARY
+    output_model = DischargeData
+    
     def get_system_prompt(self) -> str:
         return """You are an expert at extracting structured data from hospital discharge summaries.
 Extract all relevant medical and patient information accurately."""
     
-    def get_extraction_prompt(self, text: str) -> str:
+    def get_extraction_prompt(self, text: str, fields: Optional[List[str]] = None) -> str:
         return f"""Extract structured data from this discharge summary.
 
 Document text:
 {text}
 
 Return ONLY valid JSON with these fields:
-{{
-    "patient_name": "string or null",
-    "patient_id": "string or null",
-    "admission_date": "YYYY-MM-DD or null",
-    "discharge_date": "YYYY-MM-DD or null",
-    "diagnosis": "string or null",
-    "procedures": ["list of procedures or empty array"],
-    "medications": ["list of medications or empty array"],
-    "doctor_name": "string or null",
-    "hospital_name": "string or null",
-    "follow_up_required": "boolean or null"
-}}
+{self.format_schema(fields)}
 
 Use null for any field you cannot extract."""
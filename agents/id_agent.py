@@ -1,28 +1,23 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from agents.base_agent import BaseAgent
+from agents.schemas import IDCardData
+from models import DocumentType
 
 class IDAgent(BaseAgent):
+    document_type = DocumentType.ID_CARD
+    output_model = IDCardData
+    
     def get_system_prompt(self) -> str:
         return """You are an expert at extracting structured data from insurance ID cards and patient identification documents.
 Extract all identification information accurately."""
     
-    def get_extraction_prompt(self, text: str) -> str:
+    def get_extraction_prompt(self, text: str, fields: Optional[List[str]] = None) -> str:
         return f"""Extract structured data from this insurance ID card or patient identification document.
 
 Document text:
 {text}
 
 Return ONLY valid JSON with these fields:
-{{
-    "patient_name": "string or null",
-    "patient_id": "string or null",
-    "insurance_company": "string or null",
-    "policy_number": "string or null",
-    "group_number": "string or null",
-    "date_of_birth": "YYYY-MM-DD or null",
-    "valid_from": "YYYY-MM-DD or null",
-    "valid_until": "YYYY-MM-DD or null",
-    "member_id": "string or null"
-}}
+{self.format_schema(fields)}
 
 Use null for any field you cannot extract."""
@@ -0,0 +1,97 @@
+from typing import Dict, Any, List, Optional, Tuple, ClassVar
+from pydantic import model_validator
+from agents.combined_agent import CombinedAgent, CombinedOutput
+from classifier import DOCUMENT_CATEGORIES
+from models import Classification, DocumentType
+from structured_output import OutputModel, is_salvaged, mark_salvaged
+from text_prep import estimate_tokens
+
+class PackedDocumentOutput(CombinedOutput):
+    max_tokens: ClassVar[int] = 800
+    document_index: Optional[int] = None
+
+class PackedOutput(OutputModel):
+    documents: List[PackedDocumentOutput]
+    
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_array(cls, data: Any) -> Any:
+        return {"documents": data} if isinstance(data, list) else data
+
+class PackedAgent(CombinedAgent):
+    caller = "packed_agent"
+    
+    def format_documents(
+        self,
+        documents: List[Tuple[str, str]],
+        known_types: Optional[List[Optional[DocumentType]]] = None
+    ) -> str:
+        known_types = known_types or [None] * len(documents)
+        sections = []
+        for index, ((filename, text), known_type) in enumerate(zip(documents, known_types), start=1):
+            header = f"=== DOCUMENT {index} ===\nFilename: {filename}\n"
+            if known_type is not None:
+                header += f"Document type: {known_type.value}\n"
+            sections.append(f"{header}\n{text}\n=== END DOCUMENT {index} ===")
+        return "\n\n".join(sections)
+    
+    def get_packed_prompt(
+        self,
+        documents: List[Tuple[str, str]],
+        known_types: Optional[List[Optional[DocumentType]]] = None
+    ) -> str:
+        return f"""Classify each of the {len(documents)} medical documents below into ONE of these categories:
+{DOCUMENT_CATEGORIES}
+
+Documents with a "Document type" line are already classified: keep that type and only extract its fields.
+
+Then extract structured data from each document using the fields defined for its category:
+
+{self.format_schemas()}
+
+{self.format_documents(documents, known_types)}
+
+Return ONLY a valid JSON object whose "documents" array has exactly {len(documents)} objects, one per document, in the same order:
+{{"documents": [{{"document_index": 1, "document_type": "bill|discharge_summary|id_card|pharmacy_bill|claim_form|other", "confidence": 0.95, "extracted_data": {{fields for the chosen category}}}}]}}
+
+Use an empty object for extracted_data when the category is "other".
+Use null for any field you cannot extract."""
+    
+    async def classify_and_extract_many(
+        self,
+        documents: List[Tuple[str, str]],
+        known_types: Optional[List[Optional[DocumentType]]] = None
+    ) -> List[Tuple[Classification, Dict[str, Any]]]:
+        system_prompt = self.get_system_prompt()
+        user_prompt = self.get_packed_prompt(documents, known_types)
+        
+        result = await self.llm_client.generate_json(
+            user_prompt, system_prompt, caller=self.caller, schema=PackedOutput,
+            max_tokens=sum(PackedDocumentOutput.token_limit(estimate_tokens(text)) for _, text in documents)
+        )
+        return self.parse_results(result, len(documents), known_types)
+    
+    def parse_results(
+        self,
+        result: Any,
+        count: int,
+        known_types: Optional[List[Optional[DocumentType]]] = None
+    ) -> List[Tuple[Classification, Dict[str, Any]]]:
+        salvaged = is_salvaged(result)
+        if isinstance(result, dict):
+            result = result.get("documents")
+        if not isinstance(result, list) or len(result) != count:
+            raise ValueError(f"Expected a JSON array with {count} documents")
+        if not all(isinstance(entry, dict) for entry in result):
+            raise ValueError("Every packed result must be a JSON object")
+        
+        indexes = [entry.get("document_index") for entry in result]
+        if sorted(index for index in indexes if isinstance(index, int)) == list(range(1, count + 1)):
+            result = sorted(result, key=lambda entry: entry["document_index"])
+        
+        known_types = known_types or [None] * count
+        result = [
+            entry if known_type is None else {**entry, "document_type": known_type.value}
+            for entry, known_type in zip(result, known_types)
+        ]
+        return [self.parse_result(mark_salvaged(entry) if salvaged else entry) for entry in result]
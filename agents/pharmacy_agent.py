@@ -1,33 +1,23 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from agents.base_agent import BaseAgent
+from agents.schemas import PharmacyData
+from models import DocumentType
 
 class PharmacyAgent(BaseAgent):
+    document_type = DocumentType.PHARMACY_BILL
+    output_model = PharmacyData
+    
     def get_system_prompt(self) -> str:
         return """You are an expert at extracting structured data from pharmacy bills and prescription receipts.
 Extract all relevant medication and pricing information accurately."""
     
-    def get_extraction_prompt(self, text: str) -> str:
+    def get_extraction_prompt(self, text: str, fields: Optional[List[str]] = None) -> str:
         return f"""Extract structured data from this pharmacy bill.
 
 Document text:
 {text}
 
 Return ONLY valid JSON with these fields:
-{{
-    "patient_name": "string or null",
-    "patient_id": "string or null",
-    "pharmacy_name": "string or null",
-    "bill_date": "YYYY-MM-DD or null",
-    "prescription_number": "string or null",
-    "medications": [
-        {{
-            "name": "string",
-            "quantity": "string",
-            "price": "float"
-        }}
-    ],
-    "total_amount": "float or null",
-    "doctor_name": "string or null"
-}}
+{self.format_schema(fields)}
 
 Use null for any field you cannot extract."""
@@ -0,0 +1,96 @@
+from typing import Annotated, Any, ClassVar, List, Literal, Optional
+from pydantic import BeforeValidator, Field
+from rule_extractor import parse_amount, parse_date, parse_payment_status
+from structured_output import OutputModel
+
+def _amount(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    parsed = parse_amount(value.strip().lstrip("$₹").strip())
+    return value if parsed is None else parsed
+
+def _date(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    return parse_date(value) or value
+
+def _payment_status(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    return parse_payment_status(value) or value
+
+Amount = Annotated[float, BeforeValidator(_amount)]
+DateText = Annotated[str, BeforeValidator(_date)]
+PaymentStatus = Annotated[Literal["paid", "pending", "partial"], BeforeValidator(_payment_status)]
+
+class BillItem(OutputModel):
+    description: str
+    amount: Amount
+
+class BillData(OutputModel):
+    max_tokens: ClassVar[int] = 2000
+    tokens_per_input_token: ClassVar[float] = 2.0
+    patient_name: Optional[str] = None
+    patient_id: Optional[str] = None
+    bill_number: Optional[str] = None
+    bill_date: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    hospital_name: Optional[str] = None
+    total_amount: Optional[Amount] = None
+    items: List[BillItem] = Field(default_factory=list)
+    payment_status: Optional[PaymentStatus] = None
+
+class DischargeData(OutputModel):
+    max_tokens: ClassVar[int] = 1000
+    tokens_per_input_token: ClassVar[float] = 2.0
+    patient_name: Optional[str] = None
+    patient_id: Optional[str] = None
+    admission_date: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    discharge_date: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    diagnosis: Optional[str] = None
+    procedures: List[str] = Field(default_factory=list, description="list of procedures or empty array")
+    medications: List[str] = Field(default_factory=list, description="list of medications or empty array")
+    doctor_name: Optional[str] = None
+    hospital_name: Optional[str] = None
+    follow_up_required: Optional[bool] = None
+
+class IDCardData(OutputModel):
+    max_tokens: ClassVar[int] = 300
+    patient_name: Optional[str] = None
+    patient_id: Optional[str] = None
+    insurance_company: Optional[str] = None
+    policy_number: Optional[str] = None
+    group_number: Optional[str] = None
+    date_of_birth: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    valid_from: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    valid_until: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    member_id: Optional[str] = None
+
+class PharmacyMedication(OutputModel):
+    name: str
+    quantity: str
+    price: Amount
+
+class PharmacyData(OutputModel):
+    max_tokens: ClassVar[int] = 1500
+    tokens_per_input_token: ClassVar[float] = 2.0
+    patient_name: Optional[str] = None
+    patient_id: Optional[str] = None
+    pharmacy_name: Optional[str] = None
+    bill_date: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    prescription_number: Optional[str] = None
+    medications: List[PharmacyMedication] = Field(default_factory=list)
+    total_amount: Optional[Amount] = None
+    doctor_name: Optional[str] = None
+
+class ClaimFormData(OutputModel):
+    max_tokens: ClassVar[int] = 350
+    patient_name: Optional[str] = None
+    patient_id: Optional[str] = None
+    claim_number: Optional[str] = None
+    claim_date: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    insurance_company: Optional[str] = None
+    policy_number: Optional[str] = None
+    claimed_amount: Optional[Amount] = None
+    diagnosis: Optional[str] = None
+    treatment_date: Optional[DateText] = Field(None, description="YYYY-MM-DD")
+    provider_name: Optional[str] = None
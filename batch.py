@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import io
+import json
+import posixpath
+import sys
+import zipfile
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from config import settings
+from llm_client import LLMClient, create_http_client
+from cache import ResultCache
+from pdf_extractor import PDFExtractor
+from orchestrator import ClaimOrchestrator
+from claims_store import create_claims_store
+from uploads import MEGABYTE, UploadTooLargeError, remove_files, spool_stream
+
+def _claim_id_for(path: str, default: str) -> str:
+    parent = posixpath.dirname(path.strip("/"))
+    return parent or default
+
+class ZipClaimSource:
+    def __init__(self, archive: Union[str, Path, bytes], name: str = "claim"):
+        if isinstance(archive, bytes):
+            archive = io.BytesIO(archive)
+        self.zip_file = zipfile.ZipFile(archive)
+        self.members: Dict[str, List[str]] = {}
+        self.max_file_bytes = settings.MAX_FILE_SIZE_MB * MEGABYTE
+        
+        oversized = []
+        for info in self.zip_file.infolist():
+            member = info.filename
+            if info.is_dir() or not member.lower().endswith(".pdf"):
+                continue
+            if posixpath.basename(member).startswith("."):
+                continue
+            if info.file_size > self.max_file_bytes:
+                oversized.append(member)
+            self.members.setdefault(_claim_id_for(member, name), []).append(member)
+        
+        if oversized:
+            self.zip_file.close()
+            raise UploadTooLargeError(
+                f"Archive members exceed the {settings.MAX_FILE_SIZE_MB} MB per-file upload limit: {', '.join(oversized)}"
+            )
+    
+    def claim_ids(self) -> List[str]:
+        return sorted(self.members)
+    
+    def load(self, claim_id: str) -> List[Dict[str, Any]]:
+        pdf_files = []
+        try:
+            for member in self.members[claim_id]:
+                with self.zip_file.open(member) as stream:
+                    pdf_files.append(spool_stream(
+                        stream,
+                        posixpath.basename(member),
+                        self.max_file_bytes,
+                        f"{settings.MAX_FILE_SIZE_MB} MB per-file upload limit"
+                    ))
+        except BaseException:
+            remove_files(pdf_files)
+            raise
+        return pdf_files
+    
+    def release(self, pdf_files: List[Dict[str, Any]]) -> None:
+        remove_files(pdf_files)
+    
+    def close(self) -> None:
+        self.zip_file.close()
+
+class DirectoryClaimSource:
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.members: Dict[str, List[Path]] = {}
+        
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file() or path.suffix.lower() != ".pdf" or path.name.startswith("."):
+                continue
+            relative = path.relative_to(self.root).as_posix()
+            self.members.setdefault(_claim_id_for(relative, self.root.name), []).append(path)
+    
+    def claim_ids(self) -> List[str]:
+        return sorted(self.members)
+    
+    def load(self, claim_id: str) -> List[Dict[str, Any]]:
+        return [
+            {"filename": path.name, "content": path.read_bytes()}
+            for path in self.members[claim_id]
+        ]
+    
+    def release(self, pdf_files: List[Dict[str, Any]]) -> None:
+        pass
+    
+    def close(self) -> None:
+        pass
+
+class UploadClaimSource:
+    def __init__(self, pdf_files: List[Dict[str, Any]], name: str = "claim"):
+        self.members: Dict[str, List[Dict[str, Any]]] = {}
+        for pdf_file in pdf_files:
+            claim_id = _claim_id_for(pdf_file["filename"], name)
+            self.members.setdefault(claim_id, []).append({
+                **pdf_file,
+                "filename": posixpath.basename(pdf_file["filename"])
+            })
+    
+    def claim_ids(self) -> List[str]:
+        return sorted(self.members)
+    
+    def load(self, claim_id: str) -> List[Dict[str, Any]]:
+        return self.members[claim_id]
+    
+    def release(self, pdf_files: List[Dict[str, Any]]) -> None:
+        pass
+    
+    def close(self) -> None:
+        pass
+
+async def process_batch(
+    orchestrator: ClaimOrchestrator,
+    source: Any,
+    max_concurrent_claims: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    semaphore = asyncio.Semaphore(max_concurrent_claims or settings.BATCH_MAX_CONCURRENT_CLAIMS)
+    
+    async def run(claim_id: str) -> Dict[str, Any]:
+        async with semaphore:
+            pdf_files: List[Dict[str, Any]] = []
+            try:
+                pdf_files = await asyncio.to_thread(source.load, claim_id)
+                result = await orchestrator.process_claim(pdf_files)
+                return {"claim_id": claim_id, "status": "completed", "result": result}
+            except Exception as e:
+                return {"claim_id": claim_id, "status": "failed", "error": str(e)}
+            finally:
+                source.release(pdf_files)
+    
+    tasks = [asyncio.create_task(run(claim_id)) for claim_id in source.claim_ids()]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def stream_ndjson(orchestrator: ClaimOrchestrator, source: Any) -> AsyncIterator[str]:
+    try:
+        async for claim_result in process_batch(orchestrator, source):
+            yield json.dumps(claim_result) + "\n"
+    finally:
+        source.close()
+
+def open_source(path: str) -> Any:
+    if Path(path).is_dir():
+        return DirectoryClaimSource(path)
+    if zipfile.is_zipfile(path):
+        return ZipClaimSource(path, Path(path).stem)
+    raise ValueError(f"{path} is neither a directory nor a zip archive")
+
+async def run_cli(path: str, output: Any, max_concurrent_claims: Optional[int]) -> Tuple[int, int]:
+    source = open_source(path)
+    http_client = create_http_client()
+    cache = ResultCache()
+    pdf_extractor = PDFExtractor()
+    claims_store = create_claims_store()
+    orchestrator = ClaimOrchestrator(LLMClient(http_client), cache, pdf_extractor, claims_store)
+    
+    completed = failed = 0
+    try:
+        async for claim_result in process_batch(orchestrator, source, max_concurrent_claims):
+            output.write(json.dumps(claim_result) + "\n")
+            output.flush()
+            if claim_result["status"] == "completed":
+                completed += 1
+            else:
+                failed += 1
+    finally:
+        source.close()
+        await http_client.aclose()
+        cache.close()
+        if claims_store is not None:
+            claims_store.close()
+        pdf_extractor.shutdown()
+    
+    return completed, failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Process a batch of claims and write NDJSON results")
+    parser.add_argument("path", help="Directory or zip archive with one folder per claim")
+    parser.add_argument("-o", "--output", help="Output file (defaults to stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=None, help="Claims processed concurrently")
+    args = parser.parse_args()
+    
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        completed, failed = asyncio.run(run_cli(args.path, output, args.concurrency))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    
+    print(f"Processed {completed + failed} claims: {completed} completed, {failed} failed", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from claims_store import DOCUMENT_COLUMNS, ClaimsStore, document_row
+from config import settings
+from models import DocumentType
+from validator import AMOUNT_TOLERANCE, ClaimValidator, amount_mismatch_record, date_sequence_record, mismatch_record
+
+ClaimDocuments = Tuple[str, List[Dict[str, Any]]]
+
+def _normalized_text(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    rows = np.flatnonzero(np.not_equal(values, None))
+    normalized = [str(value).strip().lower() for value in values[rows]]
+    keep = np.fromiter(map(bool, normalized), dtype=bool, count=len(normalized))
+    return rows[keep], np.array(normalized, dtype=str)[keep]
+
+class ClaimColumns:
+    def __init__(self, claim_ids: Sequence[str], rows: Sequence[Tuple[Any, ...]]):
+        self.claim_ids = list(claim_ids)
+        positions = {claim_id: index for index, claim_id in enumerate(self.claim_ids)}
+        table = np.array(rows, dtype=object).reshape(len(rows), len(DOCUMENT_COLUMNS) + 1)
+        columns = dict(zip(DOCUMENT_COLUMNS, table[:, 1:].T))
+        
+        self.claim_index = np.fromiter((positions[claim_id] for claim_id in table[:, 0]), dtype=np.int64, count=len(rows))
+        self.doc_types = columns["document_type"]
+        self.patient_names = _normalized_text(columns["patient_name"])
+        self.patient_ids = _normalized_text(columns["patient_id"])
+        self.admission_dates = columns["admission_date"]
+        self.discharge_dates = columns["discharge_date"]
+        self.total_amounts = np.array(columns["total_amount"].tolist(), dtype=np.float64)
+        self.claimed_amounts = np.array(columns["claimed_amount"].tolist(), dtype=np.float64)
+    
+    @classmethod
+    def from_documents(cls, claims: Sequence[ClaimDocuments]) -> "ClaimColumns":
+        rows = [
+            (claim_id, *document_row(doc["document_type"], doc.get("extracted_data") or {}))
+            for claim_id, documents in claims
+            for doc in documents
+        ]
+        return cls([claim_id for claim_id, _ in claims], rows)
+    
+    def __len__(self) -> int:
+        return len(self.claim_ids)
+
+class BatchValidator:
+    def __init__(self, validator: Optional[ClaimValidator] = None):
+        self.validator = validator or ClaimValidator()
+    
+    def validate(self, claims: Sequence[ClaimDocuments]) -> List[Dict[str, Any]]:
+        return self.validate_columns(ClaimColumns.from_documents(claims))
+    
+    def validate_columns(self, columns: ClaimColumns) -> List[Dict[str, Any]]:
+        findings = self.find(columns)
+        return [
+            {"claim_id": claim_id, **findings.get(index, {"missing_documents": [], "discrepancies": []})}
+            for index, claim_id in enumerate(columns.claim_ids)
+        ]
+    
+    def find(self, columns: ClaimColumns) -> Dict[int, Dict[str, Any]]:
+        findings: Dict[int, Dict[str, Any]] = {}
+        
+        def add(index: int, missing: Optional[str] = None, discrepancy: Optional[Dict[str, Any]] = None) -> None:
+            finding = findings.setdefault(index, {"missing_documents": [], "discrepancies": []})
+            if missing is not None:
+                finding["missing_documents"].append(missing)
+            if discrepancy is not None:
+                finding["discrepancies"].append(discrepancy)
+        
+        for doc_type, indexes in self._missing_documents(columns):
+            for index in indexes:
+                add(int(index), missing=doc_type)
+        for index, values in self._set_mismatches(columns, columns.patient_names).items():
+            add(index, discrepancy=mismatch_record("name", "Patient names", values))
+        for index, values in self._set_mismatches(columns, columns.patient_ids).items():
+            add(index, discrepancy=mismatch_record("id", "Patient IDs", values))
+        for index, dates in self._date_sequence_errors(columns).items():
+            add(index, discrepancy=date_sequence_record(*dates))
+        for index, amounts in self._amount_mismatches(columns).items():
+            add(index, discrepancy=amount_mismatch_record(*amounts))
+        return findings
+    
+    def _missing_documents(self, columns: ClaimColumns) -> List[Tuple[str, np.ndarray]]:
+        missing = []
+        for doc_type in self.validator.required_documents:
+            present = np.bincount(columns.claim_index[columns.doc_types == doc_type.value], minlength=len(columns)) > 0
+            missing.append((doc_type.value, np.flatnonzero(~present)))
+        return missing
+    
+    def _set_mismatches(self, columns: ClaimColumns, column: Tuple[np.ndarray, np.ndarray]) -> Dict[int, List[str]]:
+        rows, values = column
+        if not len(values):
+            return {}
+        
+        uniques, codes = np.unique(values, return_inverse=True)
+        pairs = np.unique(columns.claim_index[rows] * len(uniques) + codes)
+        pair_claims = pairs // len(uniques)
+        flagged = np.bincount(pair_claims, minlength=len(columns)) > 1
+        
+        mismatches: Dict[int, List[str]] = {}
+        for pair in pairs[flagged[pair_claims]]:
+            mismatches.setdefault(int(pair // len(uniques)), []).append(str(uniques[pair % len(uniques)]))
+        return mismatches
+    
+    def _first_discharge_value(self, columns: ClaimColumns, values: np.ndarray) -> np.ndarray:
+        rows = np.flatnonzero((columns.doc_types == DocumentType.DISCHARGE_SUMMARY.value) & np.not_equal(values, None))
+        first = np.full(len(columns), -1, dtype=np.int64)
+        claims, positions = np.unique(columns.claim_index[rows], return_index=True)
+        first[claims] = rows[positions]
+        return first
+    
+    def _date_sequence_errors(self, columns: ClaimColumns) -> Dict[int, Tuple[Any, Any]]:
+        first_admission = self._first_discharge_value(columns, columns.admission_dates)
+        first_discharge = self._first_discharge_value(columns, columns.discharge_dates)
+        candidates = np.flatnonzero((first_admission >= 0) & (first_discharge >= 0))
+        if not len(candidates):
+            return {}
+        
+        admissions = columns.admission_dates[first_admission[candidates]]
+        discharges = columns.discharge_dates[first_discharge[candidates]]
+        errors = np.flatnonzero(admissions.astype(str) > discharges.astype(str))
+        return {int(candidates[index]): (admissions[index], discharges[index]) for index in errors}
+    
+    def _amount_mismatches(self, columns: ClaimColumns) -> Dict[int, Tuple[float, float]]:
+        totals = []
+        for doc_type, amounts in (
+            (DocumentType.BILL, columns.total_amounts),
+            (DocumentType.CLAIM_FORM, columns.claimed_amounts)
+        ):
+            rows = (columns.doc_types == doc_type.value) & ~np.isnan(amounts)
+            totals.append((
+                np.bincount(columns.claim_index[rows], weights=amounts[rows], minlength=len(columns)),
+                np.bincount(columns.claim_index[rows], minlength=len(columns))
+            ))
+        (bill_totals, bill_counts), (claimed_totals, claimed_counts) = totals
+        
+        flagged = (bill_counts > 0) & (claimed_counts > 0) & (np.abs(bill_totals - claimed_totals) > AMOUNT_TOLERANCE)
+        return {
+            int(index): (float(bill_totals[index]), float(claimed_totals[index]))
+            for index in np.flatnonzero(flagged)
+        }
+
+EMPTY_VALIDATION = json.dumps({"missing_documents": [], "discrepancies": []})
+
+def _comparable(discrepancies: List[Dict[str, Any]]) -> List[str]:
+    return sorted(
+        json.dumps({**d, "values": sorted(d["values"])} if "values" in d else d, sort_keys=True)
+        for d in discrepancies if d.get("type") != "duplicate_claim"
+    )
+
+async def run_cli(
+    db_path: str,
+    output: Any,
+    batch_size: int,
+    changed_only: bool
+) -> Tuple[int, int, int]:
+    store = ClaimsStore(db_path)
+    batch_validator = BatchValidator()
+    
+    claims = flagged = changed = 0
+    after = None
+    try:
+        while True:
+            stored, rows = await store.load_document_rows(after, batch_size)
+            if not stored:
+                break
+            after = stored[-1][0]
+            
+            findings = batch_validator.find(ClaimColumns([claim_id for claim_id, _ in stored], rows))
+            for index, (claim_id, validation) in enumerate(stored):
+                finding = findings.get(index)
+                flagged += finding is not None
+                if finding is None and validation == EMPTY_VALIDATION:
+                    is_changed = False
+                else:
+                    finding = finding or {"missing_documents": [], "discrepancies": []}
+                    validation = json.loads(validation)
+                    is_changed = (
+                        finding["missing_documents"] != validation["missing_documents"]
+                        or _comparable(finding["discrepancies"]) != _comparable(validation["discrepancies"])
+                    )
+                
+                claims += 1
+                changed += is_changed
+                if is_changed or not changed_only:
+                    finding = finding or {"missing_documents": [], "discrepancies": []}
+                    output.write(json.dumps({"claim_id": claim_id, **finding, "changed": is_changed}) + "\n")
+    finally:
+        store.close()
+    
+    return claims, flagged, changed
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run validation rules over stored claims and write NDJSON results")
+    parser.add_argument("--db", default=settings.CLAIMS_DB_PATH, help="Claims store to read")
+    parser.add_argument("-o", "--output", help="Output file (defaults to stdout)")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Claims loaded and validated per batch")
+    parser.add_argument("--changed-only", action="store_true", help="Only write claims whose result differs from the stored one")
+    args = parser.parse_args()
+    
+    output = open(args.output, "w") if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        claims, flagged, changed = asyncio.run(run_cli(args.db, output, args.batch_size, args.changed_only))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    
+    elapsed = time.perf_counter() - started
+    print(
+        f"{claims} claims re-validated in {elapsed:.2f}s ({claims / elapsed if elapsed else 0:.0f}/s), "
+        f"{flagged} flagged, {changed} changed",
+        file=sys.stderr
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import httpx
+from generate_samples import generate_corpus
+
+STAGE_EVENTS = [
+    ("text_extraction", "text_extracted"),
+    ("classification", "classified"),
+    ("extraction", "extracted"),
+    ("validation", "validated"),
+    ("decision", "decision")
+]
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4)
+    }
+
+def parse_metrics(text: str) -> Dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+def metric_deltas(before: Dict[str, float], after: Dict[str, float], metric: str, label: str) -> Dict[str, float]:
+    deltas: Dict[str, float] = {}
+    pattern = re.compile(rf'^{metric}\{{.*{label}="([^"]*)".*\}}$')
+    for name, value in after.items():
+        match = pattern.match(name)
+        if match:
+            key = match.group(1)
+            deltas[key] = deltas.get(key, 0.0) + value - before.get(name, 0.0)
+    return deltas
+
+def find_claims(corpus: Path) -> List[Path]:
+    return sorted(path for path in corpus.iterdir() if path.is_dir() and any(path.glob("*.pdf")))
+
+async def run_claim(client: httpx.AsyncClient, app_url: str, claim_dir: Path) -> Dict[str, Any]:
+    files = [
+        ("files", (path.name, path.read_bytes(), "application/pdf"))
+        for path in sorted(claim_dir.glob("*.pdf"))
+    ]
+    marks: Dict[str, float] = {}
+    outcome: Dict[str, Any] = {
+        "claim_id": claim_dir.name, "status": None, "decision_method": None, "error": None, "server_stages": {}
+    }
+    started = time.perf_counter()
+    
+    try:
+        async with client.stream(
+            "POST", f"{app_url}/process-claim/stream", params={"format": "ndjson", "timings": "true"}, files=files
+        ) as response:
+            if response.status_code != 200:
+                outcome["error"] = f"HTTP {response.status_code}"
+            
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                marks[message["event"]] = time.perf_counter() - started
+                if message["event"] == "completed":
+                    outcome["status"] = message["data"]["claim_decision"]["status"]
+                    outcome["decision_method"] = message["data"]["claim_decision"].get("method")
+                    outcome["server_stages"] = message["data"]["processing"].get("timings_seconds", {})
+                elif message["event"] == "error":
+                    outcome["error"] = message["data"]["detail"]
+    except httpx.HTTPError as e:
+        outcome["error"] = str(e) or type(e).__name__
+    
+    stages = {}
+    previous = 0.0
+    for stage, event in STAGE_EVENTS:
+        if event in marks:
+            stages[stage] = max(marks[event] - previous, 0.0)
+            previous = marks[event]
+    stages["total"] = time.perf_counter() - started
+    outcome["stages"] = stages
+    return outcome
+
+async def fetch_json(client: httpx.AsyncClient, url: str) -> Dict[str, Any]:
+    response = await client.get(url)
+    response.raise_for_status()
+    return response.json()
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(url)
+                if response.status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout}s")
+
+async def run_benchmark(
+    app_url: str,
+    claim_dirs: List[Path],
+    concurrency: int,
+    mock_url: Optional[str] = None
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = httpx.Timeout(600.0, connect=10.0)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        before = await fetch_json(client, f"{app_url}/stats")
+        metrics_before = parse_metrics((await client.get(f"{app_url}/metrics")).text)
+        mock_before = await fetch_json(client, f"{mock_url}/stats") if mock_url else None
+        
+        async def bounded(claim_dir: Path) -> Dict[str, Any]:
+            async with semaphore:
+                return await run_claim(client, app_url, claim_dir)
+        
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(bounded(claim_dir) for claim_dir in claim_dirs))
+        wall_seconds = time.perf_counter() - started
+        
+        after = await fetch_json(client, f"{app_url}/stats")
+        metrics_after = parse_metrics((await client.get(f"{app_url}/metrics")).text)
+        mock_after = await fetch_json(client, f"{mock_url}/stats") if mock_url else None
+    
+    claims = len(outcomes)
+    stage_names = [stage for stage, _ in STAGE_EVENTS] + ["total"]
+    server_stage_names = sorted({stage for outcome in outcomes for stage in outcome["server_stages"]})
+    calls_by_caller = metric_deltas(metrics_before, metrics_after, "llm_calls_total", "caller")
+    tokens_by_kind = metric_deltas(metrics_before, metrics_after, "llm_tokens_total", "kind")
+    report = {
+        "claims": claims,
+        "concurrency": concurrency,
+        "failed": sum(1 for outcome in outcomes if outcome["error"]),
+        "wall_seconds": round(wall_seconds, 3),
+        "claims_per_second": round(claims / wall_seconds, 3) if wall_seconds else 0.0,
+        "decisions": dict(Counter(outcome["status"] for outcome in outcomes if outcome["status"])),
+        "decision_methods": dict(Counter(outcome["decision_method"] for outcome in outcomes if outcome["decision_method"])),
+        "llm_calls_per_claim": round((after["llm"]["calls"] - before["llm"]["calls"]) / max(claims, 1), 3),
+        "llm_attempts_per_claim": round((after["llm"]["attempts"] - before["llm"]["attempts"]) / max(claims, 1), 3),
+        "llm_calls_per_claim_by_caller": {
+            caller: round(calls / max(claims, 1), 3) for caller, calls in sorted(calls_by_caller.items())
+        },
+        "llm_tokens_per_claim": {
+            kind: round(tokens / max(claims, 1), 1) for kind, tokens in sorted(tokens_by_kind.items())
+        },
+        "packing": {
+            key: after["pipeline"][key] - before["pipeline"][key]
+            for key in ("packed_calls", "packed_documents", "packed_known_documents", "pack_fallbacks")
+        },
+        "stages": {
+            stage: summarize([outcome["stages"][stage] for outcome in outcomes if stage in outcome["stages"]])
+            for stage in stage_names
+        },
+        "server_stages": {
+            stage: summarize([outcome["server_stages"][stage] for outcome in outcomes if stage in outcome["server_stages"]])
+            for stage in server_stage_names
+        },
+        "errors": [outcome for outcome in outcomes if outcome["error"]][:10]
+    }
+    
+    if mock_before is not None:
+        report["provider"] = {key: mock_after[key] - mock_before[key] for key in mock_after}
+    
+    return report
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Claims:            {report['claims']} ({report['failed']} failed, concurrency {report['concurrency']})")
+    print(f"Wall time:         {report['wall_seconds']:.2f}s")
+    print(f"Throughput:        {report['claims_per_second']:.2f} claims/sec")
+    print(f"LLM calls/claim:   {report['llm_calls_per_claim']:.2f} ({report['llm_attempts_per_claim']:.2f} attempts)")
+    print(f"Calls by caller:   {report['llm_calls_per_claim_by_caller']}")
+    print(f"Tokens/claim:      {report['llm_tokens_per_claim']}")
+    if report["packing"]["packed_calls"] or report["packing"]["pack_fallbacks"]:
+        print(f"Packing:           {report['packing']}")
+    print(f"Decisions:         {report['decisions']}")
+    decided = sum(report["decision_methods"].values())
+    local = decided - report["decision_methods"].get("llm", 0)
+    print(f"Decided locally:   {local / decided if decided else 0:.1%} {report['decision_methods']}")
+    if "provider" in report:
+        print(f"Provider:          {report['provider']}")
+    for title, stages in (("client stage", report["stages"]), ("server stage", report["server_stages"])):
+        print("")
+        print(f"{title:<22}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for stage, stats in stages.items():
+            print(f"{stage:<22}{stats['count']:>7}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}")
+    for error in report["errors"]:
+        print(f"error: {error['claim_id']}: {error['error']}")
+
+def start_process(command: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the claims API against a local mock LLM server")
+    parser.add_argument("--corpus", default="benchmark_corpus", help="Corpus directory with one folder per claim")
+    parser.add_argument("--claims", type=int, default=50, help="Claims to generate when the corpus does not exist")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Claims submitted concurrently")
+    parser.add_argument("--app-url", help="Benchmark a running app instead of starting one")
+    parser.add_argument("--app-port", type=int, default=8200)
+    parser.add_argument("--mock-port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median mock LLM latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--pipeline-mode", choices=["two_stage", "combined", "packed"])
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache enabled")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    corpus = Path(args.corpus)
+    if not corpus.exists():
+        generate_corpus(str(corpus), args.claims, args.seed)
+    claim_dirs = find_claims(corpus)
+    
+    processes = []
+    app_url = args.app_url
+    mock_url = None
+    store_dir = tempfile.TemporaryDirectory()
+    try:
+        if app_url is None:
+            mock_url = f"http://127.0.0.1:{args.mock_port}"
+            app_url = f"http://127.0.0.1:{args.app_port}"
+            
+            processes.append(start_process([
+                sys.executable, "mock_llm_server.py",
+                "--port", str(args.mock_port),
+                "--latency-ms", str(args.latency_ms),
+                "--latency-sigma", str(args.latency_sigma),
+                "--error-rate", str(args.error_rate),
+                "--rate-limit-rate", str(args.rate_limit_rate),
+                "--seed", str(args.seed)
+            ], dict(os.environ)))
+            
+            env = dict(os.environ)
+            env["LLM_BASE_URL"] = f"{mock_url}/openai/v1"
+            env.setdefault("GROQ_API_KEY", "benchmark")
+            env["CACHE_ENABLED"] = "true" if args.cache else "false"
+            env["CLAIMS_DB_PATH"] = os.path.join(store_dir.name, "claims.db")
+            if args.pipeline_mode:
+                env["PIPELINE_MODE"] = args.pipeline_mode
+            processes.append(start_process([
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--port", str(args.app_port),
+                "--log-level", "warning"
+            ], env))
+            
+            asyncio.run(wait_until_ready(f"{mock_url}/stats"))
+        asyncio.run(wait_until_ready(f"{app_url}/health"))
+        
+        report = asyncio.run(run_benchmark(app_url, claim_dirs, args.concurrency, mock_url))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+        store_dir.cleanup()
+    
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
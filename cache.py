@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from config import settings
+from metrics import CACHE_LOOKUPS
+
+def content_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def make_key(*parts: Any) -> str:
+    return ":".join(str(part) for part in parts)
+
+class MemoryCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, value = entry
+        if self.ttl_seconds and time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        self._entries[key] = (stored_at or time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskCache:
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = asyncio.Lock()
+
+    def _get(self, key: str) -> Optional[Tuple[float, Any]]:
+        row = self._conn.execute(
+            "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, stored_at = row
+        if self.ttl_seconds and time.time() - stored_at > self.ttl_seconds:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+
+        return stored_at, json.loads(value)
+
+    def _set(self, key: str, value: Any) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, stored_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time())
+        )
+        self._conn.commit()
+
+    async def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._set, key, value)
+
+    def close(self) -> None:
+        self._conn.close()
+
+class ResultCache:
+    LLM_NAMESPACES = ("classification", "extraction", "combined")
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.enabled = settings.CACHE_ENABLED if enabled is None else enabled
+        ttl = settings.CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.memory = MemoryCache(max_entries or settings.CACHE_MAX_ENTRIES, ttl)
+
+        disk_path = disk_path or settings.CACHE_DB_PATH
+        self.disk = DiskCache(disk_path, ttl) if self.enabled and disk_path else None
+
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, namespace: str, outcome: str) -> None:
+        counters = self.stats.setdefault(namespace, {"hits": 0, "disk_hits": 0, "misses": 0})
+        counters[outcome] += 1
+        CACHE_LOOKUPS.inc(namespace=namespace, outcome=outcome)
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        full_key = make_key(namespace, key)
+        value = self.memory.get(full_key)
+        if value is not None:
+            self._record(namespace, "hits")
+            return value
+
+        if self.disk is not None:
+            entry = await self.disk.get(full_key)
+            if entry is not None:
+                stored_at, value = entry
+                self.memory.set(full_key, value, stored_at)
+                self._record(namespace, "disk_hits")
+                return value
+
+        self._record(namespace, "misses")
+        return None
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+
+        full_key = make_key(namespace, key)
+        self.memory.set(full_key, value)
+        if self.disk is not None:
+            await self.disk.set(full_key, value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        llm_calls_saved = sum(
+            counters["hits"] + counters["disk_hits"]
+            for namespace, counters in self.stats.items()
+            if namespace in self.LLM_NAMESPACES
+        )
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self.memory),
+            "llm_calls_saved": llm_calls_saved,
+            "namespaces": self.stats
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,305 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import settings
+from models import Document, DocumentType
+
+REFERENCE_FIELDS = {
+    DocumentType.BILL: "bill_number",
+    DocumentType.PHARMACY_BILL: "prescription_number",
+    DocumentType.CLAIM_FORM: "claim_number"
+}
+
+DATE_FIELDS = ["admission_date", "discharge_date", "bill_date", "treatment_date", "claim_date"]
+
+DOCUMENT_COLUMNS = (
+    "document_type", "patient_name", "patient_id", "admission_date", "discharge_date", "total_amount", "claimed_amount"
+)
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS claims ("
+    "claim_id TEXT PRIMARY KEY, created_at REAL NOT NULL, status TEXT, patient_id TEXT, policy_number TEXT, "
+    "hospital TEXT, start_date TEXT, end_date TEXT, total_amount REAL, validation TEXT NOT NULL, result TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS claim_documents ("
+    "claim_id TEXT NOT NULL, position INTEGER NOT NULL, filename TEXT, document_type TEXT NOT NULL, "
+    "patient_name TEXT, patient_id TEXT, admission_date TEXT, discharge_date TEXT, total_amount REAL, "
+    "claimed_amount REAL, PRIMARY KEY (claim_id, position))",
+    "CREATE TABLE IF NOT EXISTS claim_references ("
+    "field TEXT NOT NULL, value TEXT NOT NULL, claim_id TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS claim_pending_documents ("
+    "claim_id TEXT NOT NULL, filename TEXT NOT NULL, snapshot TEXT NOT NULL, PRIMARY KEY (claim_id, filename))",
+    "CREATE INDEX IF NOT EXISTS idx_claims_patient_id ON claims (patient_id)",
+    "CREATE INDEX IF NOT EXISTS idx_claims_policy_number ON claims (policy_number)",
+    "CREATE INDEX IF NOT EXISTS idx_claims_hospital ON claims (hospital)",
+    "CREATE INDEX IF NOT EXISTS idx_claims_dates ON claims (start_date, end_date)",
+    "CREATE INDEX IF NOT EXISTS idx_claim_references_value ON claim_references (field, value)",
+    "CREATE INDEX IF NOT EXISTS idx_claim_references_claim_id ON claim_references (claim_id)"
+]
+
+def normalize_value(value: Any) -> Optional[str]:
+    if value is None or value == "null":
+        return None
+    normalized = str(value).strip().lower()
+    return normalized or None
+
+def field_text(value: Any) -> Optional[str]:
+    if not value or value == "null" or not str(value).strip():
+        return None
+    return str(value)
+
+def field_amount(value: Any) -> Optional[float]:
+    if field_text(value) is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def document_row(document_type: str, data: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        document_type,
+        field_text(data.get("patient_name")),
+        field_text(data.get("patient_id")),
+        field_text(data.get("admission_date")),
+        field_text(data.get("discharge_date")),
+        field_amount(data.get("total_amount")),
+        field_amount(data.get("claimed_amount"))
+    )
+
+def claim_references(documents: Iterable[Document]) -> List[Tuple[str, str]]:
+    references = set()
+    for doc in documents:
+        field = REFERENCE_FIELDS.get(doc.document_type)
+        value = normalize_value(doc.extracted_data.get(field)) if field else None
+        if value:
+            references.add((field, value))
+    return sorted(references)
+
+def _first_value(documents: List[Document], *fields: str) -> Optional[str]:
+    for field in fields:
+        for doc in documents:
+            value = normalize_value(doc.extracted_data.get(field))
+            if value:
+                return value
+    return None
+
+def _total_amount(documents: List[Document]) -> Optional[float]:
+    amounts = []
+    for doc in documents:
+        if doc.document_type == DocumentType.BILL and doc.extracted_data.get("total_amount"):
+            try:
+                amounts.append(float(doc.extracted_data["total_amount"]))
+            except (TypeError, ValueError):
+                pass
+    return sum(amounts) if amounts else None
+
+def claim_columns(documents: List[Document]) -> Dict[str, Any]:
+    dates = sorted(
+        str(doc.extracted_data[field]) for doc in documents for field in DATE_FIELDS
+        if doc.extracted_data.get(field)
+    )
+    return {
+        "patient_id": _first_value(documents, "patient_id"),
+        "policy_number": _first_value(documents, "policy_number"),
+        "hospital": _first_value(documents, "hospital_name", "provider_name"),
+        "start_date": dates[0] if dates else None,
+        "end_date": dates[-1] if dates else None,
+        "total_amount": _total_amount(documents)
+    }
+
+class ClaimsStore:
+    SEARCH_COLUMNS = ("patient_id", "policy_number", "hospital")
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.CLAIMS_DB_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+        self._lock = asyncio.Lock()
+    
+    def _save(
+        self,
+        claim_id: str,
+        documents: List[Document],
+        result: Dict[str, Any],
+        pending: List[Dict[str, Any]]
+    ) -> None:
+        columns = claim_columns(documents)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO claims (claim_id, created_at, status, patient_id, policy_number, hospital, "
+                "start_date, end_date, total_amount, validation, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    claim_id, time.time(), result["claim_decision"]["status"], columns["patient_id"],
+                    columns["policy_number"], columns["hospital"], columns["start_date"], columns["end_date"],
+                    columns["total_amount"], json.dumps(result["validation"]), json.dumps(result)
+                )
+            )
+            self._conn.execute("DELETE FROM claim_documents WHERE claim_id = ?", (claim_id,))
+            self._conn.executemany(
+                f"INSERT INTO claim_documents (claim_id, position, filename, {', '.join(DOCUMENT_COLUMNS)}) "
+                f"VALUES (?, ?, ?{', ?' * len(DOCUMENT_COLUMNS)})",
+                [
+                    (claim_id, position, doc.filename, *document_row(doc.document_type.value, doc.extracted_data))
+                    for position, doc in enumerate(documents)
+                ]
+            )
+            self._conn.execute("DELETE FROM claim_references WHERE claim_id = ?", (claim_id,))
+            self._conn.executemany(
+                "INSERT INTO claim_references (field, value, claim_id) VALUES (?, ?, ?)",
+                [(field, value, claim_id) for field, value in claim_references(documents)]
+            )
+            self._conn.execute("DELETE FROM claim_pending_documents WHERE claim_id = ?", (claim_id,))
+            self._conn.executemany(
+                "INSERT INTO claim_pending_documents (claim_id, filename, snapshot) VALUES (?, ?, ?)",
+                [(claim_id, snapshot["filename"], json.dumps(snapshot)) for snapshot in pending]
+            )
+    
+    def _find_duplicates(
+        self,
+        references: List[Tuple[str, str]],
+        exclude_claim_id: Optional[str]
+    ) -> Dict[Tuple[str, str], List[str]]:
+        duplicates: Dict[Tuple[str, str], List[str]] = {}
+        for field, value in references:
+            rows = self._conn.execute(
+                "SELECT claim_id FROM claim_references WHERE field = ? AND value = ? AND claim_id != ? "
+                "ORDER BY claim_id LIMIT ?",
+                (field, value, exclude_claim_id or "", settings.CLAIMS_DUPLICATE_LIMIT)
+            ).fetchall()
+            if rows:
+                duplicates[(field, value)] = [row[0] for row in rows]
+        return duplicates
+    
+    def _get(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT result FROM claims WHERE claim_id = ?", (claim_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def _get_pending(self, claim_id: str) -> Dict[str, Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT filename, snapshot FROM claim_pending_documents WHERE claim_id = ?", (claim_id,)
+        ).fetchall()
+        return {filename: json.loads(snapshot) for filename, snapshot in rows}
+    
+    def _search(
+        self,
+        filters: Dict[str, Optional[str]],
+        date_from: Optional[str],
+        date_to: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        clauses = []
+        params: List[Any] = []
+        for column in self.SEARCH_COLUMNS:
+            value = normalize_value(filters.get(column))
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if date_from:
+            clauses.append("end_date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("start_date <= ?")
+            params.append(date_to)
+        
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(
+            "SELECT claim_id, created_at, status, patient_id, policy_number, hospital, start_date, end_date, "
+            f"total_amount FROM claims{where} ORDER BY created_at DESC LIMIT ?",
+            params + [limit]
+        )
+        names = [column[0] for column in rows.description]
+        return [dict(zip(names, row)) for row in rows.fetchall()]
+    
+    def _load_document_rows(
+        self,
+        after_claim_id: Optional[str],
+        limit: int
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[Any, ...]]]:
+        claims = self._conn.execute(
+            "SELECT claim_id, validation FROM claims WHERE claim_id > ? ORDER BY claim_id LIMIT ?",
+            (after_claim_id or "", limit)
+        ).fetchall()
+        if not claims:
+            return [], []
+        
+        rows = self._conn.execute(
+            f"SELECT claim_id, {', '.join(DOCUMENT_COLUMNS)} FROM claim_documents "
+            "WHERE claim_id >= ? AND claim_id <= ? ORDER BY claim_id, position",
+            (claims[0][0], claims[-1][0])
+        ).fetchall()
+        return claims, rows
+    
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+    
+    async def save(
+        self,
+        claim_id: str,
+        documents: List[Document],
+        result: Dict[str, Any],
+        pending: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._save, claim_id, documents, result, pending or [])
+    
+    async def find_duplicates(
+        self,
+        documents: List[Document],
+        exclude_claim_id: Optional[str] = None
+    ) -> Dict[Tuple[str, str], List[str]]:
+        references = claim_references(documents)
+        if not references:
+            return {}
+        async with self._lock:
+            return await asyncio.to_thread(self._find_duplicates, references, exclude_claim_id)
+    
+    async def get(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, claim_id)
+    
+    async def get_pending(self, claim_id: str) -> Dict[str, Dict[str, Any]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get_pending, claim_id)
+    
+    async def search(
+        self,
+        patient_id: Optional[str] = None,
+        policy_number: Optional[str] = None,
+        hospital: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        filters = {"patient_id": patient_id, "policy_number": policy_number, "hospital": hospital}
+        async with self._lock:
+            return await asyncio.to_thread(self._search, filters, date_from, date_to, limit)
+    
+    async def load_document_rows(
+        self,
+        after_claim_id: Optional[str] = None,
+        limit: int = 1000
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[Any, ...]]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._load_document_rows, after_claim_id, limit)
+    
+    async def count(self) -> int:
+        async with self._lock:
+            return await asyncio.to_thread(self._count)
+    
+    def close(self) -> None:
+        self._conn.close()
+
+def create_claims_store() -> Optional[ClaimsStore]:
+    if not settings.CLAIMS_STORE_ENABLED:
+        return None
+    return ClaimsStore()
@@ -1,35 +1,92 @@
+from typing import Annotated, Optional, Dict, Any, ClassVar
+from pydantic import BeforeValidator
 from llm_client import LLMClient
-from models import DocumentType
+from structured_output import OutputModel, normalize_choice
+from rule_classifier import RuleBasedClassifier
+from models import DocumentType, Classification, ClassificationMethod
+from config import settings
+from text_prep import trim_to_budget
+
+DOCUMENT_CATEGORIES = """- bill: Medical bills, hospital invoices
+- discharge_summary: Patient discharge summaries, medical reports
+- id_card: Insurance ID cards, patient identification
+- pharmacy_bill: Pharmacy receipts, prescription bills
+- claim_form: Insurance claim forms
+- other: Any other document type"""
+
+class ClassificationOutput(OutputModel):
+    max_tokens: ClassVar[int] = 150
+    document_type: Annotated[DocumentType, BeforeValidator(normalize_choice)] = DocumentType.OTHER
+    confidence: Optional[float] = None
+    reasoning: Optional[str] = None
 
 class DocumentClassifier:
-    def __init__(self):
-        self.llm_client = LLMClient()
+    prompt_version = "4"
     
-    async def classify(self, text: str, filename: str) -> DocumentType:
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        self.llm_client = llm_client or LLMClient()
+        self.rule_classifier = RuleBasedClassifier()
+        self.stats = {method.value: 0 for method in ClassificationMethod}
+    
+    def classify_with_rules(self, text: str, filename: str) -> Optional[Classification]:
+        if not settings.CLASSIFIER_FAST_PATH_ENABLED:
+            return None
+        
+        doc_type, confidence = self.rule_classifier.classify(text, filename)
+        if confidence < settings.CLASSIFIER_FAST_PATH_THRESHOLD:
+            return None
+        
+        self.stats[ClassificationMethod.RULES.value] += 1
+        return Classification(
+            document_type=doc_type,
+            confidence=confidence,
+            method=ClassificationMethod.RULES
+        )
+    
+    async def classify(self, text: str, filename: str) -> Classification:
+        classification = self.classify_with_rules(text, filename)
+        if classification is not None:
+            return classification
+        
+        classification = await self._llm_classify(text, filename)
+        self.stats[ClassificationMethod.LLM.value] += 1
+        return classification
+    
+    async def _llm_classify(self, text: str, filename: str) -> Classification:
         system_prompt = """You are a document classification expert for medical claims. 
 Classify documents accurately based on their content."""
 
         prompt = f"""Classify this medical document into ONE of these categories:
-- bill: Medical bills, hospital invoices
-- discharge_summary: Patient discharge summaries, medical reports
-- id_card: Insurance ID cards, patient identification
-- pharmacy_bill: Pharmacy receipts, prescription bills
-- claim_form: Insurance claim forms
-- other: Any other document type
+{DOCUMENT_CATEGORIES}
 
 Document filename: {filename}
 
 Document content:
-{text[:2000]}
+{trim_to_budget(text, settings.CLASSIFIER_TOKEN_BUDGET)}
 
 Respond with ONLY a JSON object in this exact format:
 {{"document_type": "bill|discharge_summary|id_card|pharmacy_bill|claim_form|other", "confidence": 0.95, "reasoning": "brief explanation"}}"""
 
-        result = await self.llm_client.generate_json(prompt, system_prompt)
+        result = await self.llm_client.generate_json(
+            prompt, system_prompt, caller="classifier", schema=ClassificationOutput
+        )
         
-        doc_type = result.get("document_type", "other")
-        
-        try:
-            return DocumentType(doc_type)
-        except ValueError:
-            return DocumentType.OTHER
+        return parse_classification(result)
+
+def parse_classification(result: Dict[str, Any]) -> Classification:
+    doc_type = result.get("document_type", "other")
+    
+    try:
+        document_type = DocumentType(doc_type)
+    except ValueError:
+        document_type = DocumentType.OTHER
+    
+    confidence = result.get("confidence")
+    if not isinstance(confidence, (int, float)):
+        confidence = None
+    
+    return Classification(
+        document_type=document_type,
+        confidence=confidence,
+        method=ClassificationMethod.LLM
+    )
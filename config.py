@@ -1,13 +1,99 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 class Settings(BaseSettings):
     GROQ_API_KEY: str
     LLM_MODEL: str = "llama-3.1-70b-versatile"
+    LLM_BASE_URL: str = "https://api.groq.com/openai/v1"
     MAX_FILE_SIZE_MB: int = 10
+    MAX_REQUEST_SIZE_MB: int = 50
+    UPLOAD_TMP_DIR: Optional[str] = None
+    
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    LLM_HTTP2: bool = False
+    
+    LLM_PROVIDERS: Dict[str, Dict[str, Any]] = {}
+    LLM_ROUTES: Dict[str, List[str]] = {}
+    LLM_ROUTING_STRATEGY: str = "latency"
+    LLM_PROVIDER_FAILURE_THRESHOLD: int = 3
+    LLM_PROVIDER_COOLDOWN_SECONDS: float = 30.0
+    
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_REQUESTS_PER_MINUTE: Optional[float] = None
+    LLM_TOKENS_PER_MINUTE: Optional[float] = None
+    LLM_MAX_RATE_LIMIT_RETRIES: int = 5
+    
+    LLM_MAX_RETRIES: int = 3
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5
+    LLM_BACKOFF_MAX_SECONDS: float = 20.0
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_DELAY_SECONDS: float = 5.0
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_STREAMING_ENABLED: bool = False
+    LLM_JSON_MODE: Optional[str] = "json_object"
+    LLM_JSON_MODE_STREAMING: bool = False
+    LLM_JSON_REPAIR_TOKEN_FACTOR: float = 2.0
+    
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_TTL_SECONDS: float = 86400.0
+    CACHE_DB_PATH: Optional[str] = None
+    PDF_EXTRACTOR_VERSION: str = "3"
+    
+    CLAIMS_STORE_ENABLED: bool = True
+    CLAIMS_DB_PATH: str = "data/claims.db"
+    CLAIMS_DUPLICATE_LIMIT: int = 10
+    
+    DECISION_RULES_ENABLED: bool = True
+    DECISION_POLICY_PATH: Optional[str] = None
+    
+    PDF_EXECUTOR: str = "process"
+    PDF_WORKERS: Optional[int] = None
+    PDF_EXTRACTION_TIMEOUT_SECONDS: float = 30.0
+    PDF_MAX_PAGES: int = 500
+    PDF_PAGE_BATCH_SIZE: int = 4
+    
+    CLASSIFIER_FAST_PATH_ENABLED: bool = True
+    CLASSIFIER_FAST_PATH_THRESHOLD: float = 0.8
+    
+    RULE_EXTRACTION_ENABLED: bool = True
+    
+    TEXT_TOKEN_BUDGETS: Dict[str, int] = {
+        "bill": 3000,
+        "discharge_summary": 4000,
+        "id_card": 800,
+        "pharmacy_bill": 2000,
+        "claim_form": 1500,
+        "other": 500
+    }
+    CLASSIFIER_TOKEN_BUDGET: int = 500
+    CLASSIFIER_MIN_PAGES: int = 1
+    COMBINED_TOKEN_BUDGET: int = 4000
+    TEXT_HEAD_RATIO: float = 0.75
+    
+    PIPELINE_MODE: str = "two_stage"
+    PACKED_MAX_DOCUMENT_TOKENS: int = 1500
+    PACKED_TOKEN_BUDGET: int = 6000
+    PACKED_MAX_DOCUMENTS: int = 4
+    RESPONSE_TIMINGS_ENABLED: bool = False
+    EARLY_REJECTION_ENABLED: bool = True
+    MAX_CONCURRENT_DOCUMENTS: int = 32
+    BATCH_MAX_CONCURRENT_CLAIMS: int = 8
+    
+    JOB_BACKEND: str = "memory"
+    JOB_WORKERS: int = 4
+    JOB_QUEUE_MAX_SIZE: int = 100
+    JOB_MAX_RETAINED: int = 1000
+    JOB_WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    JOB_WEBHOOK_ALLOWED_HOSTS: List[str] = []
+    JOB_WEBHOOK_REQUIRE_HTTPS: bool = True
     
     class Config:
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,22 +1,50 @@
-from typing import List, Dict, Any
-from models import Document, ValidationResult, ClaimDecision, ClaimStatus
+from typing import Annotated, List, Dict, Any, Optional, ClassVar
+from pydantic import BeforeValidator
+from models import Document, ValidationResult, ClaimDecision, ClaimStatus, DecisionMethod
 from llm_client import LLMClient
+from rules_engine import RulesEngine, create_rules_engine
+from structured_output import OutputModel, is_salvaged, normalize_choice
+from metrics import CLAIM_DECISIONS
 import json
 
+class DecisionOutput(OutputModel):
+    max_tokens: ClassVar[int] = 400
+    status: Annotated[ClaimStatus, BeforeValidator(normalize_choice)] = ClaimStatus.MANUAL_REVIEW
+    reason: str = "LLM decision"
+    confidence: Optional[float] = None
+
 class DecisionMaker:
-    def __init__(self):
-        self.llm_client = LLMClient()
+    def __init__(self, llm_client: Optional[LLMClient] = None, rules_engine: Optional[RulesEngine] = None):
+        self.llm_client = llm_client or LLMClient()
+        self.rules_engine = rules_engine if rules_engine is not None else create_rules_engine()
+        self.stats = {method.value: 0 for method in DecisionMethod}
     
     async def make_decision(
         self, 
         documents: List[Document], 
         validation: ValidationResult
     ) -> ClaimDecision:
+        decision = await self._decide(documents, validation)
+        self.stats[decision.method.value] += 1
+        CLAIM_DECISIONS.inc(method=decision.method.value)
+        return decision
+    
+    async def _decide(self, documents: List[Document], validation: ValidationResult) -> ClaimDecision:
         if validation.missing_documents:
             return ClaimDecision(
                 status=ClaimStatus.REJECTED,
                 reason=f"Missing required documents: {', '.join(validation.missing_documents)}",
-                confidence=1.0
+                confidence=1.0,
+                method=DecisionMethod.VALIDATION
+            )
+        
+        incomplete = [doc.filename for doc in documents if is_salvaged(doc.extracted_data)]
+        if incomplete:
+            return ClaimDecision(
+                status=ClaimStatus.MANUAL_REVIEW,
+                reason=f"Extraction was incomplete and needs manual review: {', '.join(incomplete)}",
+                confidence=0.85,
+                method=DecisionMethod.VALIDATION
             )
         
         if validation.discrepancies:
@@ -26,16 +54,24 @@ class DecisionMaker:
                 return ClaimDecision(
                     status=ClaimStatus.REJECTED,
                     reason=f"Critical discrepancies found: {critical_discrepancies[0]['description']}",
-                    confidence=0.95
+                    confidence=0.95,
+                    method=DecisionMethod.VALIDATION
                 )
             
             return ClaimDecision(
                 status=ClaimStatus.MANUAL_REVIEW,
                 reason=f"Minor discrepancies require manual review: {validation.discrepancies[0]['description']}",
-                confidence=0.85
+                confidence=0.85,
+                method=DecisionMethod.VALIDATION
             )
         
-        llm_decision = await self._llm_final_check(documents)
+        findings: List[Dict[str, Any]] = []
+        if self.rules_engine is not None:
+            decision, findings = self.rules_engine.decide(documents)
+            if decision is not None:
+                return decision
+        
+        llm_decision = await self._llm_final_check(documents, findings)
         
         return llm_decision
     
@@ -43,7 +79,7 @@ class DecisionMaker:
         critical_types = ["name_mismatch", "id_mismatch", "date_sequence_error"]
         return [d for d in discrepancies if d.get("type") in critical_types]
     
-    async def _llm_final_check(self, documents: List[Document]) -> ClaimDecision:
+    async def _llm_final_check(self, documents: List[Document], findings: List[Dict[str, Any]]) -> ClaimDecision:
         system_prompt = """You are a medical claims adjudication expert.
 Review all documents and make a final claim decision."""
 
@@ -58,7 +94,7 @@ Review all documents and make a final claim decision."""
 
 Documents:
 {json.dumps(docs_summary, indent=2)}
-
+{self._format_findings(findings)}
 Consider:
 1. Are all necessary documents present and complete?
 2. Is the information consistent and reasonable?
@@ -72,17 +108,29 @@ Respond with ONLY valid JSON:
     "confidence": 0.0-1.0
 }}"""
 
-        result = await self.llm_client.generate_json(prompt, system_prompt)
-        
-        status_str = result.get("status", "manual_review")
-        
-        try:
-            status = ClaimStatus(status_str)
-        except ValueError:
-            status = ClaimStatus.MANUAL_REVIEW
+        result = await self.llm_client.generate_json(
+            prompt, system_prompt, caller="decision_maker", schema=DecisionOutput
+        )
         
         return ClaimDecision(
-            status=status,
-            reason=result.get("reason", "LLM decision"),
-            confidence=result.get("confidence", 0.8)
+            status=ClaimStatus(result["status"]),
+            reason=result["reason"],
+            confidence=0.8 if result["confidence"] is None else result["confidence"],
+            method=DecisionMethod.LLM
         )
+    
+    @staticmethod
+    def _format_findings(findings: List[Dict[str, Any]]) -> str:
+        if not findings:
+            return ""
+        checks = "\n".join(f"- {finding['rule']} ({finding['action']}): {finding['description']}" for finding in findings)
+        return f"\nPolicy checks (undecided checks need your judgement):\n{checks}\n"
+    
+    def get_stats(self) -> Dict[str, Any]:
+        decided = sum(self.stats.values())
+        local = decided - self.stats[DecisionMethod.LLM.value]
+        return {
+            **self.stats,
+            "decided_locally": local,
+            "local_share": round(local / decided, 4) if decided else None
+        }
@@ -1,7 +1,30 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
+from datetime import date, timedelta
+import argparse
+import json
 import os
+import random
+
+LINES_PER_PAGE = 36
+
+FIRST_NAMES = ["John", "Priya", "Maria", "Wei", "Ahmed", "Sofia", "David", "Aisha", "Carlos", "Emma"]
+LAST_NAMES = ["Doe", "Sharma", "Garcia", "Chen", "Khan", "Rossi", "Miller", "Okafor", "Silva", "Brown"]
+HOSPITALS = ["CITY HOSPITAL", "ST. MARY MEDICAL CENTER", "GREEN VALLEY CLINIC", "METRO GENERAL HOSPITAL"]
+INSURERS = ["HealthInsure Co.", "CareFirst Mutual", "Apex Health Assurance"]
+DIAGNOSES = [
+    ("Acute Appendicitis", "Laparoscopic Appendectomy"),
+    ("Community Acquired Pneumonia", "IV Antibiotic Therapy"),
+    ("Fractured Radius", "Open Reduction Internal Fixation"),
+    ("Type 2 Diabetes Mellitus", "Glycemic Stabilisation"),
+    ("Acute Gastroenteritis", "IV Fluid Resuscitation")
+]
+SERVICES = [
+    "Room charges", "Surgery", "Medications", "Lab tests", "Doctor consultation", "Radiology",
+    "Nursing care", "Physiotherapy", "ICU charges", "Consumables", "Anaesthesia", "Blood tests"
+]
+MEDICATIONS = ["Amoxicillin 500mg", "Ibuprofen 400mg", "Paracetamol 650mg", "Metformin 500mg", "Omeprazole 20mg"]
 
 def create_sample_bill():
     filename = "sample_medical_bill.pdf"
@@ -120,7 +143,167 @@ def create_sample_id():
     c.save()
     print(f"Created {filename}")
 
-if __name__ == "__main__":
+def write_pdf(filename, header, title, lines):
+    c = canvas.Canvas(filename, pagesize=letter)
+    width, height = letter
+    
+    for start in range(0, max(len(lines), 1), LINES_PER_PAGE):
+        if start:
+            c.showPage()
+        
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(1*inch, height - 1*inch, header)
+        
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(1*inch, height - 1.5*inch, title)
+        
+        c.setFont("Helvetica", 10)
+        y = height - 2*inch
+        for line in lines[start:start + LINES_PER_PAGE]:
+            c.drawString(1*inch, y, line)
+            y -= 0.25*inch
+    
+    c.save()
+    return -(-max(len(lines), 1) // LINES_PER_PAGE)
+
+def money(amount):
+    return f"${amount:,.2f}"
+
+def synthetic_claim(rng, index, max_items):
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = rng.choice(LAST_NAMES)
+    admission = date(2024, 1, 1) + timedelta(days=rng.randint(0, 330))
+    discharge = admission + timedelta(days=rng.randint(1, 10))
+    diagnosis, procedure = rng.choice(DIAGNOSES)
+    hospital = rng.choice(HOSPITALS)
+    
+    items = []
+    for item_index in range(rng.randint(1, max_items)):
+        items.append((f"{rng.choice(SERVICES)} #{item_index + 1}", round(rng.uniform(50, 3000), 2)))
+    medications = rng.sample(MEDICATIONS, rng.randint(1, len(MEDICATIONS)))
+    
+    return {
+        "claim_id": f"claim_{index:05d}",
+        "patient_name": f"{first_name} {last_name}",
+        "patient_id": f"P{rng.randint(10000, 99999)}",
+        "member_id": f"M{rng.randint(100000, 999999)}",
+        "policy_number": f"POL-{rng.randint(100000, 999999)}",
+        "insurer": rng.choice(INSURERS),
+        "hospital": hospital,
+        "admission": admission,
+        "discharge": discharge,
+        "diagnosis": diagnosis,
+        "procedure": procedure,
+        "items": items,
+        "medications": medications
+    }
+
+def claim_documents(claim):
+    bill_lines = [
+        f"Patient Name: {claim['patient_name']}",
+        f"Patient ID: {claim['patient_id']}",
+        f"Bill Number: B-{claim['discharge'].year}-{claim['claim_id'][-5:]}",
+        f"Bill Date: {claim['discharge'].isoformat()}",
+        "",
+        "Services:"
+    ]
+    bill_lines += [f"  {description}: {money(amount)}" for description, amount in claim["items"]]
+    bill_lines += [
+        "",
+        f"Total Amount: {money(sum(amount for _, amount in claim['items']))}",
+        "Payment Status: Pending"
+    ]
+    
+    discharge_lines = [
+        f"Patient Name: {claim['patient_name']}",
+        f"Patient ID: {claim['patient_id']}",
+        f"Admission Date: {claim['admission'].isoformat()}",
+        f"Discharge Date: {claim['discharge'].isoformat()}",
+        "",
+        f"Diagnosis: {claim['diagnosis']}",
+        "",
+        "Procedures Performed:",
+        f"  - {claim['procedure']}",
+        "",
+        "Medications Prescribed:"
+    ]
+    discharge_lines += [f"  - {medication}" for medication in claim["medications"]]
+    discharge_lines += ["", "Attending Physician: Dr. Sarah Smith", "", "Follow-up: Required in 2 weeks"]
+    
+    id_lines = [
+        f"Member Name: {claim['id_name']}",
+        f"Member ID: {claim['member_id']}",
+        f"Patient ID: {claim['patient_id']}",
+        "",
+        f"Policy Number: {claim['policy_number']}",
+        "Group Number: GRP-001",
+        "",
+        f"Valid From: {claim['admission'].year}-01-01",
+        f"Valid Until: {claim['admission'].year}-12-31",
+        "",
+        f"Insurance Company: {claim['insurer']}"
+    ]
+    
+    return {
+        "medical_bill.pdf": (claim["hospital"], "Medical Bill", bill_lines),
+        "discharge_summary.pdf": (claim["hospital"], "Discharge Summary", discharge_lines),
+        "insurance_id.pdf": (claim["insurer"].upper(), "Insurance ID Card", id_lines)
+    }
+
+def generate_corpus(output_dir, claims, seed=0, max_items=40, missing_rate=0.1, mismatch_rate=0.1):
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = []
+    
+    for index in range(claims):
+        claim = synthetic_claim(rng, index, max_items)
+        claim["id_name"] = claim["patient_name"]
+        
+        mismatched = rng.random() < mismatch_rate
+        if mismatched:
+            claim["id_name"] = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}X"
+        
+        documents = claim_documents(claim)
+        missing = None
+        if rng.random() < missing_rate:
+            missing = rng.choice(sorted(documents))
+            del documents[missing]
+        
+        claim_dir = os.path.join(output_dir, claim["claim_id"])
+        os.makedirs(claim_dir, exist_ok=True)
+        pages = 0
+        for filename, (header, title, lines) in documents.items():
+            pages += write_pdf(os.path.join(claim_dir, filename), header, title, lines)
+        
+        manifest.append({
+            "claim_id": claim["claim_id"],
+            "documents": sorted(documents),
+            "pages": pages,
+            "items": len(claim["items"]),
+            "missing": missing,
+            "name_mismatch": mismatched
+        })
+    
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    
+    print(f"Created {claims} claims in {output_dir}")
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate sample claim PDFs or a synthetic benchmark corpus")
+    parser.add_argument("--corpus", help="Write a synthetic corpus with one folder per claim to this directory")
+    parser.add_argument("--claims", type=int, default=100, help="Number of synthetic claims")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the corpus")
+    parser.add_argument("--max-items", type=int, default=40, help="Maximum line items per bill")
+    parser.add_argument("--missing-rate", type=float, default=0.1, help="Share of claims missing one document")
+    parser.add_argument("--mismatch-rate", type=float, default=0.1, help="Share of claims with a mismatched ID card name")
+    args = parser.parse_args()
+    
+    if args.corpus:
+        generate_corpus(args.corpus, args.claims, args.seed, args.max_items, args.missing_rate, args.mismatch_rate)
+        return
+    
     print("Generating sample PDFs...")
     print("")
     
@@ -136,3 +319,6 @@ if __name__ == "__main__":
     print("  -F 'files=@sample_medical_bill.pdf' \\")
     print("  -F 'files=@sample_discharge_summary.pdf' \\")
     print("  -F 'files=@sample_insurance_id.pdf'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+class IncrementalJSONParser:
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.on_field = on_field
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._parts: List[str] = []
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"
+        self._key: Optional[str] = None
+        self._key_chars: List[str] = []
+        self._value_chars: List[str] = []
+    
+    def feed(self, chunk: str) -> bool:
+        for char in chunk:
+            if self.complete:
+                break
+            self._consume(char)
+        return self.complete
+    
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+    
+    def result(self) -> Dict[str, Any]:
+        if not self.complete:
+            raise ValueError("JSON object is incomplete")
+        return json.loads("".join(self._parts))
+    
+    def _consume(self, char: str) -> None:
+        if not self._started:
+            if char == "{":
+                self._started = True
+                self._depth = 1
+                self._parts.append(char)
+            return
+        
+        self._parts.append(char)
+        
+        if self._in_string:
+            self._capture(char)
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._expect == "key_string":
+                    self._key = json.loads("".join(self._key_chars))
+                    self._expect = "colon"
+            return
+        
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1 and self._expect == "key":
+                self._expect = "key_string"
+                self._key_chars = []
+            self._capture(char)
+            return
+        
+        if char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._finish_value()
+                self.complete = True
+                return
+        elif self._depth == 1 and char == ":" and self._expect == "colon":
+            self._expect = "value"
+            self._value_chars = []
+            return
+        elif self._depth == 1 and char == ",":
+            self._finish_value()
+            self._expect = "key"
+            return
+        
+        self._capture(char)
+    
+    def _capture(self, char: str) -> None:
+        if self._expect == "key_string":
+            self._key_chars.append(char)
+        elif self._expect == "value":
+            self._value_chars.append(char)
+    
+    def _finish_value(self) -> None:
+        if self._expect != "value" or self._key is None:
+            return
+        
+        try:
+            value = json.loads("".join(self._value_chars))
+        except ValueError:
+            return
+        finally:
+            key, self._key = self._key, None
+        
+        self.fields[key] = value
+        if self.on_field is not None:
+            self.on_field(key, value)
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from config import settings
+from models import ClaimJob, JobStatus
+from orchestrator import ClaimOrchestrator
+from uploads import remove_files
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(Exception):
+    pass
+
+class WebhookNotAllowedError(Exception):
+    pass
+
+def validate_webhook_url(url: str) -> None:
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        raise WebhookNotAllowedError("webhook_url is not a valid URL")
+    
+    schemes = ("https",) if settings.JOB_WEBHOOK_REQUIRE_HTTPS else ("https", "http")
+    if parts.scheme not in schemes:
+        raise WebhookNotAllowedError(f"webhook_url must use {' or '.join(schemes)}")
+    
+    allowed_hosts = [allowed.lower() for allowed in settings.JOB_WEBHOOK_ALLOWED_HOSTS]
+    if not host or not any(
+        host == allowed or (allowed.startswith("*.") and host.endswith(allowed[1:]))
+        for allowed in allowed_hosts
+    ):
+        raise WebhookNotAllowedError(f"webhook_url host {host or url} is not in JOB_WEBHOOK_ALLOWED_HOSTS")
+
+class JobBackend(ABC):
+    @abstractmethod
+    async def enqueue(self, job: ClaimJob, payload: Dict[str, Any]) -> None:
+        pass
+    
+    @abstractmethod
+    async def dequeue(self) -> Tuple[str, Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def save_job(self, job: ClaimJob) -> None:
+        pass
+    
+    @abstractmethod
+    async def get_job(self, job_id: str) -> Optional[ClaimJob]:
+        pass
+
+class InMemoryJobBackend(JobBackend):
+    def __init__(self, max_queue_size: Optional[int] = None, max_retained: Optional[int] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size or settings.JOB_QUEUE_MAX_SIZE)
+        self.max_retained = max_retained or settings.JOB_MAX_RETAINED
+        self.jobs: "OrderedDict[str, ClaimJob]" = OrderedDict()
+    
+    async def enqueue(self, job: ClaimJob, payload: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait((job.job_id, payload))
+        except asyncio.QueueFull:
+            raise QueueFullError("Claim queue is full, retry later")
+        await self.save_job(job)
+    
+    async def dequeue(self) -> Tuple[str, Dict[str, Any]]:
+        return await self.queue.get()
+    
+    async def save_job(self, job: ClaimJob) -> None:
+        self.jobs[job.job_id] = job
+        self.jobs.move_to_end(job.job_id)
+        self._evict_finished()
+    
+    async def get_job(self, job_id: str) -> Optional[ClaimJob]:
+        return self.jobs.get(job_id)
+    
+    def _evict_finished(self) -> None:
+        excess = len(self.jobs) - self.max_retained
+        if excess <= 0:
+            return
+        
+        finished = [
+            job_id for job_id, job in self.jobs.items()
+            if job.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+        ]
+        for job_id in finished[:excess]:
+            del self.jobs[job_id]
+
+def create_job_backend() -> JobBackend:
+    if settings.JOB_BACKEND == "memory":
+        return InMemoryJobBackend()
+    raise ValueError(f"Unsupported job backend: {settings.JOB_BACKEND}")
+
+class JobManager:
+    def __init__(
+        self,
+        orchestrator: ClaimOrchestrator,
+        backend: Optional[JobBackend] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        workers: Optional[int] = None
+    ):
+        self.orchestrator = orchestrator
+        self.backend = backend or create_job_backend()
+        self.http_client = http_client
+        self.workers = workers or settings.JOB_WORKERS
+        self._tasks: List[asyncio.Task] = []
+    
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def submit(self, pdf_files: List[Dict[str, Any]], webhook_url: Optional[str] = None) -> ClaimJob:
+        if webhook_url:
+            validate_webhook_url(webhook_url)
+        now = datetime.now(timezone.utc)
+        job = ClaimJob(
+            job_id=uuid.uuid4().hex,
+            status=JobStatus.QUEUED,
+            created_at=now,
+            updated_at=now,
+            webhook_url=webhook_url
+        )
+        await self.backend.enqueue(job, {"pdf_files": pdf_files})
+        return job
+    
+    async def get(self, job_id: str) -> Optional[ClaimJob]:
+        return await self.backend.get_job(job_id)
+    
+    async def _worker(self) -> None:
+        while True:
+            job_id, payload = await self.backend.dequeue()
+            try:
+                await self._run(job_id, payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Claim job %s failed outside the pipeline", job_id)
+    
+    async def _run(self, job_id: str, payload: Dict[str, Any]) -> None:
+        job = await self.backend.get_job(job_id)
+        if job is None:
+            return
+        
+        await self._update(job, status=JobStatus.RUNNING)
+        
+        try:
+            result = await self.orchestrator.process_claim(payload["pdf_files"], claim_id=job_id)
+            await self._update(job, status=JobStatus.COMPLETED, result=result)
+        except Exception as e:
+            await self._update(job, status=JobStatus.FAILED, error=str(e))
+        finally:
+            remove_files(payload["pdf_files"])
+        
+        if job.webhook_url:
+            await self._notify(job)
+    
+    async def _update(self, job: ClaimJob, **changes: Any) -> None:
+        for field, value in changes.items():
+            setattr(job, field, value)
+        job.updated_at = datetime.now(timezone.utc)
+        await self.backend.save_job(job)
+    
+    async def _notify(self, job: ClaimJob) -> None:
+        client = self.http_client or httpx.AsyncClient()
+        try:
+            response = await client.post(
+                job.webhook_url,
+                content=job.json(),
+                headers={"Content-Type": "application/json"},
+                timeout=settings.JOB_WEBHOOK_TIMEOUT_SECONDS
+            )
+            if response.is_error:
+                logger.warning("Webhook for claim job %s returned %s", job.job_id, response.status_code)
+        except httpx.HTTPError as e:
+            logger.warning("Webhook for claim job %s failed: %r", job.job_id, e)
+        finally:
+            if client is not self.http_client:
+                await client.aclose()
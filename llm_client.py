@@ -1,72 +1,481 @@
 import os
 import json
-from typing import Dict, Any, Optional
+import time
+import random
+import asyncio
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Type, Tuple
 import httpx
+from pydantic import BaseModel
 from config import settings
+from rate_limiter import RateLimiter, parse_retry_after
+from llm_router import LLMRouter, LatencyTracker, Provider, create_router
+from incremental_json import IncrementalJSONParser
+from structured_output import format_errors, json_schema, mark_salvaged, parse_json, salvage_output, validate_output
+from text_prep import estimate_tokens
+from metrics import LLM_CALLS, LLM_ERRORS, LLM_TOKENS, LLM_CALL_SECONDS, LLM_JSON_REPAIRS
+
+PROVIDER_ERROR_STATUSES = {401, 403, 404}
+
+REPAIR_SYSTEM_PROMPT = "You correct JSON responses that failed validation. Return ONLY valid JSON."
+
+class LLMAPIError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    return sum(estimate_tokens(message["content"]) for message in messages) + max_tokens
+
+def repair_prompt(response_text: str, error: Exception) -> str:
+    errors = "\n".join(f"- {message}" for message in format_errors(error))
+    return f"""Your previous response could not be used:
+{errors}
+
+Previous response:
+{response_text}
+
+Return ONLY the corrected JSON object. Keep every valid value unchanged and use null for values you cannot correct."""
+
+def response_format(provider: Provider, schema: Optional[Type[BaseModel]], stream: bool = False) -> Optional[Dict[str, Any]]:
+    if schema is None or not provider.json_mode or (stream and not provider.json_mode_streaming):
+        return None
+    if provider.json_mode == "json_schema":
+        return {"type": "json_schema", "json_schema": {"name": schema.__name__, "schema": json_schema(schema)}}
+    return {"type": "json_object"}
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        http2=settings.LLM_HTTP2
+    )
 
 class LLMClient:
-    def __init__(self):
-        self.api_key = settings.GROQ_API_KEY
-        self.model = settings.LLM_MODEL
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        router: Optional[LLMRouter] = None
+    ):
+        self.router = router or create_router(rate_limiter)
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+        self.latency = LatencyTracker()
+        self.stats = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "failovers": 0,
+            "errors": {},
+            "hedges": 0,
+            "hedge_wins": 0,
+            "streams_stopped_early": 0,
+            "json_repairs": 0,
+            "json_salvaged": 0,
+            "json_failures": 0
+        }
+    
+    @property
+    def model(self) -> str:
+        return self.router.default_provider.model
+    
+    @property
+    def base_url(self) -> str:
+        return self.router.default_provider.url
+    
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self.router.default_provider.rate_limiter
+    
+    def model_for(self, caller: str) -> str:
+        return self.router.model_for(caller)
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = create_http_client()
+            self._owns_http_client = True
+        return self._http_client
+    
+    async def aclose(self) -> None:
+        if self._owns_http_client and self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+    
+    def _build_payload(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, Any]:
+        messages = []
+        
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        
+        messages.append({"role": "user", "content": prompt})
+        
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
     
     async def generate(
         self, 
         prompt: str, 
         system_prompt: Optional[str] = None,
         temperature: float = 0.1,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        caller: str = "unknown",
+        schema: Optional[Type[BaseModel]] = None
     ) -> str:
-        messages = []
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens)
+        estimated_tokens = estimate_request_tokens(payload["messages"], max_tokens)
         
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+        result = await self._with_retries(
+            caller,
+            lambda provider: self._send_hedged(provider, caller, payload, estimated_tokens, schema)
+        )
+        self._record_usage(result.get("usage"), caller)
+        return result["choices"][0]["message"]["content"]
+    
+    @staticmethod
+    def _record_usage(usage: Optional[Dict[str, Any]], caller: str) -> None:
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage and usage.get(kind):
+                LLM_TOKENS.inc(usage[kind], caller=caller, kind=kind.split("_")[0])
+    
+    async def _with_retries(self, caller: str, send: Callable[[Provider], Awaitable[Any]]) -> Any:
+        self.stats["calls"] += 1
+        LLM_CALLS.inc(caller=caller)
+        retries = rate_limit_retries = 0
+        failed = set()
+        started = time.perf_counter()
         
-        messages.append({"role": "user", "content": prompt})
+        while True:
+            provider = self.router.select(caller, failed)
+            try:
+                result = await send(provider)
+                LLM_CALL_SECONDS.observe(time.perf_counter() - started, caller=caller)
+                return result
+            except (LLMAPIError, httpx.TimeoutException, httpx.TransportError) as e:
+                reason = self._failure_reason(e)
+                self.stats["errors"][reason] = self.stats["errors"].get(reason, 0) + 1
+                LLM_ERRORS.inc(caller=caller, reason=reason)
+                failed.add(provider.name)
+                failover = self.router.has_alternative(caller, failed)
+                
+                if reason == "rate_limited":
+                    if rate_limit_retries >= settings.LLM_MAX_RATE_LIMIT_RETRIES:
+                        raise
+                    provider.rate_limiter.pause(e.retry_after or self._backoff_delay(rate_limit_retries))
+                    rate_limit_retries += 1
+                elif reason in ("server_error", "timeout", "transport"):
+                    if retries >= settings.LLM_MAX_RETRIES:
+                        raise
+                    if not failover:
+                        await asyncio.sleep(self._backoff_delay(retries))
+                    retries += 1
+                elif reason != "provider_error" or not failover:
+                    raise
+                
+                if failover:
+                    self.stats["failovers"] += 1
+                else:
+                    failed.clear()
+                self.stats["retries"] += 1
+    
+    @staticmethod
+    def _failure_reason(error: Exception) -> str:
+        if isinstance(error, httpx.TimeoutException):
+            return "timeout"
+        if isinstance(error, httpx.TransportError):
+            return "transport"
+        if error.status_code == 429:
+            return "rate_limited"
+        if error.status_code is not None and error.status_code >= 500:
+            return "server_error"
+        if error.status_code in PROVIDER_ERROR_STATUSES:
+            return "provider_error"
+        return "client_error"
+    
+    @staticmethod
+    def _backoff_delay(retry: int) -> float:
+        ceiling = min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * (2 ** retry))
+        return random.uniform(0, ceiling)
+    
+    @staticmethod
+    def _hedge_delay(provider: Provider) -> float:
+        if len(provider.latency.samples) >= settings.LLM_HEDGE_MIN_SAMPLES:
+            return max(settings.LLM_HEDGE_MIN_DELAY_SECONDS, provider.latency.percentile(0.95))
+        return settings.LLM_HEDGE_DELAY_SECONDS
+    
+    async def _send_hedged(
+        self,
+        provider: Provider,
+        caller: str,
+        payload: Dict[str, Any],
+        estimated_tokens: int,
+        schema: Optional[Type[BaseModel]] = None
+    ) -> Dict[str, Any]:
+        if not settings.LLM_HEDGING_ENABLED:
+            return await self._send(provider, payload, estimated_tokens, schema)
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "temperature": temperature,
-                    "max_tokens": max_tokens
-                }
-            )
+        primary = asyncio.create_task(self._send(provider, payload, estimated_tokens, schema))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self._hedge_delay(provider))
+            if primary in done:
+                return primary.result()
             
-            if response.status_code != 200:
-                raise Exception(f"LLM API error: {response.text}")
+            self.stats["hedges"] += 1
+            hedge_provider = self.router.select(caller, {provider.name})
+            hedge = asyncio.create_task(self._send(hedge_provider, payload, estimated_tokens, schema))
+            pending.add(hedge)
             
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    @staticmethod
+    def _headers(provider: Provider) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {provider.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    @staticmethod
+    def _request_body(provider: Provider, payload: Dict[str, Any], schema: Optional[Type[BaseModel]]) -> Dict[str, Any]:
+        body = {**payload, "model": provider.model}
+        format_spec = response_format(provider, schema, payload.get("stream", False))
+        if format_spec is not None:
+            body["response_format"] = format_spec
+        return body
+    
+    def _record_latency(self, provider: Provider, seconds: float) -> None:
+        self.latency.record(seconds)
+        provider.record_success(seconds)
+    
+    async def _send(
+        self,
+        provider: Provider,
+        payload: Dict[str, Any],
+        estimated_tokens: int,
+        schema: Optional[Type[BaseModel]] = None
+    ) -> Dict[str, Any]:
+        async with provider.rate_limiter.acquire(estimated_tokens):
+            self.stats["attempts"] += 1
+            started = time.monotonic()
+            try:
+                response = await self.http_client.post(
+                    provider.url,
+                    headers=self._headers(provider),
+                    json=self._request_body(provider, payload, schema)
+                )
+                if response.status_code != 200:
+                    raise LLMAPIError(
+                        f"LLM API error: {response.text}",
+                        status_code=response.status_code,
+                        retry_after=parse_retry_after(response.headers.get("retry-after"))
+                    )
+            except (LLMAPIError, httpx.TimeoutException, httpx.TransportError) as e:
+                provider.record_failure(self._failure_reason(e))
+                raise
+        
+        self._record_latency(provider, time.monotonic() - started)
+        result = response.json()
+        usage = result.get("usage") or {}
+        provider.rate_limiter.record_usage(estimated_tokens, usage.get("total_tokens"))
+        return result
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "latency_p50": self.latency.percentile(0.5),
+            "latency_p95": self.latency.percentile(0.95),
+            "hedge_delay": self._hedge_delay(self.router.default_provider) if settings.LLM_HEDGING_ENABLED else None,
+            "providers": self.router.get_stats()
+        }
     
     async def generate_json(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
-        temperature: float = 0.1
-    ) -> Dict[str, Any]:
+        temperature: float = 0.1,
+        caller: str = "unknown",
+        schema: Optional[Type[BaseModel]] = None,
+        max_tokens: Optional[int] = None
+    ) -> Any:
+        max_tokens = max_tokens or self._max_tokens(schema)
         response_text = await self.generate(
             prompt=prompt,
             system_prompt=system_prompt,
-            temperature=temperature
+            temperature=temperature,
+            max_tokens=max_tokens,
+            caller=caller,
+            schema=schema
+        )
+        return await self._validate_json(response_text, schema, temperature, max_tokens, caller)
+    
+    async def generate_json_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.1,
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        caller: str = "unknown",
+        schema: Optional[Type[BaseModel]] = None,
+        max_tokens: Optional[int] = None
+    ) -> Any:
+        max_tokens = max_tokens or self._max_tokens(schema)
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+        estimated_tokens = estimate_request_tokens(payload["messages"], payload["max_tokens"])
+        
+        parser, usage = await self._with_retries(
+            caller,
+            lambda provider: self._send_stream(provider, payload, estimated_tokens, on_field, schema)
+        )
+        self._record_usage(usage, caller)
+        return await self._validate_json(parser.text, schema, temperature, max_tokens, caller)
+    
+    @staticmethod
+    def _max_tokens(schema: Optional[Type[BaseModel]]) -> int:
+        return getattr(schema, "max_tokens", None) or 2000
+    
+    async def _validate_json(
+        self,
+        response_text: str,
+        schema: Optional[Type[BaseModel]],
+        temperature: float,
+        max_tokens: int,
+        caller: str
+    ) -> Any:
+        try:
+            return validate_output(schema, parse_json(response_text))
+        except ValueError as e:
+            error = e
+        
+        self.stats["json_repairs"] += 1
+        repaired_text = await self.generate(
+            prompt=repair_prompt(response_text, error),
+            system_prompt=REPAIR_SYSTEM_PROMPT,
+            temperature=temperature,
+            max_tokens=int(max_tokens * settings.LLM_JSON_REPAIR_TOKEN_FACTOR),
+            caller=caller,
+            schema=schema
         )
+        try:
+            result = validate_output(schema, parse_json(repaired_text))
+            LLM_JSON_REPAIRS.inc(caller=caller, outcome="repaired")
+            return result
+        except ValueError as e:
+            error = e
+        
+        if schema is not None:
+            for text in (repaired_text, response_text):
+                salvaged = self._salvage(schema, text)
+                if salvaged is not None:
+                    self.stats["json_salvaged"] += 1
+                    LLM_JSON_REPAIRS.inc(caller=caller, outcome="salvaged")
+                    return mark_salvaged(salvaged)
         
+        self.stats["json_failures"] += 1
+        LLM_JSON_REPAIRS.inc(caller=caller, outcome="failed")
+        raise Exception(f"Failed to parse JSON from LLM response: {error}\nResponse: {repaired_text}")
+    
+    @staticmethod
+    def _salvage(schema: Type[BaseModel], response_text: str) -> Optional[Dict[str, Any]]:
         try:
-            cleaned = response_text.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:]
-            if cleaned.startswith("```"):
-                cleaned = cleaned[3:]
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
-            cleaned = cleaned.strip()
+            return salvage_output(schema, parse_json(response_text))
+        except ValueError:
+            pass
+        
+        parser = IncrementalJSONParser()
+        parser.feed(response_text)
+        if not parser.fields:
+            return None
+        return salvage_output(schema, parser.fields)
+    
+    async def _send_stream(
+        self,
+        provider: Provider,
+        payload: Dict[str, Any],
+        estimated_tokens: int,
+        on_field: Optional[Callable[[str, Any], None]],
+        schema: Optional[Type[BaseModel]] = None
+    ) -> Tuple[IncrementalJSONParser, Dict[str, Any]]:
+        parser = IncrementalJSONParser(on_field)
+        usage = None
+        
+        async with provider.rate_limiter.acquire(estimated_tokens):
+            self.stats["attempts"] += 1
+            started = time.monotonic()
             
-            return json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse JSON from LLM response: {e}\nResponse: {response_text}")
\ No newline at end of file
+            try:
+                async with self.http_client.stream(
+                    "POST",
+                    provider.url,
+                    headers=self._headers(provider),
+                    json=self._request_body(provider, payload, schema)
+                ) as response:
+                    if response.status_code != 200:
+                        body = await response.aread()
+                        raise LLMAPIError(
+                            f"LLM API error: {body.decode(errors='replace')}",
+                            status_code=response.status_code,
+                            retry_after=parse_retry_after(response.headers.get("retry-after"))
+                        )
+                    
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        
+                        chunk = json.loads(data)
+                        usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                        choices = chunk.get("choices") or [{}]
+                        delta = choices[0].get("delta", {}).get("content")
+                        if not delta:
+                            continue
+                        if parser.complete:
+                            self.stats["streams_stopped_early"] += 1
+                            break
+                        parser.feed(delta)
+            except (LLMAPIError, httpx.TimeoutException, httpx.TransportError) as e:
+                provider.record_failure(self._failure_reason(e))
+                raise
+        
+        self._record_latency(provider, time.monotonic() - started)
+        if usage is None:
+            prompt_tokens = estimated_tokens - payload["max_tokens"]
+            completion_tokens = estimate_tokens(parser.text)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        provider.rate_limiter.record_usage(estimated_tokens, usage.get("total_tokens"))
+        return parser, usage
+
@@ -0,0 +1,172 @@
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+from config import settings
+from rate_limiter import RateLimiter
+from metrics import LLM_PROVIDER_REQUESTS
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self.samples: deque = deque(maxlen=window)
+    
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+class Provider:
+    EWMA_ALPHA = 0.2
+    ERROR_PENALTY = 4.0
+    
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        api_key: str,
+        model: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        json_mode: Optional[str] = None,
+        json_mode_streaming: bool = False
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+        self.api_key = api_key
+        self.model = model
+        self.json_mode = json_mode
+        self.json_mode_streaming = json_mode_streaming
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.latency = LatencyTracker()
+        self.ewma_latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.stats = {"requests": 0, "errors": 0, "cooldowns": 0}
+    
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+    
+    def score(self) -> float:
+        latency = settings.LLM_TIMEOUT_SECONDS if self.ewma_latency is None else self.ewma_latency
+        return latency * (1 + self.ERROR_PENALTY * self.error_rate)
+    
+    def record_success(self, seconds: float) -> None:
+        self.stats["requests"] += 1
+        self.latency.record(seconds)
+        if self.ewma_latency is None:
+            self.ewma_latency = seconds
+        else:
+            self.ewma_latency += self.EWMA_ALPHA * (seconds - self.ewma_latency)
+        self.error_rate -= self.EWMA_ALPHA * self.error_rate
+        self.consecutive_failures = 0
+        LLM_PROVIDER_REQUESTS.inc(provider=self.name, outcome="success")
+    
+    def record_failure(self, reason: str) -> None:
+        self.stats["requests"] += 1
+        self.stats["errors"] += 1
+        self.error_rate += self.EWMA_ALPHA * (1 - self.error_rate)
+        LLM_PROVIDER_REQUESTS.inc(provider=self.name, outcome=reason)
+        
+        if reason == "client_error":
+            return
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= settings.LLM_PROVIDER_FAILURE_THRESHOLD:
+            self.cooldown_until = time.monotonic() + settings.LLM_PROVIDER_COOLDOWN_SECONDS
+            self.consecutive_failures = 0
+            self.stats["cooldowns"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "model": self.model,
+            "json_mode": self.json_mode,
+            "json_mode_streaming": self.json_mode_streaming,
+            "base_url": self.base_url,
+            "available": self.available,
+            "ewma_latency": self.ewma_latency,
+            "error_rate": round(self.error_rate, 4),
+            "latency_p95": self.latency.percentile(0.95),
+            "rate_limiter": self.rate_limiter.stats
+        }
+
+class LLMRouter:
+    def __init__(self, providers: List[Provider], routes: Optional[Dict[str, List[str]]] = None, strategy: str = "latency"):
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        self.providers = {provider.name: provider for provider in providers}
+        self.routes = routes or {}
+        self.strategy = strategy
+        
+        for caller, names in self.routes.items():
+            unknown = [name for name in names if name not in self.providers]
+            if unknown:
+                raise ValueError(f"Route '{caller}' references unknown LLM providers: {unknown}")
+    
+    @property
+    def default_provider(self) -> Provider:
+        return self.route("default")[0]
+    
+    def route(self, caller: str) -> List[Provider]:
+        names = self.routes.get(caller)
+        if names is None and caller.endswith("_agent"):
+            names = self.routes.get("agents")
+        if names is None:
+            names = self.routes.get("default", list(self.providers))
+        return [self.providers[name] for name in names]
+    
+    def model_for(self, caller: str) -> str:
+        return self.route(caller)[0].model
+    
+    def candidates(self, caller: str, avoid: Iterable[str] = ()) -> List[Provider]:
+        avoid = set(avoid)
+        providers = [provider for provider in self.route(caller) if provider.name not in avoid]
+        if self.strategy == "latency":
+            providers = sorted(providers, key=lambda provider: provider.score())
+        return sorted(providers, key=lambda provider: not provider.available)
+    
+    def select(self, caller: str, avoid: Iterable[str] = ()) -> Provider:
+        candidates = self.candidates(caller, avoid)
+        return candidates[0] if candidates else self.candidates(caller)[0]
+    
+    def has_alternative(self, caller: str, avoid: Iterable[str]) -> bool:
+        return bool(self.candidates(caller, avoid))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: provider.get_stats() for name, provider in self.providers.items()}
+
+def create_provider(name: str, config: Dict[str, Any]) -> Provider:
+    api_key = config.get("api_key")
+    if api_key is None and config.get("api_key_env"):
+        api_key = os.environ.get(config["api_key_env"])
+    
+    return Provider(
+        name=name,
+        base_url=config.get("base_url", settings.LLM_BASE_URL),
+        api_key=api_key or settings.GROQ_API_KEY,
+        model=config.get("model", settings.LLM_MODEL),
+        rate_limiter=RateLimiter(
+            config.get("max_concurrency"),
+            config.get("requests_per_minute"),
+            config.get("tokens_per_minute")
+        ),
+        json_mode=config.get("json_mode", settings.LLM_JSON_MODE),
+        json_mode_streaming=config.get("json_mode_streaming", settings.LLM_JSON_MODE_STREAMING)
+    )
+
+def create_router(rate_limiter: Optional[RateLimiter] = None) -> LLMRouter:
+    if not settings.LLM_PROVIDERS:
+        provider = Provider(
+            "default", settings.LLM_BASE_URL, settings.GROQ_API_KEY, settings.LLM_MODEL, rate_limiter,
+            settings.LLM_JSON_MODE, settings.LLM_JSON_MODE_STREAMING
+        )
+        return LLMRouter([provider], strategy=settings.LLM_ROUTING_STRATEGY)
+    
+    providers = [create_provider(name, config) for name, config in settings.LLM_PROVIDERS.items()]
+    return LLMRouter(providers, settings.LLM_ROUTES, settings.LLM_ROUTING_STRATEGY)
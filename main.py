@@ -1,41 +1,250 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from starlette.background import BackgroundTask
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional
 import asyncio
-from orchestrator import ClaimOrchestrator
-from models import ClaimResponse
+import zipfile
+from llm_client import LLMClient, create_http_client
+from cache import ResultCache
+from pdf_extractor import PDFExtractor
+from orchestrator import ClaimOrchestrator, ClaimNotFoundError, ClaimUpdateError
+from claims_store import create_claims_store
+from jobs import JobManager, QueueFullError, WebhookNotAllowedError
+from batch import ZipClaimSource, UploadClaimSource, stream_ndjson
+from progress import stream_claim_events
+from models import ClaimResponse, ClaimJob
+from metrics import registry
+from config import settings
+from uploads import MEGABYTE, InvalidUploadError, MultipartSpooler, UploadTooLargeError, remove_files
 
-app = FastAPI(title="SuperClaims API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    http_client = create_http_client()
+    llm_client = LLMClient(http_client)
+    cache = ResultCache()
+    pdf_extractor = PDFExtractor()
+    claims_store = create_claims_store()
+    app.state.orchestrator = ClaimOrchestrator(llm_client, cache, pdf_extractor, claims_store)
+    app.state.job_manager = JobManager(app.state.orchestrator, http_client=http_client)
+    await app.state.job_manager.start()
+    try:
+        yield
+    finally:
+        await app.state.job_manager.stop()
+        await http_client.aclose()
+        cache.close()
+        if claims_store is not None:
+            claims_store.close()
+        pdf_extractor.shutdown()
+
+app = FastAPI(title="SuperClaims API", version="1.0.0", lifespan=lifespan)
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_REQUEST_SIZE_MB * MEGABYTE:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request exceeds the {settings.MAX_REQUEST_SIZE_MB} MB upload limit"}
+        )
+    return await call_next(request)
 
-orchestrator = ClaimOrchestrator()
+def upload_form(**properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object", "properties": properties
+    }}}}}
+
+PDF_FILES = {"type": "array", "items": {"type": "string", "format": "binary"}}
+
+async def read_upload(request: Request, file_limits: Optional[Dict[str, int]] = None) -> MultipartSpooler:
+    spooler = MultipartSpooler(
+        file_limits or {"files": settings.MAX_FILE_SIZE_MB * MEGABYTE},
+        pdf_fields=("files",)
+    )
+    try:
+        return await spooler.parse(request)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def read_pdf_files(request: Request) -> List[Dict[str, Any]]:
+    pdf_files = (await read_upload(request)).files.get("files", [])
+    if not pdf_files:
+        raise HTTPException(status_code=400, detail="No files provided")
+    return pdf_files
 
 @app.get("/")
 async def root():
     return {"message": "SuperClaims API", "status": "running"}
 
-@app.post("/process-claim", response_model=ClaimResponse)
-async def process_claim(files: List[UploadFile] = File(...)):
-    if not files:
+@app.post("/process-claim", response_model=ClaimResponse, openapi_extra=upload_form(files=PDF_FILES))
+async def process_claim(request: Request, timings: Optional[bool] = None):
+    pdf_files = await read_pdf_files(request)
+    
+    try:
+        result = await request.app.state.orchestrator.process_claim(pdf_files, include_timings=timings)
+        return JSONResponse(content=result)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        remove_files(pdf_files)
+
+@app.post("/process-claim/stream", openapi_extra=upload_form(files=PDF_FILES))
+async def process_claim_stream(request: Request, format: str = "sse", timings: Optional[bool] = None):
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'")
+    
+    pdf_files = await read_pdf_files(request)
+    
+    return StreamingResponse(
+        stream_claim_events(request.app.state.orchestrator, pdf_files, format, timings),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache"},
+        background=BackgroundTask(remove_files, pdf_files)
+    )
+
+@app.post(
+    "/claims",
+    response_model=ClaimJob,
+    status_code=202,
+    openapi_extra=upload_form(files=PDF_FILES, webhook_url={"type": "string"})
+)
+async def submit_claim(request: Request):
+    upload = await read_upload(request)
+    pdf_files = upload.files.get("files", [])
+    if not pdf_files:
         raise HTTPException(status_code=400, detail="No files provided")
+    webhook_url = (upload.fields.get("webhook_url") or [None])[-1]
     
     try:
-        pdf_files = []
-        for file in files:
-            if not file.filename.endswith('.pdf'):
-                raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
-            
-            content = await file.read()
-            pdf_files.append({
-                "filename": file.filename,
-                "content": content
-            })
-        
-        result = await orchestrator.process_claim(pdf_files)
+        return await request.app.state.job_manager.submit(pdf_files, webhook_url)
+    except WebhookNotAllowedError as e:
+        remove_files(pdf_files)
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        remove_files(pdf_files)
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.get("/claims")
+async def search_claims(
+    request: Request,
+    patient_id: Optional[str] = None,
+    policy_number: Optional[str] = None,
+    hospital: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = 100
+):
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    
+    claims_store = request.app.state.orchestrator.claims_store
+    if claims_store is None:
+        raise HTTPException(status_code=404, detail="Claims store is disabled")
+    return await claims_store.search(patient_id, policy_number, hospital, date_from, date_to, limit)
+
+@app.post("/claims/batch", openapi_extra=upload_form(archive={"type": "string", "format": "binary"}, files=PDF_FILES))
+async def process_claim_batch(request: Request):
+    upload = await read_upload(request, {
+        "archive": settings.MAX_REQUEST_SIZE_MB * MEGABYTE,
+        "files": settings.MAX_FILE_SIZE_MB * MEGABYTE
+    })
+    
+    if upload.files.get("archive"):
+        remove_files(upload.files.get("files", []))
+        spooled = upload.files["archive"][:1]
+        remove_files(upload.files["archive"][1:])
+        archive = spooled[0]
+        try:
+            source = ZipClaimSource(archive["path"], archive["filename"].rsplit(".", 1)[0])
+        except zipfile.BadZipFile:
+            remove_files(spooled)
+            raise HTTPException(status_code=400, detail=f"File {archive['filename']} is not a zip archive")
+        except UploadTooLargeError as e:
+            remove_files(spooled)
+            raise HTTPException(status_code=413, detail=str(e))
+    elif upload.files.get("files"):
+        spooled = upload.files["files"]
+        source = UploadClaimSource(spooled)
+    else:
+        raise HTTPException(status_code=400, detail="No archive or files provided")
+    
+    return StreamingResponse(
+        stream_ndjson(request.app.state.orchestrator, source),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(remove_files, spooled)
+    )
+
+@app.post(
+    "/claims/{claim_id}/documents",
+    response_model=ClaimResponse,
+    openapi_extra=upload_form(files=PDF_FILES, remove={"type": "array", "items": {"type": "string"}})
+)
+@app.patch(
+    "/claims/{claim_id}/documents",
+    response_model=ClaimResponse,
+    openapi_extra=upload_form(files=PDF_FILES, remove={"type": "array", "items": {"type": "string"}})
+)
+async def update_claim_documents(request: Request, claim_id: str, timings: Optional[bool] = None):
+    upload = await read_upload(request)
+    pdf_files = upload.files.get("files", [])
+    remove = upload.fields.get("remove")
+    if not pdf_files and not remove:
+        raise HTTPException(status_code=400, detail="No files or documents to remove provided")
+    
+    try:
+        result = await request.app.state.orchestrator.update_claim(
+            claim_id, pdf_files, remove, include_timings=timings
+        )
         return JSONResponse(content=result)
     
+    except ClaimNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    except ClaimUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        remove_files(pdf_files)
+
+@app.get("/claims/{job_id}", response_model=ClaimJob)
+async def get_claim(request: Request, job_id: str):
+    job = await request.app.state.job_manager.get(job_id)
+    if job is not None:
+        return job
+    
+    claims_store = request.app.state.orchestrator.claims_store
+    stored = await claims_store.get(job_id) if claims_store is not None else None
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Claim {job_id} not found")
+    return JSONResponse(content=stored)
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/stats")
+async def stats(request: Request):
+    orchestrator = request.app.state.orchestrator
+    return {
+        "cache": orchestrator.cache.get_stats(),
+        "classification": orchestrator.classifier.stats,
+        "extraction": {
+            doc_type.value: agent.get_stats() for doc_type, agent in orchestrator.agents.items()
+        },
+        "pipeline": orchestrator.stats,
+        "decisions": orchestrator.decision_maker.get_stats(),
+        "llm": orchestrator.llm_client.get_stats(),
+        "rate_limiter": orchestrator.llm_client.rate_limiter.stats
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from models import DocumentType
+from rule_classifier import RuleBasedClassifier
+from rule_extractor import RuleExtractor
+from text_prep import estimate_tokens
+
+class MockLLMConfig(BaseModel):
+    latency_ms: float = 800.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+    stream_chunk_chars: int = 24
+    seed: Optional[int] = None
+
+classifier = RuleBasedClassifier()
+extractor = RuleExtractor()
+
+def _section(prompt: str, start: str, end: str) -> str:
+    if start not in prompt:
+        return ""
+    section = prompt.split(start, 1)[1]
+    return section.split(end, 1)[0] if end in section else section
+
+def _classify(prompt: str) -> DocumentType:
+    filename = _section(prompt, "Document filename:", "\n").strip()
+    text = _section(prompt, "Document content:\n", "\n\nRespond with") or _section(prompt, "Document text:\n", "\n\nReturn ONLY")
+    doc_type, _ = classifier.classify(text, filename)
+    return doc_type
+
+def _list_values(text: str, item_schema: Any) -> List[Any]:
+    if isinstance(item_schema, dict):
+        return [
+            {"description": description.strip(), "amount": float(amount.replace(",", ""))}
+            for description, amount in re.findall(r"^\s*(.+?):\s*\$([\d,]+(?:\.\d+)?)\s*$", text, re.MULTILINE)
+            if not TOTAL_LABEL.search(description)
+        ]
+    return [value.strip() for value in re.findall(r"^\s*-\s+(.+)$", text, re.MULTILINE)]
+
+def _fill_schema(schema: Dict[str, Any], text: str) -> Dict[str, Any]:
+    matched = {}
+    for doc_type in DocumentType:
+        for field, value in extractor.extract(doc_type, text).items():
+            matched.setdefault(field, value)
+    
+    result = {}
+    for field, hint in schema.items():
+        if isinstance(hint, list):
+            result[field] = _list_values(text, hint[0] if hint else "string")
+            continue
+        
+        value = matched.get(field)
+        if value is None:
+            label = field.replace("_", " ")
+            match = re.search(rf"^\s*{label}\s*:\s*(.+?)\s*$", text, re.IGNORECASE | re.MULTILINE)
+            value = match.group(1) if match else None
+        result[field] = value
+    return result
+
+def _extract(prompt: str) -> Dict[str, Any]:
+    text = _section(prompt, "Document text:\n", "\n\nReturn ONLY")
+    try:
+        schema = json.loads(_section(prompt, "with these fields:\n", "\n\nUse null"))
+    except json.JSONDecodeError:
+        schema = {}
+    return _fill_schema(schema, text)
+
+TOTAL_LABEL = re.compile(r"total|amount|balance|paid", re.IGNORECASE)
+
+PACKED_SECTION = re.compile(
+    r"=== DOCUMENT (\d+) ===\nFilename: ([^\n]*)\n(?:Document type: ([^\n]*)\n)?\n(.*?)\n=== END DOCUMENT \1 ===", re.DOTALL
+)
+
+def _classify_and_extract(text: str, filename: str, known_type: str = "") -> Dict[str, Any]:
+    doc_type = DocumentType(known_type) if known_type else classifier.classify(text, filename)[0]
+    extracted = {} if doc_type == DocumentType.OTHER else extractor.extract(doc_type, text)
+    return {"document_type": doc_type.value, "confidence": 0.9, "extracted_data": extracted}
+
+def _combined(prompt: str) -> Dict[str, Any]:
+    filename = _section(prompt, "Document filename:", "\n").strip()
+    return _classify_and_extract(_section(prompt, "Document text:\n", "\n\nReturn ONLY"), filename)
+
+def _packed(prompt: str) -> Dict[str, Any]:
+    return {"documents": [
+        {"document_index": int(index), **_classify_and_extract(text, filename, known_type)}
+        for index, filename, known_type, text in PACKED_SECTION.findall(prompt)
+    ]}
+
+def _decide(prompt: str) -> Dict[str, Any]:
+    return {"status": "approved", "reason": "All documents are consistent", "confidence": 0.9}
+
+def respond(prompt: str) -> Any:
+    if "Review this medical claim" in prompt:
+        return _decide(prompt)
+    if "=== DOCUMENT 1 ===" in prompt:
+        return _packed(prompt)
+    if "Classify this medical document" in prompt and "extracted_data" in prompt:
+        return _combined(prompt)
+    if "Classify this medical document" in prompt:
+        return {"document_type": _classify(prompt).value, "confidence": 0.9, "reasoning": "mock"}
+    return _extract(prompt)
+
+def create_app(config: Optional[MockLLMConfig] = None) -> FastAPI:
+    config = config or MockLLMConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Mock LLM Server")
+    app.state.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "streams": 0, "prompt_tokens": 0, "truncated": 0}
+    
+    def sample_latency() -> float:
+        if config.latency_ms <= 0:
+            return 0.0
+        return rng.lognormvariate(math.log(config.latency_ms / 1000), config.latency_sigma)
+    
+    @app.post("/openai/v1/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        stats = app.state.stats
+        stats["requests"] += 1
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        latency = sample_latency()
+        
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after_seconds)}
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            await asyncio.sleep(latency)
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "Internal server error"}}, status_code=500)
+        
+        content = json.dumps(respond(prompt))
+        finish_reason = "stop"
+        content_tokens = estimate_tokens(content)
+        if body.get("max_tokens") and content_tokens > body["max_tokens"]:
+            stats["truncated"] += 1
+            content = content[:len(content) * body["max_tokens"] // content_tokens]
+            finish_reason = "length"
+        usage = {
+            "prompt_tokens": sum(estimate_tokens(message["content"]) for message in body["messages"]),
+            "completion_tokens": estimate_tokens(content)
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        stats["prompt_tokens"] += usage["prompt_tokens"]
+        
+        if body.get("stream"):
+            stats["streams"] += 1
+            return StreamingResponse(
+                stream_chunks(
+                    content,
+                    latency,
+                    config.stream_chunk_chars,
+                    body.get("model"),
+                    usage if (body.get("stream_options") or {}).get("include_usage") else None
+                ),
+                media_type="text/event-stream"
+            )
+        
+        await asyncio.sleep(latency)
+        return {
+            "id": f"mock-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+            "usage": usage
+        }
+    
+    @app.get("/stats")
+    async def get_stats():
+        return app.state.stats
+    
+    return app
+
+async def stream_chunks(
+    content: str,
+    latency: float,
+    chunk_chars: int,
+    model: Optional[str],
+    usage: Optional[Dict[str, int]] = None
+):
+    chunks = [content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars)]
+    first_token_delay = latency * 0.3
+    per_chunk_delay = (latency - first_token_delay) / max(len(chunks), 1)
+    
+    await asyncio.sleep(first_token_delay)
+    for chunk in chunks:
+        await asyncio.sleep(per_chunk_delay)
+        data = {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {"content": chunk}}]}
+        yield f"data: {json.dumps(data)}\n\n"
+    if usage is not None:
+        data = {"object": "chat.completion.chunk", "model": model, "choices": [], "usage": usage}
+        yield f"data: {json.dumps(data)}\n\n"
+    yield "data: [DONE]\n\n"
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an OpenAI-compatible mock LLM server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median response latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with a 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    
+    config = MockLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from enum import Enum
+from datetime import datetime
 
 class DocumentType(str, Enum):
     BILL = "bill"
@@ -15,11 +16,27 @@ class ClaimStatus(str, Enum):
     REJECTED = "rejected"
     MANUAL_REVIEW = "manual_review"
 
+class ClassificationMethod(str, Enum):
+    RULES = "rules"
+    LLM = "llm"
+
+class DecisionMethod(str, Enum):
+    VALIDATION = "validation"
+    RULES = "rules"
+    LLM = "llm"
+
+class Classification(BaseModel):
+    document_type: DocumentType
+    confidence: Optional[float] = None
+    method: ClassificationMethod
+
 class Document(BaseModel):
     filename: str
     document_type: DocumentType
     extracted_data: Dict[str, Any]
     confidence: Optional[float] = None
+    classification_method: Optional[ClassificationMethod] = None
+    sha256: Optional[str] = None
 
 class ValidationResult(BaseModel):
     missing_documents: List[str]
@@ -29,8 +46,26 @@ class ClaimDecision(BaseModel):
     status: ClaimStatus
     reason: str
     confidence: Optional[float] = None
+    method: Optional[DecisionMethod] = None
 
 class ClaimResponse(BaseModel):
+    claim_id: Optional[str] = None
     documents: List[Document]
     validation: ValidationResult
     claim_decision: ClaimDecision
+    processing: Optional[Dict[str, Any]] = None
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class ClaimJob(BaseModel):
+    job_id: str
+    status: JobStatus
+    created_at: datetime
+    updated_at: datetime
+    webhook_url: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
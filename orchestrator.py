@@ -1,65 +1,696 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator, AsyncIterator
+from contextlib import contextmanager
 import asyncio
-from pdf_extractor import PDFExtractor
+import time
+import uuid
+from llm_client import LLMClient
+from cache import ResultCache, content_digest, make_key
+from pdf_extractor import PDFExtractor, PDFSource, PageReader
 from classifier import DocumentClassifier
-from agents import BillAgent, DischargeAgent, IDAgent, PharmacyAgent, ClaimFormAgent
+from agents import BillAgent, DischargeAgent, IDAgent, PharmacyAgent, ClaimFormAgent, CombinedAgent, PackedAgent
 from validator import ClaimValidator
+from claims_store import ClaimsStore
 from decision_maker import DecisionMaker
-from models import Document, DocumentType
+from models import Document, DocumentType, Classification, ValidationResult, ClaimDecision
+from config import settings
+from text_prep import compact_pages, trim_to_budget, token_budget, estimate_tokens
+from metrics import CLAIM_STAGE_SECONDS, CLAIMS_PROCESSED
+from uploads import duplicate_filenames
+from structured_output import is_salvaged
+
+FieldCallback = Callable[[str, str, Any], None]
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+SKIPPED_EXTRACTION = {"note": "Extraction skipped: required documents are missing"}
+
+class ClaimNotFoundError(Exception):
+    pass
+
+class ClaimUpdateError(Exception):
+    pass
+
+class DuplicateDocumentError(Exception):
+    pass
+
+class ClaimContext:
+    def __init__(
+        self,
+        on_field: Optional[FieldCallback] = None,
+        on_event: Optional[EventCallback] = None,
+        include_timings: bool = False,
+        claim_id: Optional[str] = None
+    ):
+        self.claim_id = claim_id or uuid.uuid4().hex
+        self.on_field = on_field
+        self.on_event = on_event
+        self.include_timings = include_timings
+        self.raw_tokens = 0
+        self.prompt_tokens = 0
+        self.reused_documents: Optional[int] = None
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            CLAIM_STAGE_SECONDS.observe(elapsed, stage=name)
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+    
+    def finish(self) -> None:
+        self.timings["total"] = time.perf_counter() - self.started
+        CLAIM_STAGE_SECONDS.observe(self.timings["total"], stage="total")
+    
+    def record_tokens(self, item: Dict[str, Any]) -> None:
+        self.raw_tokens += item["raw_tokens"]
+        self.prompt_tokens += item["prompt_tokens"]
+    
+    def processing_summary(self) -> Dict[str, Any]:
+        summary = {
+            "text_tokens": {
+                "raw": self.raw_tokens,
+                "sent": self.prompt_tokens,
+                "saved": self.raw_tokens - self.prompt_tokens
+            }
+        }
+        if self.reused_documents is not None:
+            summary["reused_documents"] = self.reused_documents
+        if self.include_timings:
+            summary["timings_seconds"] = {stage: round(seconds, 4) for stage, seconds in self.timings.items()}
+        return summary
+    
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        if self.on_event is not None:
+            self.on_event(event, data)
+    
+    def field_callback(self, filename: str) -> Optional[Callable[[str, Any], None]]:
+        if self.on_field is None:
+            return None
+        return lambda field, value: self.on_field(filename, field, value)
 
 class ClaimOrchestrator:
-    def __init__(self):
-        self.pdf_extractor = PDFExtractor()
-        self.classifier = DocumentClassifier()
-        self.validator = ClaimValidator()
-        self.decision_maker = DecisionMaker()
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        cache: Optional[ResultCache] = None,
+        pdf_extractor: Optional[PDFExtractor] = None,
+        claims_store: Optional[ClaimsStore] = None
+    ):
+        self.llm_client = llm_client or LLMClient()
+        self.cache = cache or ResultCache()
+        self.pdf_extractor = pdf_extractor or PDFExtractor()
+        self.claims_store = claims_store
+        self.classifier = DocumentClassifier(self.llm_client)
+        self.validator = ClaimValidator(claims_store)
+        self.decision_maker = DecisionMaker(self.llm_client)
         
         self.agents = {
-            DocumentType.BILL: BillAgent(),
-            DocumentType.DISCHARGE_SUMMARY: DischargeAgent(),
-            DocumentType.ID_CARD: IDAgent(),
-            DocumentType.PHARMACY_BILL: PharmacyAgent(),
-            DocumentType.CLAIM_FORM: ClaimFormAgent()
+            DocumentType.BILL: BillAgent(self.llm_client),
+            DocumentType.DISCHARGE_SUMMARY: DischargeAgent(self.llm_client),
+            DocumentType.ID_CARD: IDAgent(self.llm_client),
+            DocumentType.PHARMACY_BILL: PharmacyAgent(self.llm_client),
+            DocumentType.CLAIM_FORM: ClaimFormAgent(self.llm_client)
         }
+        self.combined_agent = CombinedAgent(self.agents, self.llm_client)
+        self.packed_agent = PackedAgent(self.agents, self.llm_client)
+        
+        self.document_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_DOCUMENTS)
+        self.stats = {
+            "early_rejections": 0,
+            "tokens_saved": 0,
+            "packed_calls": 0,
+            "packed_documents": 0,
+            "packed_known_documents": 0,
+            "pack_fallbacks": 0,
+            "claim_updates": 0,
+            "documents_reused": 0
+        }
+    
+    async def process_claim(
+        self,
+        pdf_files: List[Dict[str, Any]],
+        on_field: Optional[FieldCallback] = None,
+        on_event: Optional[EventCallback] = None,
+        include_timings: Optional[bool] = None,
+        claim_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if include_timings is None:
+            include_timings = settings.RESPONSE_TIMINGS_ENABLED
+        context = ClaimContext(on_field, on_event, include_timings, claim_id)
+        return await self._run_claim(pdf_files, [], context)
     
-    async def process_claim(self, pdf_files: List[Dict[str, Any]]) -> Dict[str, Any]:
-        documents = await self._process_documents(pdf_files)
+    async def update_claim(
+        self,
+        claim_id: str,
+        pdf_files: List[Dict[str, Any]],
+        remove: Optional[List[str]] = None,
+        on_field: Optional[FieldCallback] = None,
+        on_event: Optional[EventCallback] = None,
+        include_timings: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        if self.claims_store is None:
+            raise ClaimUpdateError("Claims store is disabled")
+        stored = await self.claims_store.get(claim_id)
+        if stored is None:
+            raise ClaimNotFoundError(f"Claim {claim_id} not found")
         
-        validation = await self.validator.validate(documents)
+        pending = await self.claims_store.get_pending(claim_id)
+        kept, restored, pdf_files = self._plan_update(
+            [Document(**doc) for doc in stored["documents"]], pending, pdf_files, remove or []
+        )
+        self.stats["claim_updates"] += 1
+        self.stats["documents_reused"] += len(kept) + len(restored)
         
-        decision = await self.decision_maker.make_decision(documents, validation)
+        if include_timings is None:
+            include_timings = settings.RESPONSE_TIMINGS_ENABLED
+        context = ClaimContext(on_field, on_event, include_timings, claim_id)
+        context.reused_documents = len(kept) + len(restored)
+        return await self._run_claim(pdf_files, kept, context, [self._restore_document(item) for item in restored])
+    
+    def _plan_update(
+        self,
+        stored: List[Document],
+        pending: Dict[str, Dict[str, Any]],
+        pdf_files: List[Dict[str, Any]],
+        remove: List[str]
+    ) -> Tuple[List[Document], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        unknown = sorted(set(remove) - {doc.filename for doc in stored})
+        if unknown:
+            raise ClaimUpdateError(f"Documents not part of the claim: {', '.join(unknown)}")
         
-        return {
+        digests = {
+            doc.sha256: doc for doc in stored
+            if doc.sha256 and (doc.extracted_data != SKIPPED_EXTRACTION or doc.filename in pending)
+        }
+        replaced = set(remove)
+        new_files = []
+        for pdf_file in pdf_files:
+            match = digests.get(pdf_file.get("sha256") or content_digest(pdf_file["content"]))
+            if match is not None and match.filename not in remove:
+                continue
+            replaced.add(pdf_file["filename"])
+            if match is not None:
+                replaced.add(match.filename)
+            new_files.append(pdf_file)
+        
+        kept = [doc for doc in stored if doc.filename not in replaced]
+        unextracted = [doc.filename for doc in kept if doc.extracted_data == SKIPPED_EXTRACTION and doc.filename not in pending]
+        if unextracted:
+            raise ClaimUpdateError(
+                f"Documents were never extracted and their text was not kept, include them in the update: "
+                f"{', '.join(unextracted)}"
+            )
+        restored = [pending[doc.filename] for doc in kept if doc.extracted_data == SKIPPED_EXTRACTION]
+        kept = [doc for doc in kept if doc.extracted_data != SKIPPED_EXTRACTION]
+        return kept, restored, new_files
+    
+    async def _run_claim(
+        self,
+        pdf_files: List[Dict[str, Any]],
+        kept: List[Document],
+        context: ClaimContext,
+        restored: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        restored = restored or []
+        duplicates = duplicate_filenames([pdf_file["filename"] for pdf_file in pdf_files])
+        if duplicates:
+            raise DuplicateDocumentError(f"Documents share a filename: {', '.join(duplicates)}")
+        if settings.PIPELINE_MODE in ("packed", "combined"):
+            process = self._process_packed if settings.PIPELINE_MODE == "packed" else self._process_documents
+            extracted, processed = await asyncio.gather(
+                self._extract_documents(restored, context),
+                process(pdf_files, context)
+            )
+            documents = kept + extracted + processed
+        else:
+            classified = restored + await self._classify_documents(pdf_files, context)
+            
+            missing_docs = self.validator.find_missing_documents(
+                [doc.document_type for doc in kept] + [item["classification"].document_type for item in classified]
+            )
+            if missing_docs and settings.EARLY_REJECTION_ENABLED:
+                return await self._reject_early(classified, missing_docs, context, kept)
+            
+            documents = kept + await self._extract_documents(classified, context)
+        
+        with context.stage("validation"):
+            validation = await self.validator.validate(documents, context.claim_id)
+        context.emit("validated", validation.dict())
+        
+        with context.stage("decision"):
+            decision = await self.decision_maker.make_decision(documents, validation)
+        context.emit("decision", decision.dict())
+        
+        return await self._build_result(documents, validation, decision, context)
+    
+    async def _build_result(
+        self,
+        documents: List[Document],
+        validation: ValidationResult,
+        decision: ClaimDecision,
+        context: ClaimContext,
+        pending: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        result = {
+            "claim_id": context.claim_id,
             "documents": [doc.dict() for doc in documents],
             "validation": validation.dict(),
             "claim_decision": decision.dict()
         }
+        if self.claims_store is not None:
+            with context.stage("storage"):
+                await self.claims_store.save(context.claim_id, documents, result, pending)
+        
+        self.stats["tokens_saved"] += context.raw_tokens - context.prompt_tokens
+        context.finish()
+        CLAIMS_PROCESSED.inc(status=decision.status.value)
+        
+        result["processing"] = context.processing_summary()
+        return result
+    
+    async def _reject_early(
+        self,
+        classified: List[Dict[str, Any]],
+        missing_docs: List[str],
+        context: ClaimContext,
+        kept: List[Document]
+    ) -> Dict[str, Any]:
+        self.stats["early_rejections"] += 1
+        
+        documents = list(kept)
+        pending = []
+        for item in classified:
+            if self.claims_store is not None:
+                pending.append(await self._pending_snapshot(item, context))
+            context.record_tokens(item)
+            documents.append(self._build_document(item, dict(SKIPPED_EXTRACTION)))
+        validation = ValidationResult(missing_documents=missing_docs, discrepancies=[])
+        context.emit("validated", validation.dict())
+        
+        with context.stage("decision"):
+            decision = await self.decision_maker.make_decision(documents, validation)
+        context.emit("decision", decision.dict())
+        
+        return await self._build_result(documents, validation, decision, context, pending)
+    
+    async def _pending_snapshot(self, item: Dict[str, Any], context: ClaimContext) -> Dict[str, Any]:
+        classification = item["classification"]
+        with context.stage("pdf_extraction"):
+            text = await self._load_text(item, token_budget(classification.document_type))
+        return {
+            "filename": item["filename"],
+            "digest": item["digest"],
+            "classification": classification.dict(),
+            "text": text,
+            "raw_tokens": item["raw_tokens"]
+        }
     
-    async def _process_documents(self, pdf_files: List[Dict[str, Any]]) -> List[Document]:
-        tasks = [self._process_single_document(pdf_file) for pdf_file in pdf_files]
+    def _restore_document(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "filename": snapshot["filename"],
+            "digest": snapshot["digest"],
+            "reader": None,
+            "texts": {},
+            "text": snapshot["text"],
+            "raw_tokens": snapshot["raw_tokens"],
+            "prompt_tokens": 0,
+            "classification": Classification(**snapshot["classification"])
+        }
+    
+    async def _process_documents(self, pdf_files: List[Dict[str, Any]], context: ClaimContext) -> List[Document]:
+        tasks = [self._process_single_document(pdf_file, context) for pdf_file in pdf_files]
         documents = await asyncio.gather(*tasks)
         return documents
     
-    async def _process_single_document(self, pdf_file: Dict[str, Any]) -> Document:
-        filename = pdf_file["filename"]
-        content = pdf_file["content"]
+    async def _process_packed(self, pdf_files: List[Dict[str, Any]], context: ClaimContext) -> List[Document]:
+        items = await asyncio.gather(*(self._prepare_single_document(pdf_file, context) for pdf_file in pdf_files))
+        for item in items:
+            classification = self.classifier.classify_with_rules(item["text"], item["filename"])
+            if classification is not None:
+                item["classification"] = classification
+        
+        tasks = []
+        packable = []
+        for item, packed in zip(items, await asyncio.gather(*(self._is_packable(item) for item in items))):
+            if packed:
+                packable.append(item)
+            elif "classification" in item:
+                context.emit("classified", {"filename": item["filename"], **item["classification"].dict()})
+                tasks.append(self._extract_single_document(item, context))
+            else:
+                tasks.append(self._process_prepared_document(item, context))
+        
+        tasks.extend(self._process_pack(group, context) for group in self._pack_documents(packable))
+        await asyncio.gather(*tasks)
+        return [item["document"] for item in items]
+    
+    async def _is_packable(self, item: Dict[str, Any]) -> bool:
+        classification = item.get("classification")
+        doc_type = classification.document_type if classification else None
+        if classification is not None and doc_type not in self.agents:
+            return False
+        
+        text, _ = await self._prepare_prompt_text(item, doc_type)
+        if estimate_tokens(text) > settings.PACKED_MAX_DOCUMENT_TOKENS:
+            return False
+        if classification is None:
+            return True
+        
+        agent = self.agents[doc_type]
+        rule_data = agent.extract_with_rules(text)
+        return any(field not in rule_data for field in agent.schema)
+    
+    def _pack_documents(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        groups: List[List[Dict[str, Any]]] = []
+        group_tokens: List[int] = []
+        
+        for item in sorted(items, key=lambda item: item["prompt_tokens"], reverse=True):
+            tokens = item["prompt_tokens"]
+            for index, group in enumerate(groups):
+                if len(group) < settings.PACKED_MAX_DOCUMENTS and group_tokens[index] + tokens <= settings.PACKED_TOKEN_BUDGET:
+                    group.append(item)
+                    group_tokens[index] += tokens
+                    break
+            else:
+                groups.append([item])
+                group_tokens.append(tokens)
+        return groups
+    
+    async def _process_pack(self, group: List[Dict[str, Any]], context: ClaimContext) -> None:
+        async with self.document_semaphore:
+            with context.stage("classify_and_extract"):
+                pending = []
+                for item in group:
+                    known = item.get("classification")
+                    if known is None:
+                        text, budget = await self._prepare_prompt_text(item, None)
+                        cache_key = self._combined_key(item, budget)
+                        cached = await self.cache.get("combined", cache_key)
+                        if cached is not None:
+                            classification = Classification(**cached["classification"])
+                            self._complete_document(item, classification, cached["extracted_data"], context)
+                            continue
+                    else:
+                        text, budget = await self._prepare_prompt_text(item, known.document_type)
+                        cache_key = self._extraction_key(item, known.document_type, budget)
+                        cached = await self.cache.get("extraction", cache_key)
+                        if cached is not None:
+                            self._complete_document(item, known, cached, context)
+                            continue
+                    pending.append((item, text, cache_key))
+                
+                if not pending:
+                    return
+                
+                results = None
+                if len(pending) > 1:
+                    try:
+                        results = await self.packed_agent.classify_and_extract_many(
+                            [(item["filename"], text) for item, text, _ in pending],
+                            [item["classification"].document_type if "classification" in item else None for item, _, _ in pending]
+                        )
+                        self.stats["packed_calls"] += 1
+                        self.stats["packed_documents"] += len(pending)
+                        self.stats["packed_known_documents"] += sum("classification" in item for item, _, _ in pending)
+                    except Exception:
+                        self.stats["pack_fallbacks"] += 1
+                
+                packed = results is not None
+                if not packed:
+                    results = await asyncio.gather(*(
+                        self._extract_unpacked(item, text) for item, text, _ in pending
+                    ))
+                
+                for (item, text, cache_key), (classification, extracted_data) in zip(pending, results):
+                    if "classification" in item:
+                        classification = item["classification"]
+                        if packed:
+                            extracted_data = await self._store_packed_extraction(item, text, cache_key, extracted_data)
+                    else:
+                        classification, extracted_data = await self._store_combined(
+                            item, cache_key, classification, extracted_data
+                        )
+                    self._complete_document(item, classification, extracted_data, context)
+    
+    async def _extract_unpacked(self, item: Dict[str, Any], text: str) -> Tuple[Classification, Dict[str, Any]]:
+        if "classification" not in item:
+            return await self.combined_agent.classify_and_extract(text, item["filename"])
+        
+        return item["classification"], await self._extract(item, item["classification"].document_type)
+    
+    async def _store_packed_extraction(
+        self,
+        item: Dict[str, Any],
+        text: str,
+        extraction_key: str,
+        extracted_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        agent = self.agents[item["classification"].document_type]
+        rule_data = agent.extract_with_rules(text)
+        agent.record_field_sources(rule_data)
+        extracted_data = agent.merge_with_rules(extracted_data, rule_data)
+        if not is_salvaged(extracted_data):
+            await self.cache.set("extraction", extraction_key, extracted_data)
+        return extracted_data
+    
+    async def _classify_documents(self, pdf_files: List[Dict[str, Any]], context: ClaimContext) -> List[Dict[str, Any]]:
+        tasks = [self._classify_single_document(pdf_file, context) for pdf_file in pdf_files]
+        return await asyncio.gather(*tasks)
+    
+    async def _extract_documents(self, classified: List[Dict[str, Any]], context: ClaimContext) -> List[Document]:
+        tasks = [self._extract_single_document(item, context) for item in classified]
+        return await asyncio.gather(*tasks)
+    
+    async def _prepare_document(self, pdf_file: Dict[str, Any], context: ClaimContext) -> Dict[str, Any]:
+        digest = pdf_file.get("sha256") or content_digest(pdf_file["content"])
+        item = {
+            "filename": pdf_file["filename"],
+            "digest": digest,
+            "texts": {},
+            "prompt_tokens": 0
+        }
+        with context.stage("pdf_extraction"):
+            item["reader"] = await self._open_pages(pdf_file.get("path") or pdf_file["content"], digest)
+            pages = await self._read_pages(
+                item["reader"].iter_pages(), settings.CLASSIFIER_TOKEN_BUDGET, settings.CLASSIFIER_MIN_PAGES
+            )
+        with context.stage("text_compaction"):
+            self._set_text(item, compact_pages(list(pages.values())))
+        await self._save_pages(item)
+        context.emit("text_extracted", {"filename": pdf_file["filename"], "characters": len(item["text"])})
+        return item
+    
+    async def _prepare_single_document(self, pdf_file: Dict[str, Any], context: ClaimContext) -> Dict[str, Any]:
+        async with self.document_semaphore:
+            return await self._prepare_document(pdf_file, context)
+    
+    async def _classify_single_document(self, pdf_file: Dict[str, Any], context: ClaimContext) -> Dict[str, Any]:
+        async with self.document_semaphore:
+            item = await self._prepare_document(pdf_file, context)
+            with context.stage("classification"):
+                item["classification"] = await self._classify(item["text"], item["filename"], item["digest"])
+            context.emit("classified", {"filename": item["filename"], **item["classification"].dict()})
+            return item
+    
+    async def _extract_single_document(self, item: Dict[str, Any], context: ClaimContext) -> Document:
+        async with self.document_semaphore:
+            with context.stage("extraction"):
+                extracted_data = await self._extract(
+                    item,
+                    item["classification"].document_type,
+                    context.field_callback(item["filename"])
+                )
+            context.record_tokens(item)
+            item["document"] = self._build_document(item, extracted_data)
+            context.emit("extracted", item["document"].dict())
+            return item["document"]
+    
+    async def _process_single_document(self, pdf_file: Dict[str, Any], context: ClaimContext) -> Document:
+        async with self.document_semaphore:
+            item = await self._prepare_document(pdf_file, context)
+        return await self._process_prepared_document(item, context)
+    
+    async def _process_prepared_document(self, item: Dict[str, Any], context: ClaimContext) -> Document:
+        async with self.document_semaphore:
+            with context.stage("classify_and_extract"):
+                classification, extracted_data = await self._classify_and_extract(
+                    item,
+                    context.field_callback(item["filename"])
+                )
+            return self._complete_document(item, classification, extracted_data, context)
+    
+    def _complete_document(
+        self,
+        item: Dict[str, Any],
+        classification: Classification,
+        extracted_data: Dict[str, Any],
+        context: ClaimContext
+    ) -> Document:
+        item["classification"] = classification
+        context.emit("classified", {"filename": item["filename"], **classification.dict()})
+        context.record_tokens(item)
+        item["document"] = self._build_document(item, extracted_data)
+        context.emit("extracted", item["document"].dict())
+        return item["document"]
+    
+    def _build_document(self, item: Dict[str, Any], extracted_data: Dict[str, Any]) -> Document:
+        classification = item["classification"]
+        return Document(
+            filename=item["filename"],
+            document_type=classification.document_type,
+            extracted_data=extracted_data,
+            confidence=classification.confidence,
+            classification_method=classification.method,
+            sha256=item["digest"]
+        )
+    
+    async def _open_pages(self, source: PDFSource, digest: str) -> PageReader:
+        snapshot = await self.cache.get("text", make_key(digest, settings.PDF_EXTRACTOR_VERSION))
+        if snapshot is None:
+            return self.pdf_extractor.open(source)
+        return PageReader.from_snapshot(self.pdf_extractor, source, snapshot)
+    
+    async def _save_pages(self, item: Dict[str, Any]) -> None:
+        reader = item["reader"]
+        if reader.fetched > item.get("pages_saved", 0):
+            item["pages_saved"] = reader.fetched
+            await self.cache.set("text", make_key(item["digest"], settings.PDF_EXTRACTOR_VERSION), reader.snapshot())
+    
+    async def _read_pages(self, pages: AsyncIterator[Tuple[int, str]], tokens: int, min_pages: int = 0) -> Dict[int, str]:
+        selected: Dict[int, str] = {}
+        used = 0
+        async for index, text in pages:
+            selected[index] = text
+            used += estimate_tokens(text)
+            if tokens and used >= tokens and len(selected) >= min_pages:
+                break
+        return selected
+    
+    def _set_text(self, item: Dict[str, Any], text: str) -> str:
+        reader = item["reader"]
+        loaded = estimate_tokens("\n".join(reader.pages.values()))
+        item["text"] = text
+        item["raw_tokens"] = loaded if reader.complete else loaded * reader.page_count // max(len(reader.pages), 1)
+        return text
+    
+    async def _load_text(self, item: Dict[str, Any], budget: int) -> str:
+        if budget in item["texts"]:
+            return self._set_text(item, item["texts"][budget])
+        if item["reader"] is None:
+            return item["text"]
         
-        text = await self.pdf_extractor.extract_text(content)
+        reader = item["reader"]
+        head = await self._read_pages(reader.iter_pages(), budget)
+        tail: Dict[int, str] = {}
+        if head and not reader.complete:
+            tail_budget = budget - int(budget * settings.TEXT_HEAD_RATIO)
+            tail = await self._read_pages(reader.iter_pages(start=max(head) + 1, reverse=True), tail_budget)
         
-        doc_type = await self.classifier.classify(text, filename)
+        pages = list(head.values())
+        first_tail = min(tail, default=reader.page_count)
+        if first_tail > max(head, default=-1) + 1:
+            pages.append(f"[... pages {max(head) + 2}-{first_tail} omitted ...]")
+        pages.extend(tail[index] for index in sorted(tail))
+        
+        item["texts"][budget] = compact_pages(pages)
+        await self._save_pages(item)
+        return self._set_text(item, item["texts"][budget])
+    
+    async def _classify(self, text: str, filename: str, digest: str) -> Classification:
+        classification_key = make_key(
+            digest, filename, self.llm_client.model_for("classifier"), self.classifier.prompt_version
+        )
+        cached_classification = await self.cache.get("classification", classification_key)
+        if cached_classification is not None:
+            return Classification(**cached_classification)
         
+        classification = await self.classifier.classify(text, filename)
+        await self.cache.set("classification", classification_key, classification.dict())
+        return classification
+    
+    async def _prepare_prompt_text(self, item: Dict[str, Any], doc_type: Optional[DocumentType]) -> Tuple[str, int]:
+        budget = token_budget(doc_type)
+        text = trim_to_budget(await self._load_text(item, budget), budget)
+        item["prompt_tokens"] = estimate_tokens(text)
+        return text, budget
+    
+    async def _extract(
+        self,
+        item: Dict[str, Any],
+        doc_type: DocumentType,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
         agent = self.agents.get(doc_type)
         
-        if agent:
-            extracted_data = await agent.extract(text)
-        else:
-            extracted_data = {
-                "raw_text": text[:500],
+        if not agent:
+            return {
+                "raw_text": item["text"][:500],
                 "note": "No specific agent for this document type"
             }
         
-        return Document(
-            filename=filename,
-            document_type=doc_type,
-            extracted_data=extracted_data
+        text, budget = await self._prepare_prompt_text(item, doc_type)
+        extraction_key = self._extraction_key(item, doc_type, budget)
+        extracted_data = await self.cache.get("extraction", extraction_key)
+        if extracted_data is None:
+            extracted_data = await agent.extract(text, on_field)
+            if not is_salvaged(extracted_data):
+                await self.cache.set("extraction", extraction_key, extracted_data)
+        elif on_field is not None:
+            for field, value in extracted_data.items():
+                on_field(field, value)
+        return extracted_data
+    
+    async def _classify_and_extract(
+        self,
+        item: Dict[str, Any],
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> Tuple[Classification, Dict[str, Any]]:
+        filename = item["filename"]
+        classification = self.classifier.classify_with_rules(item["text"], filename)
+        if classification is not None:
+            extracted_data = await self._extract(item, classification.document_type, on_field)
+            return classification, extracted_data
+        
+        text, budget = await self._prepare_prompt_text(item, None)
+        combined_key = self._combined_key(item, budget)
+        cached = await self.cache.get("combined", combined_key)
+        if cached is not None:
+            return Classification(**cached["classification"]), cached["extracted_data"]
+        
+        classification, extracted_data = await self.combined_agent.classify_and_extract(text, filename)
+        return await self._store_combined(item, combined_key, classification, extracted_data)
+    
+    def _extraction_key(self, item: Dict[str, Any], doc_type: DocumentType, budget: int) -> str:
+        agent = self.agents[doc_type]
+        return make_key(
+            item["digest"], doc_type.value, self.llm_client.model_for(agent.caller), agent.prompt_version, budget
+        )
+    
+    def _combined_key(self, item: Dict[str, Any], budget: int) -> str:
+        return make_key(
+            item["digest"], item["filename"], self.llm_client.model_for(self.combined_agent.caller),
+            self.combined_agent.prompt_version, budget
         )
+    
+    async def _store_combined(
+        self,
+        item: Dict[str, Any],
+        combined_key: str,
+        classification: Classification,
+        extracted_data: Dict[str, Any]
+    ) -> Tuple[Classification, Dict[str, Any]]:
+        if classification.document_type not in self.agents:
+            extracted_data = {
+                "raw_text": item["text"][:500],
+                "note": "No specific agent for this document type"
+            }
+        
+        if not is_salvaged(extracted_data):
+            await self.cache.set("combined", combined_key, {
+                "classification": classification.dict(),
+                "extracted_data": extracted_data
+            })
+        return classification, extracted_data
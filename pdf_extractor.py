@@ -1,20 +1,250 @@
 import io
-from typing import Dict
+import os
+import signal
+import threading
+import time
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 import PyPDF2
+from config import settings
+
+PDFSource = Union[bytes, str]
+
+START_POLL_SECONDS = 0.05
+FIRST_POLL_SECONDS = 0.001
+HARD_TIMEOUT_GRACE_SECONDS = 5.0
+OPEN_READERS_PER_WORKER = 4
+
+_open_readers = threading.local()
+
+class ExtractionTimeoutError(Exception):
+    pass
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise ExtractionTimeoutError("deadline exceeded")
+
+def _run_with_deadline(timeout: float, func: Callable[..., Any], *args: Any) -> Any:
+    deadline = time.monotonic() + timeout if timeout else None
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args, deadline=deadline)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+def _extract_pages_sync(
+    source: PDFSource,
+    max_pages: int,
+    start: int = 0,
+    stop: Optional[int] = None,
+    deadline: Optional[float] = None
+) -> Tuple[int, List[str]]:
+    if isinstance(source, bytes):
+        return _read_pages(PyPDF2.PdfReader(io.BytesIO(source)), max_pages, start, stop, deadline)
+    try:
+        return _read_pages(_cached_reader(source), max_pages, start, stop, deadline)
+    except BaseException:
+        _forget_reader(source)
+        raise
+
+def _cached_reader(path: str) -> PyPDF2.PdfReader:
+    readers = getattr(_open_readers, "readers", None)
+    if readers is None:
+        readers = _open_readers.readers = OrderedDict()
+    
+    for cached_path, (_, pdf_file, _) in list(readers.items()):
+        if not os.path.exists(cached_path):
+            pdf_file.close()
+            del readers[cached_path]
+    
+    stat = os.stat(path)
+    identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    cached = readers.get(path)
+    if cached is not None and cached[0] == identity:
+        readers.move_to_end(path)
+        return cached[2]
+    if cached is not None:
+        cached[1].close()
+    
+    pdf_file = open(path, "rb")
+    try:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+    except BaseException:
+        pdf_file.close()
+        raise
+    readers[path] = (identity, pdf_file, pdf_reader)
+    readers.move_to_end(path)
+    while len(readers) > OPEN_READERS_PER_WORKER:
+        _, (_, evicted, _) = readers.popitem(last=False)
+        evicted.close()
+    return pdf_reader
+
+def _forget_reader(path: str) -> None:
+    cached = getattr(_open_readers, "readers", {}).pop(path, None)
+    if cached is not None:
+        cached[1].close()
+
+def _read_pages(
+    pdf_reader: PyPDF2.PdfReader,
+    max_pages: int,
+    start: int,
+    stop: Optional[int],
+    deadline: Optional[float]
+) -> Tuple[int, List[str]]:
+    page_count = len(pdf_reader.pages)
+    if max_pages and page_count > max_pages:
+        raise ValueError(f"PDF has {page_count} pages, exceeding the limit of {max_pages}")
+    
+    stop = page_count if stop is None else min(stop, page_count)
+    pages = []
+    for index in range(start, stop):
+        if deadline is not None and time.monotonic() > deadline:
+            raise ExtractionTimeoutError("deadline exceeded")
+        pages.append(pdf_reader.pages[index].extract_text() or "")
+    return page_count, pages
+
+def create_executor() -> Executor:
+    workers = settings.PDF_WORKERS or os.cpu_count() or 1
+    
+    if settings.PDF_EXECUTOR == "process":
+        try:
+            return ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError):
+            pass
+    
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-extractor")
+
+class PageReader:
+    def __init__(
+        self,
+        extractor: "PDFExtractor",
+        source: PDFSource,
+        pages: Optional[Dict[int, str]] = None,
+        page_count: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.extractor = extractor
+        self.source = source
+        self.pages = dict(pages or {})
+        self.page_count = page_count
+        self.batch_size = max(1, batch_size or settings.PDF_PAGE_BATCH_SIZE)
+        self.fetched = 0
+    
+    @property
+    def complete(self) -> bool:
+        return self.page_count is not None and len(self.pages) >= self.page_count
+    
+    async def _fetch(self, start: int, stop: int) -> None:
+        page_count, pages = await self.extractor.extract_page_range(self.source, start, stop)
+        self.page_count = page_count
+        for offset, text in enumerate(pages):
+            self.pages[start + offset] = text
+        self.fetched += len(pages)
+    
+    async def count(self) -> int:
+        if self.page_count is None:
+            await self._fetch(0, self.batch_size)
+        return self.page_count
+    
+    async def iter_pages(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        reverse: bool = False
+    ) -> AsyncIterator[Tuple[int, str]]:
+        page_count = await self.count()
+        stop = page_count if stop is None else min(stop, page_count)
+        indexes = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+        
+        for index in indexes:
+            if index not in self.pages:
+                if reverse:
+                    await self._fetch(max(start, index - self.batch_size + 1), index + 1)
+                else:
+                    await self._fetch(index, min(stop, index + self.batch_size))
+            yield index, self.pages[index]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "page_count": self.page_count,
+            "pages": {str(index): text for index, text in self.pages.items()}
+        }
+    
+    @classmethod
+    def from_snapshot(cls, extractor: "PDFExtractor", source: PDFSource, snapshot: Dict[str, Any]) -> "PageReader":
+        pages = {int(index): text for index, text in snapshot["pages"].items()}
+        return cls(extractor, source, pages, snapshot["page_count"])
 
 class PDFExtractor:
-    @staticmethod
-    async def extract_text(pdf_content: bytes) -> str:
+    def __init__(self, executor: Optional[Executor] = None):
+        self._executor = executor
+        self._owns_executor = executor is None
+    
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = create_executor()
+            self._owns_executor = True
+        return self._executor
+    
+    async def extract_text(self, source: PDFSource) -> str:
+        pages = await self.extract_pages(source)
+        return "\n".join(page for page in pages if page).strip()
+    
+    async def extract_pages(self, source: PDFSource) -> List[str]:
+        _, pages = await self._run(_extract_pages_sync, source, settings.PDF_MAX_PAGES)
+        return pages
+    
+    async def extract_page_range(self, source: PDFSource, start: int, stop: int) -> Tuple[int, List[str]]:
+        return await self._run(_extract_pages_sync, source, settings.PDF_MAX_PAGES, start, stop)
+    
+    async def iter_pages(self, source: PDFSource, batch_size: Optional[int] = None) -> AsyncIterator[str]:
+        async for _, text in self.open(source, batch_size).iter_pages():
+            yield text
+    
+    def open(self, source: PDFSource, batch_size: Optional[int] = None) -> PageReader:
+        return PageReader(self, source, batch_size=batch_size)
+    
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        timeout = settings.PDF_EXTRACTION_TIMEOUT_SECONDS
+        executor = self.executor
+        future = executor.submit(_run_with_deadline, timeout, func, *args)
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text = ""
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+            if not timeout:
+                return await asyncio.wrap_future(future)
             
-            return text.strip()
+            poll = FIRST_POLL_SECONDS
+            while not (future.running() or future.done()):
+                await asyncio.sleep(poll)
+                poll = min(poll * 2, START_POLL_SECONDS)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout + HARD_TIMEOUT_GRACE_SECONDS)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BrokenProcessPool as e:
+            self.shutdown()
+            raise Exception(f"Failed to extract text from PDF: {str(e)}")
+        except asyncio.TimeoutError:
+            self._recycle(executor)
+            raise Exception(f"Failed to extract text from PDF: timed out after {timeout}s")
+        except ExtractionTimeoutError:
+            raise Exception(f"Failed to extract text from PDF: timed out after {timeout}s")
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
+    
+    def _recycle(self, executor: Executor) -> None:
+        if self._owns_executor and self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False)
+    
+    def shutdown(self) -> None:
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
@@ -0,0 +1,58 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+from orchestrator import ClaimOrchestrator
+
+IDENTITY_FIELDS = ("patient_name", "patient_id")
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def format_ndjson(event: str, data: Dict[str, Any]) -> str:
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
+
+async def stream_claim_events(
+    orchestrator: ClaimOrchestrator,
+    pdf_files: List[Dict[str, Any]],
+    output_format: str = "sse",
+    include_timings: Optional[bool] = None
+) -> AsyncIterator[str]:
+    formatter = format_ndjson if output_format == "ndjson" else format_sse
+    queue: asyncio.Queue = asyncio.Queue()
+    early_fields: Dict[str, Dict[str, Any]] = {}
+    reported_discrepancies = set()
+    
+    def on_event(event: str, data: Dict[str, Any]) -> None:
+        queue.put_nowait((event, data))
+    
+    def on_field(filename: str, field: str, value: Any) -> None:
+        queue.put_nowait(("field", {"filename": filename, "field": field, "value": value}))
+        
+        if field not in IDENTITY_FIELDS:
+            return
+        early_fields.setdefault(filename, {})[field] = value
+        for discrepancy in orchestrator.validator.check_identity_fields(early_fields.values()):
+            if discrepancy["type"] not in reported_discrepancies:
+                reported_discrepancies.add(discrepancy["type"])
+                queue.put_nowait(("early_discrepancy", discrepancy))
+    
+    task = asyncio.create_task(orchestrator.process_claim(
+        pdf_files, on_field=on_field, on_event=on_event, include_timings=include_timings
+    ))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            event, data = item
+            yield formatter(event, data)
+        
+        if task.exception() is not None:
+            yield formatter("error", {"detail": str(task.exception())})
+        else:
+            yield formatter("completed", task.result())
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Optional
+from config import settings
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def delay_for(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+class RateLimiter:
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None
+    ):
+        max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        requests_per_minute = requests_per_minute or settings.LLM_REQUESTS_PER_MINUTE
+        tokens_per_minute = tokens_per_minute or settings.LLM_TOKENS_PER_MINUTE
+        
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._queue_lock = asyncio.Lock()
+        self._paused_until = 0.0
+        self.stats = {"requests": 0, "waits": 0, "wait_seconds": 0.0, "rate_limited": 0}
+    
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.stats["rate_limited"] += 1
+    
+    def _delay_for(self, estimated_tokens: int) -> float:
+        delays = [self._paused_until - time.monotonic()]
+        if self.request_bucket is not None:
+            delays.append(self.request_bucket.delay_for(1))
+        if self.token_bucket is not None:
+            delays.append(self.token_bucket.delay_for(estimated_tokens))
+        return max(delays)
+    
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int) -> AsyncIterator[None]:
+        async with self._queue_lock:
+            await self.semaphore.acquire()
+            try:
+                started = time.monotonic()
+                delay = self._delay_for(estimated_tokens)
+                if delay > 0:
+                    self.stats["waits"] += 1
+                while delay > 0:
+                    await asyncio.sleep(delay)
+                    delay = self._delay_for(estimated_tokens)
+                self.stats["wait_seconds"] += time.monotonic() - started
+                
+                if self.request_bucket is not None:
+                    self.request_bucket.consume(1)
+                if self.token_bucket is not None:
+                    self.token_bucket.consume(estimated_tokens)
+            except BaseException:
+                self.semaphore.release()
+                raise
+        
+        self.stats["requests"] += 1
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        if self.token_bucket is not None and actual_tokens is not None:
+            self.token_bucket.consume(actual_tokens - estimated_tokens)
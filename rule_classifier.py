@@ -0,0 +1,96 @@
+import re
+from typing import Dict, List, Tuple
+from models import DocumentType
+
+class RuleBasedClassifier:
+    HEADER_LINES = 5
+    HEADER_BONUS = 1.5
+    FILENAME_WEIGHT = 4.0
+    STRONG_SCORE = 4.5
+    FIRST_PAGE_CHARS = 2000
+    
+    def __init__(self):
+        self.content_patterns: Dict[DocumentType, List[Tuple[re.Pattern, float]]] = {
+            DocumentType.BILL: self._compile([
+                (r"\bmedical bill\b", 3.0),
+                (r"\b(hospital )?invoice\b", 2.0),
+                (r"\bbill (number|no\.?|#|date)", 2.0),
+                (r"\btotal amount\b", 1.0),
+                (r"\bpayment status\b", 1.0)
+            ]),
+            DocumentType.DISCHARGE_SUMMARY: self._compile([
+                (r"\bdischarge summary\b", 3.0),
+                (r"\badmission date\b", 1.5),
+                (r"\bdischarge date\b", 1.5),
+                (r"\bdiagnosis\b", 1.0),
+                (r"\b(attending physician|procedures performed)\b", 1.0)
+            ]),
+            DocumentType.ID_CARD: self._compile([
+                (r"\b(insurance |member |health )?id card\b", 3.0),
+                (r"\bmember (id|name)\b", 1.5),
+                (r"\bgroup (number|no\.?)\b", 1.5),
+                (r"\bvalid (from|until|thru|through)\b", 1.5),
+                (r"\bpolicy (number|no\.?)\b", 1.0)
+            ]),
+            DocumentType.PHARMACY_BILL: self._compile([
+                (r"\bpharmacy\b", 3.0),
+                (r"\b(chemist|drug store)\b", 2.0),
+                (r"\bprescription (number|no\.?|#)", 2.0),
+                (r"\brx\b", 1.5)
+            ]),
+            DocumentType.CLAIM_FORM: self._compile([
+                (r"\bclaim form\b", 3.0),
+                (r"\bclaim (number|no\.?|#)", 2.0),
+                (r"\bclaimed amount\b", 2.0),
+                (r"\bclaimant\b", 1.0)
+            ])
+        }
+        
+        self.filename_patterns: List[Tuple[DocumentType, re.Pattern]] = [
+            (DocumentType.PHARMACY_BILL, re.compile(r"pharmacy|prescription|\brx\b|chemist")),
+            (DocumentType.DISCHARGE_SUMMARY, re.compile(r"discharge")),
+            (DocumentType.CLAIM_FORM, re.compile(r"claim")),
+            (DocumentType.ID_CARD, re.compile(r"\bid\b|id card|insurance card|member card")),
+            (DocumentType.BILL, re.compile(r"bill|invoice"))
+        ]
+    
+    @staticmethod
+    def _compile(patterns: List[Tuple[str, float]]) -> List[Tuple[re.Pattern, float]]:
+        return [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in patterns]
+    
+    def classify(self, text: str, filename: str) -> Tuple[DocumentType, float]:
+        scores = self._score(text, filename)
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_type, best_score = ranked[0]
+        runner_up_score = ranked[1][1] if len(ranked) > 1 else 0.0
+        
+        if best_score <= 0:
+            return DocumentType.OTHER, 0.0
+        
+        margin = (best_score - runner_up_score) / best_score
+        strength = min(1.0, best_score / self.STRONG_SCORE)
+        confidence = round(min(0.99, margin * strength), 3)
+        
+        return best_type, confidence
+    
+    def _score(self, text: str, filename: str) -> Dict[DocumentType, float]:
+        first_page = text[:self.FIRST_PAGE_CHARS]
+        header = "\n".join(first_page.splitlines()[:self.HEADER_LINES])
+        
+        scores = {doc_type: 0.0 for doc_type in self.content_patterns}
+        
+        for doc_type, patterns in self.content_patterns.items():
+            for pattern, weight in patterns:
+                if pattern.search(header):
+                    scores[doc_type] += weight * self.HEADER_BONUS
+                elif pattern.search(first_page):
+                    scores[doc_type] += weight
+        
+        normalized_filename = re.sub(r"[^a-z0-9]+", " ", filename.lower())
+        for doc_type, pattern in self.filename_patterns:
+            if pattern.search(normalized_filename):
+                scores[doc_type] += self.FILENAME_WEIGHT
+                break
+        
+        return scores
@@ -0,0 +1,120 @@
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models import DocumentType
+
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y", "%d-%b-%Y"]
+DATE_VALUE = r"(\d{4}[-/]\d{2}[-/]\d{2}|\d{1,2}[ -][A-Za-z]{3,9}[ -]\d{4}|[A-Za-z]{3,9} \d{1,2}, \d{4})"
+MONEY_VALUE = r"(?:[$₹€£]|Rs\.?|INR|USD)?\s*([\d,]+(?:\.\d{1,2})?)"
+IDENTIFIER_VALUE = r"([A-Z0-9][A-Z0-9\-/]*[0-9][A-Z0-9\-/]*)"
+TEXT_VALUE = r"(.+?)\s*$"
+
+def parse_date(value: str) -> Optional[str]:
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+def parse_amount(value: str) -> Optional[float]:
+    try:
+        return float(value.replace(",", ""))
+    except ValueError:
+        return None
+
+def parse_text(value: str) -> Optional[str]:
+    value = value.strip()
+    return value or None
+
+def parse_payment_status(value: str) -> Optional[str]:
+    value = value.strip().lower()
+    for status in ("partial", "pending", "paid"):
+        if value.startswith(status):
+            return status
+    return None
+
+def parse_follow_up(value: str) -> Optional[bool]:
+    value = value.strip().lower()
+    if re.match(r"(not required|no\b|none)", value):
+        return False
+    if re.match(r"(required|yes\b|in \d+|after \d+)", value):
+        return True
+    return None
+
+Rule = Tuple[re.Pattern, Callable[[str], Any]]
+
+def _rule(label: str, value: str, parser: Callable[[str], Any]) -> Rule:
+    pattern = re.compile(rf"^\s*(?:{label})\s*(?:[:#\-]|no\.?:?)\s*{value}", re.IGNORECASE | re.MULTILINE)
+    return pattern, parser
+
+PATIENT_RULES: Dict[str, List[Rule]] = {
+    "patient_name": [
+        _rule(r"patient name|member name|name of patient", TEXT_VALUE, parse_text),
+        _rule(r"patient(?!\s*(?:id|no|number)\b)", TEXT_VALUE, parse_text)
+    ],
+    "patient_id": [_rule(r"patient id|patient no|uhid|mrn", IDENTIFIER_VALUE, parse_text)]
+}
+
+DOCUMENT_RULES: Dict[DocumentType, Dict[str, List[Rule]]] = {
+    DocumentType.BILL: {
+        **PATIENT_RULES,
+        "bill_number": [_rule(r"bill number|bill no|invoice number|invoice no", IDENTIFIER_VALUE, parse_text)],
+        "bill_date": [_rule(r"bill date|invoice date", DATE_VALUE, parse_date)],
+        "total_amount": [_rule(r"total amount|grand total|net payable|total", MONEY_VALUE, parse_amount)],
+        "payment_status": [_rule(r"payment status", TEXT_VALUE, parse_payment_status)]
+    },
+    DocumentType.DISCHARGE_SUMMARY: {
+        **PATIENT_RULES,
+        "admission_date": [_rule(r"admission date|date of admission|admitted on", DATE_VALUE, parse_date)],
+        "discharge_date": [_rule(r"discharge date|date of discharge|discharged on", DATE_VALUE, parse_date)],
+        "diagnosis": [_rule(r"final diagnosis|diagnosis", TEXT_VALUE, parse_text)],
+        "doctor_name": [_rule(r"attending physician|treating doctor|consultant|doctor", TEXT_VALUE, parse_text)],
+        "follow_up_required": [_rule(r"follow[- ]?up", TEXT_VALUE, parse_follow_up)]
+    },
+    DocumentType.ID_CARD: {
+        **PATIENT_RULES,
+        "insurance_company": [_rule(r"insurance company|insurer", TEXT_VALUE, parse_text)],
+        "policy_number": [_rule(r"policy number|policy no", IDENTIFIER_VALUE, parse_text)],
+        "group_number": [_rule(r"group number|group no", IDENTIFIER_VALUE, parse_text)],
+        "date_of_birth": [_rule(r"date of birth|dob", DATE_VALUE, parse_date)],
+        "valid_from": [_rule(r"valid from|effective date", DATE_VALUE, parse_date)],
+        "valid_until": [_rule(r"valid until|valid thru|valid through|expiry date|expires", DATE_VALUE, parse_date)],
+        "member_id": [_rule(r"member id", IDENTIFIER_VALUE, parse_text)]
+    },
+    DocumentType.PHARMACY_BILL: {
+        **PATIENT_RULES,
+        "bill_date": [_rule(r"bill date|invoice date|date", DATE_VALUE, parse_date)],
+        "prescription_number": [_rule(r"prescription number|prescription no|rx number|rx no|rx", IDENTIFIER_VALUE, parse_text)],
+        "total_amount": [_rule(r"total amount|grand total|net payable|total", MONEY_VALUE, parse_amount)],
+        "doctor_name": [_rule(r"prescribed by|prescribing doctor|doctor", TEXT_VALUE, parse_text)]
+    },
+    DocumentType.CLAIM_FORM: {
+        **PATIENT_RULES,
+        "claim_number": [_rule(r"claim number|claim no", IDENTIFIER_VALUE, parse_text)],
+        "claim_date": [_rule(r"claim date|date of claim", DATE_VALUE, parse_date)],
+        "insurance_company": [_rule(r"insurance company|insurer", TEXT_VALUE, parse_text)],
+        "policy_number": [_rule(r"policy number|policy no", IDENTIFIER_VALUE, parse_text)],
+        "claimed_amount": [_rule(r"claimed amount|amount claimed|claim amount", MONEY_VALUE, parse_amount)],
+        "diagnosis": [_rule(r"diagnosis", TEXT_VALUE, parse_text)],
+        "treatment_date": [_rule(r"treatment date|date of treatment", DATE_VALUE, parse_date)],
+        "provider_name": [_rule(r"provider name|hospital name|provider", TEXT_VALUE, parse_text)]
+    }
+}
+
+class RuleExtractor:
+    def __init__(self, rules: Optional[Dict[DocumentType, Dict[str, List[Rule]]]] = None):
+        self.rules = rules or DOCUMENT_RULES
+    
+    def extract(self, doc_type: DocumentType, text: str) -> Dict[str, Any]:
+        extracted = {}
+        for field, field_rules in self.rules.get(doc_type, {}).items():
+            for pattern, parser in field_rules:
+                match = pattern.search(text)
+                if not match:
+                    continue
+                value = parser(match.group(1))
+                if value is not None:
+                    extracted[field] = value
+                    break
+        return extracted
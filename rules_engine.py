@@ -0,0 +1,232 @@
+import json
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from pydantic import BaseModel
+from config import settings
+from models import ClaimDecision, ClaimStatus, DecisionMethod, Document, DocumentType
+from rule_extractor import parse_date
+
+Action = Literal["pass", "undecided", "manual_review", "reject"]
+
+class AmountLimitPolicy(BaseModel):
+    diagnosis: Dict[str, float] = {}
+    procedure: Dict[str, float] = {}
+    default: Optional[float] = None
+    over_limit: Action = "manual_review"
+    on_missing: Action = "undecided"
+
+class IDValidityPolicy(BaseModel):
+    grace_days: int = 0
+    outside_window: Action = "reject"
+    on_missing: Action = "undecided"
+
+class PaymentStatusPolicy(BaseModel):
+    statuses: Dict[str, Action] = {"paid": "pass", "pending": "manual_review", "partial": "manual_review"}
+    unlisted: Action = "undecided"
+    on_missing: Action = "undecided"
+
+class ProviderPolicy(BaseModel):
+    known: List[str] = []
+    blocked: List[str] = []
+    unlisted: Action = "undecided"
+    on_missing: Action = "undecided"
+
+class DecisionPolicy(BaseModel):
+    version: str = "1"
+    amount_limits: Optional[AmountLimitPolicy] = None
+    id_validity: Optional[IDValidityPolicy] = None
+    payment_status: Optional[PaymentStatusPolicy] = None
+    providers: Optional[ProviderPolicy] = None
+    confidence: Dict[str, float] = {"approved": 0.9, "rejected": 0.95, "manual_review": 0.85}
+
+def normalize_name(value: Any) -> str:
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(value).lower()).split())
+
+def load_policy(path: str) -> DecisionPolicy:
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise Exception(f"PyYAML is required to load the decision policy {path}")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    return DecisionPolicy.model_validate(data or {})
+
+def _values(documents: List[Document], doc_type: DocumentType, field: str) -> List[Any]:
+    return [
+        doc.extracted_data.get(field) for doc in documents
+        if doc.document_type == doc_type and doc.extracted_data.get(field) not in (None, "", "null")
+    ]
+
+def _date(value: Any) -> Optional[date]:
+    parsed = parse_date(str(value))
+    return date.fromisoformat(parsed) if parsed else None
+
+def _amount(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _finding(rule: str, action: str, description: str) -> Dict[str, Any]:
+    return {"rule": rule, "action": action, "description": description}
+
+class RulesEngine:
+    ACTION_STATUSES = [("reject", ClaimStatus.REJECTED), ("manual_review", ClaimStatus.MANUAL_REVIEW)]
+    
+    def __init__(self, policy: DecisionPolicy):
+        self.policy = policy
+        self.amount_limits = self._normalized_limits(policy.amount_limits)
+        providers = policy.providers or ProviderPolicy()
+        self.known_providers = {normalize_name(name) for name in providers.known}
+        self.blocked_providers = {normalize_name(name) for name in providers.blocked}
+    
+    @classmethod
+    def from_file(cls, path: str) -> "RulesEngine":
+        return cls(load_policy(path))
+    
+    @staticmethod
+    def _normalized_limits(policy: Optional[AmountLimitPolicy]) -> Dict[str, Dict[str, float]]:
+        if policy is None:
+            return {}
+        return {
+            "diagnosis": {normalize_name(key): limit for key, limit in policy.diagnosis.items()},
+            "procedure": {normalize_name(key): limit for key, limit in policy.procedure.items()}
+        }
+    
+    def evaluate(self, documents: List[Document]) -> List[Dict[str, Any]]:
+        checks = [
+            (self.policy.amount_limits, self._check_amount),
+            (self.policy.id_validity, self._check_id_validity),
+            (self.policy.payment_status, self._check_payment_status),
+            (self.policy.providers, self._check_providers)
+        ]
+        return [check(policy, documents) for policy, check in checks if policy is not None]
+    
+    def decide(self, documents: List[Document]) -> Tuple[Optional[ClaimDecision], List[Dict[str, Any]]]:
+        findings = self.evaluate(documents)
+        
+        for action, status in self.ACTION_STATUSES:
+            matched = [finding for finding in findings if finding["action"] == action]
+            if matched:
+                return self._decision(status, "; ".join(finding["description"] for finding in matched)), findings
+        
+        if not findings or any(finding["action"] == "undecided" for finding in findings):
+            return None, findings
+        
+        reason = "All policy rules passed: " + "; ".join(finding["description"] for finding in findings)
+        return self._decision(ClaimStatus.APPROVED, reason), findings
+    
+    def _decision(self, status: ClaimStatus, reason: str) -> ClaimDecision:
+        return ClaimDecision(
+            status=status,
+            reason=reason,
+            confidence=self.policy.confidence.get(status.value),
+            method=DecisionMethod.RULES
+        )
+    
+    def _check_amount(self, policy: AmountLimitPolicy, documents: List[Document]) -> Dict[str, Any]:
+        amounts = [_amount(value) for value in _values(documents, DocumentType.BILL, "total_amount")]
+        amounts = [amount for amount in amounts if amount is not None]
+        if not amounts:
+            amounts = [_amount(value) for value in _values(documents, DocumentType.CLAIM_FORM, "claimed_amount")]
+            amounts = [amount for amount in amounts if amount is not None][:1]
+        
+        terms = [
+            ("diagnosis", normalize_name(value))
+            for doc_type in (DocumentType.DISCHARGE_SUMMARY, DocumentType.CLAIM_FORM)
+            for value in _values(documents, doc_type, "diagnosis")
+        ]
+        terms += [
+            ("procedure", normalize_name(value))
+            for procedures in _values(documents, DocumentType.DISCHARGE_SUMMARY, "procedures")
+            for value in (procedures if isinstance(procedures, list) else [procedures])
+        ]
+        limits = [
+            (limit, key) for kind, term in terms
+            for key, limit in self.amount_limits[kind].items() if key in term
+        ]
+        if not limits and policy.default is not None:
+            limits = [(policy.default, "default")]
+        
+        if not amounts:
+            return _finding("amount_limit", policy.on_missing, "Claim amount could not be determined")
+        if not limits:
+            return _finding("amount_limit", policy.on_missing, "No amount limit covers the diagnosis or procedures")
+        
+        total = sum(amounts)
+        limit, key = min(limits)
+        if total > limit:
+            return _finding("amount_limit", policy.over_limit, f"Amount {total:.2f} exceeds the {limit:.2f} limit for {key}")
+        return _finding("amount_limit", "pass", f"Amount {total:.2f} is within the {limit:.2f} limit for {key}")
+    
+    def _check_id_validity(self, policy: IDValidityPolicy, documents: List[Document]) -> Dict[str, Any]:
+        admissions = [_date(value) for value in _values(documents, DocumentType.DISCHARGE_SUMMARY, "admission_date")]
+        admissions += [_date(value) for value in _values(documents, DocumentType.CLAIM_FORM, "treatment_date")]
+        admissions = [value for value in admissions if value is not None]
+        
+        windows = []
+        for doc in documents:
+            if doc.document_type == DocumentType.ID_CARD:
+                valid_from = _date(doc.extracted_data.get("valid_from"))
+                valid_until = _date(doc.extracted_data.get("valid_until"))
+                if valid_from is not None or valid_until is not None:
+                    windows.append((valid_from, valid_until))
+        
+        if not admissions or not windows:
+            return _finding("id_validity", policy.on_missing, "ID card validity or admission date is missing")
+        
+        admission = admissions[0]
+        grace = timedelta(days=policy.grace_days)
+        for valid_from, valid_until in windows:
+            if (valid_from is None or valid_from - grace <= admission) and (valid_until is None or admission <= valid_until + grace):
+                return _finding("id_validity", "pass", f"ID card is valid on the admission date {admission.isoformat()}")
+        return _finding(
+            "id_validity", policy.outside_window, f"ID card is not valid on the admission date {admission.isoformat()}"
+        )
+    
+    def _check_payment_status(self, policy: PaymentStatusPolicy, documents: List[Document]) -> Dict[str, Any]:
+        statuses = sorted({str(value).strip().lower() for value in _values(documents, DocumentType.BILL, "payment_status")})
+        if not statuses:
+            return _finding("payment_status", policy.on_missing, "Bill payment status is missing")
+        
+        actions = [policy.statuses.get(status, policy.unlisted) for status in statuses]
+        action = self._strictest(actions)
+        return _finding("payment_status", action, f"Bill payment status is {', '.join(statuses)}")
+    
+    def _check_providers(self, policy: ProviderPolicy, documents: List[Document]) -> Dict[str, Any]:
+        names = {
+            normalize_name(value): str(value)
+            for doc_type, field in (
+                (DocumentType.BILL, "hospital_name"),
+                (DocumentType.DISCHARGE_SUMMARY, "hospital_name"),
+                (DocumentType.PHARMACY_BILL, "pharmacy_name"),
+                (DocumentType.CLAIM_FORM, "provider_name")
+            )
+            for value in _values(documents, doc_type, field)
+        }
+        if not names:
+            return _finding("provider", policy.on_missing, "Provider name is missing")
+        
+        blocked = [name for key, name in names.items() if key in self.blocked_providers]
+        if blocked:
+            return _finding("provider", "reject", f"Provider {blocked[0]} is blocked")
+        unlisted = [name for key, name in names.items() if key not in self.known_providers]
+        if unlisted:
+            return _finding("provider", policy.unlisted, f"Provider {unlisted[0]} is not a known provider")
+        return _finding("provider", "pass", f"Provider {', '.join(sorted(names.values()))} is known")
+    
+    @staticmethod
+    def _strictest(actions: List[str]) -> str:
+        for action in ("reject", "manual_review", "undecided"):
+            if action in actions:
+                return action
+        return "pass"
+
+def create_rules_engine() -> Optional[RulesEngine]:
+    if not settings.DECISION_RULES_ENABLED or not settings.DECISION_POLICY_PATH:
+        return None
+    return RulesEngine.from_file(settings.DECISION_POLICY_PATH)
@@ -0,0 +1,141 @@
+import json
+from functools import lru_cache
+from typing import Annotated, Any, ClassVar, Dict, List, Literal, Optional, Type, Union, get_args, get_origin
+from pydantic import BaseModel, ConfigDict, ValidationError, model_validator
+
+NULL_STRINGS = {"", "null", "none", "n/a"}
+
+SALVAGED_NOTE = "Partial extraction: the response was truncated or invalid and some fields were dropped"
+
+TYPE_NAMES = {str: "string", float: "float", int: "integer", bool: "boolean"}
+
+class OutputModel(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+    max_tokens: ClassVar[int] = 1000
+    tokens_per_input_token: ClassVar[float] = 0.0
+    
+    @classmethod
+    def token_limit(cls, input_tokens: int = 0) -> int:
+        return max(cls.max_tokens, int(input_tokens * cls.tokens_per_input_token))
+    
+    @model_validator(mode="before")
+    @classmethod
+    def drop_nulls(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        return {key: value for key, value in data.items() if not is_null(value)}
+
+def is_null(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and value.strip().lower() in NULL_STRINGS)
+
+def normalize_choice(value: Any) -> Any:
+    return value.strip().lower() if isinstance(value, str) else value
+
+def _unwrap(annotation: Any) -> Any:
+    optional = False
+    while True:
+        origin = get_origin(annotation)
+        if origin is Annotated:
+            annotation = get_args(annotation)[0]
+        elif origin is Union:
+            args = [arg for arg in get_args(annotation) if arg is not type(None)]
+            optional = optional or len(args) < len(get_args(annotation))
+            annotation = args[0]
+        else:
+            return annotation, optional
+
+def _describe_field(annotation: Any, description: Optional[str]) -> Any:
+    annotation, optional = _unwrap(annotation)
+    if get_origin(annotation) is list:
+        item, _ = _unwrap(get_args(annotation)[0])
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return [describe_schema(item)]
+        return [description or TYPE_NAMES.get(item, "string")]
+    
+    if get_origin(annotation) is Literal:
+        hint = "|".join(str(arg) for arg in get_args(annotation))
+    else:
+        hint = description or TYPE_NAMES.get(annotation, "string")
+    return f"{hint} or null" if optional else hint
+
+def describe_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    return {
+        name: _describe_field(field.annotation, field.description)
+        for name, field in model.model_fields.items()
+    }
+
+@lru_cache(maxsize=None)
+def json_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    return model.model_json_schema()
+
+def parse_json(text: str) -> Any:
+    cleaned = text.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned[7:]
+    if cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+    cleaned = cleaned.strip()
+    
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        start, end = cleaned.find("{"), cleaned.rfind("}")
+        if start < 0 or end <= start:
+            raise
+        return json.loads(cleaned[start:end + 1])
+
+def validate_output(model: Optional[Type[BaseModel]], data: Any) -> Any:
+    if model is None:
+        return data
+    return model.model_validate(data).model_dump(mode="json")
+
+def salvage_output(model: Type[BaseModel], data: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(data, dict):
+        return None
+    try:
+        return validate_output(model, data)
+    except ValidationError as e:
+        errors = e.errors()
+    
+    data = dict(data)
+    dropped_items: Dict[str, set] = {}
+    for error in errors:
+        loc = error["loc"]
+        if not loc or not isinstance(loc[0], str):
+            return None
+        if len(loc) > 1 and isinstance(loc[1], int) and isinstance(data.get(loc[0]), list):
+            dropped_items.setdefault(loc[0], set()).add(loc[1])
+        else:
+            data.pop(loc[0], None)
+    for field, indexes in dropped_items.items():
+        if field in data:
+            data[field] = [value for index, value in enumerate(data[field]) if index not in indexes]
+    
+    try:
+        return validate_output(model, data)
+    except ValidationError:
+        return None
+
+def mark_salvaged(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {**data, "note": SALVAGED_NOTE}
+
+def is_salvaged(data: Any) -> bool:
+    return isinstance(data, dict) and data.get("note") == SALVAGED_NOTE
+
+def coerce_output(model: Type[BaseModel], data: Any) -> Dict[str, Any]:
+    try:
+        return validate_output(model, data)
+    except ValidationError:
+        pass
+    salvaged = salvage_output(model, data)
+    return mark_salvaged(salvaged if salvaged is not None else validate_output(model, {}))
+
+def format_errors(error: Exception, limit: int = 10) -> List[str]:
+    if not isinstance(error, ValidationError):
+        return [str(error)]
+    return [
+        f"{'.'.join(str(part) for part in e['loc']) or 'response'}: {e['msg']}"
+        for e in error.errors()[:limit]
+    ]
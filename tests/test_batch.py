@@ -0,0 +1,41 @@
+import os
+import zipfile
+import pytest
+from batch import ZipClaimSource
+from config import settings
+from uploads import UploadTooLargeError
+
+def write_archive(path, members):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return str(path)
+
+def test_oversized_archive_member_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+    path = write_archive(tmp_path / "claims.zip", {
+        "claim-1/bill.pdf": b"%PDF-1.4 small",
+        "claim-2/bomb.pdf": b"\0" * (2 * 1024 * 1024)
+    })
+    assert os.path.getsize(path) < 1024 * 1024
+    
+    with pytest.raises(UploadTooLargeError, match="claim-2/bomb.pdf"):
+        ZipClaimSource(path)
+
+def test_archive_members_are_spooled_to_disk(tmp_path):
+    path = write_archive(tmp_path / "claims.zip", {
+        "claim-1/bill.pdf": b"%PDF-1.4 bill",
+        "claim-1/id.pdf": b"%PDF-1.4 id"
+    })
+    source = ZipClaimSource(path)
+    try:
+        pdf_files = source.load("claim-1")
+        assert [pdf_file["filename"] for pdf_file in pdf_files] == ["bill.pdf", "id.pdf"]
+        assert all("content" not in pdf_file and os.path.exists(pdf_file["path"]) for pdf_file in pdf_files)
+        with open(pdf_files[0]["path"], "rb") as f:
+            assert f.read() == b"%PDF-1.4 bill"
+        
+        source.release(pdf_files)
+        assert not any(os.path.exists(pdf_file["path"]) for pdf_file in pdf_files)
+    finally:
+        source.close()
@@ -0,0 +1,61 @@
+import asyncio
+import random
+from batch_validator import BatchValidator, _comparable
+from generate_samples import synthetic_claim
+from models import Document
+from validator import ClaimValidator
+
+BLANKS = (None, "null", "", "   ")
+
+def claim_documents(rng, index):
+    claim = synthetic_claim(rng, index, 4)
+    total = round(sum(amount for _, amount in claim["items"]), 2)
+    documents = [
+        ("bill", {"patient_name": claim["patient_name"], "patient_id": claim["patient_id"], "total_amount": total}),
+        ("discharge_summary", {
+            "patient_name": claim["patient_name"],
+            "patient_id": claim["patient_id"],
+            "admission_date": claim["admission"].isoformat(),
+            "discharge_date": claim["discharge"].isoformat()
+        }),
+        ("id_card", {"patient_name": claim["patient_name"].upper(), "member_id": claim["member_id"]}),
+        ("claim_form", {"patient_name": f" {claim['patient_name']} ", "claimed_amount": total})
+    ]
+    
+    for doc_type, data in documents:
+        for field in list(data):
+            roll = rng.random()
+            if roll < 0.15:
+                data[field] = rng.choice(BLANKS)
+            elif roll < 0.2:
+                del data[field]
+    if rng.random() < 0.2:
+        documents[0][1]["patient_name"] = "Someone Else"
+    if rng.random() < 0.2:
+        documents[3][1]["claimed_amount"] = total + rng.choice((0.005, 0.5, 100))
+    if rng.random() < 0.2:
+        discharge = documents[1][1]
+        discharge["admission_date"], discharge["discharge_date"] = discharge.get("discharge_date"), discharge.get("admission_date")
+    if rng.random() < 0.1:
+        documents.append(("bill", {"total_amount": rng.choice(BLANKS + (250.0,)), "patient_id": rng.choice(BLANKS)}))
+    if rng.random() < 0.15:
+        del documents[rng.randrange(len(documents))]
+    
+    return f"claim_{index:05d}", [
+        {"filename": f"{doc_type}_{position}.pdf", "document_type": doc_type, "extracted_data": data}
+        for position, (doc_type, data) in enumerate(documents)
+    ]
+
+def test_batch_validator_matches_claim_validator():
+    rng = random.Random(7)
+    claims = [claim_documents(rng, index) for index in range(500)]
+    
+    batch_results = BatchValidator().validate(claims)
+    
+    validator = ClaimValidator()
+    for (claim_id, documents), batch_result in zip(claims, batch_results):
+        expected = asyncio.run(validator.validate([Document(**doc) for doc in documents]))
+        assert batch_result["claim_id"] == claim_id
+        assert batch_result["missing_documents"] == expected.missing_documents, claim_id
+        assert _comparable(batch_result["discrepancies"]) == _comparable(expected.discrepancies), claim_id
+    assert sum(bool(result["discrepancies"]) for result in batch_results) > 50
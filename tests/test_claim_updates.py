@@ -0,0 +1,100 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import pytest
+from cache import ResultCache
+from claims_store import ClaimsStore
+from config import settings
+from llm_client import LLMClient
+from mock_llm_server import MockLLMConfig, create_app
+from main import app
+from orchestrator import ClaimOrchestrator, DuplicateDocumentError, SKIPPED_EXTRACTION
+from pdf_extractor import PDFExtractor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def pdf_file(name):
+    with open(os.path.join(ROOT, name), "rb") as f:
+        return {"filename": name, "content": f.read()}
+
+@pytest.fixture
+def run_orchestrator(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PIPELINE_MODE", "two_stage")
+    monkeypatch.setattr(settings, "EARLY_REJECTION_ENABLED", True)
+    
+    def run(scenario):
+        async def main():
+            mock_app = create_app(MockLLMConfig(latency_ms=0, seed=0))
+            http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_app))
+            claims_store = ClaimsStore(str(tmp_path / "claims.db"))
+            pdf_extractor = PDFExtractor(ThreadPoolExecutor(max_workers=2))
+            orchestrator = ClaimOrchestrator(LLMClient(http_client), ResultCache(), pdf_extractor, claims_store)
+            try:
+                return await scenario(orchestrator, mock_app)
+            finally:
+                await http_client.aclose()
+                claims_store.close()
+                pdf_extractor.shutdown()
+        return asyncio.run(main())
+    return run
+
+def test_adding_missing_discharge_reuses_early_rejected_documents(run_orchestrator):
+    async def scenario(orchestrator, mock_app):
+        rejected = await orchestrator.process_claim(
+            [pdf_file("sample_medical_bill.pdf"), pdf_file("sample_insurance_id.pdf")]
+        )
+        requests_before = mock_app.state.stats["requests"]
+        updated = await orchestrator.update_claim(rejected["claim_id"], [pdf_file("sample_discharge_summary.pdf")])
+        return rejected, updated, mock_app.state.stats["requests"] - requests_before
+    
+    rejected, updated, requests = run_orchestrator(scenario)
+    
+    assert rejected["claim_decision"]["status"] == "rejected"
+    assert rejected["validation"]["missing_documents"] == ["discharge_summary"]
+    assert all(doc["extracted_data"] == SKIPPED_EXTRACTION for doc in rejected["documents"])
+    
+    assert updated["claim_id"] == rejected["claim_id"]
+    assert updated["claim_decision"]["status"] == "approved"
+    assert updated["validation"]["missing_documents"] == []
+    assert updated["processing"]["reused_documents"] == 2
+    assert sorted(doc["document_type"] for doc in updated["documents"]) == ["bill", "discharge_summary", "id_card"]
+    assert all(doc["extracted_data"] != SKIPPED_EXTRACTION for doc in updated["documents"])
+    assert requests <= 4
+
+def test_resending_unchanged_documents_skips_them(run_orchestrator):
+    async def scenario(orchestrator, mock_app):
+        names = ["sample_medical_bill.pdf", "sample_discharge_summary.pdf", "sample_insurance_id.pdf"]
+        first = await orchestrator.process_claim([pdf_file(name) for name in names])
+        updated = await orchestrator.update_claim(first["claim_id"], [pdf_file(name) for name in names])
+        return first, updated
+    
+    first, updated = run_orchestrator(scenario)
+    
+    assert updated["processing"]["reused_documents"] == 3
+    assert updated["claim_decision"]["status"] == first["claim_decision"]["status"]
+
+def test_documents_sharing_a_filename_are_rejected(run_orchestrator):
+    async def scenario(orchestrator, mock_app):
+        bill = pdf_file("sample_medical_bill.pdf")
+        scan = pdf_file("sample_insurance_id.pdf")
+        with pytest.raises(DuplicateDocumentError):
+            await orchestrator.process_claim([{**bill, "filename": "scan.pdf"}, {**scan, "filename": "scan.pdf"}])
+        return mock_app.state.stats["requests"]
+    
+    assert run_orchestrator(scenario) == 0
+
+def test_upload_with_duplicate_filenames_returns_400():
+    with open(os.path.join(ROOT, "sample_medical_bill.pdf"), "rb") as f:
+        content = f.read()
+    files = [("files", ("scan.pdf", content, "application/pdf")), ("files", ("scan.pdf", content, "application/pdf"))]
+    
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/process-claim", files=files)
+    
+    response = asyncio.run(main())
+    
+    assert response.status_code == 400
+    assert "scan.pdf" in response.json()["detail"]
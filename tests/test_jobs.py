@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import pytest
+from config import settings
+from jobs import InMemoryJobBackend, JobManager, WebhookNotAllowedError, validate_webhook_url
+
+@pytest.fixture
+def allowed_hosts(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WEBHOOK_ALLOWED_HOSTS", ["hooks.example.com", "*.partner.example"])
+    monkeypatch.setattr(settings, "JOB_WEBHOOK_REQUIRE_HTTPS", True)
+
+@pytest.mark.parametrize("url", [
+    "https://hooks.example.com/claims",
+    "https://HOOKS.example.com:8443/claims",
+    "https://eu.partner.example/callback"
+])
+def test_allowed_webhook_urls(allowed_hosts, url):
+    validate_webhook_url(url)
+
+@pytest.mark.parametrize("url", [
+    "http://hooks.example.com/claims",
+    "https://169.254.169.254/latest/meta-data",
+    "https://localhost:8000/admin",
+    "https://hooks.example.com@10.0.0.5/claims",
+    "https://partner.example/callback",
+    "https://evilpartner.example/callback",
+    "file:///etc/passwd",
+    "not a url"
+])
+def test_rejected_webhook_urls(allowed_hosts, url):
+    with pytest.raises(WebhookNotAllowedError):
+        validate_webhook_url(url)
+
+def test_webhooks_are_off_without_an_allowlist(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WEBHOOK_ALLOWED_HOSTS", [])
+    manager = JobManager(None, InMemoryJobBackend(), workers=1)
+    
+    with pytest.raises(WebhookNotAllowedError):
+        asyncio.run(manager.submit([], "https://hooks.example.com/claims"))
+    assert manager.backend.jobs == {}
+
+def test_worker_logs_unexpected_failures(caplog):
+    class BrokenBackend(InMemoryJobBackend):
+        async def get_job(self, job_id):
+            raise RuntimeError("backend unavailable")
+    
+    async def main():
+        manager = JobManager(None, BrokenBackend(), workers=1)
+        await manager.start()
+        await manager.backend.queue.put(("job-1", {"pdf_files": []}))
+        await asyncio.sleep(0.05)
+        await manager.stop()
+    
+    with caplog.at_level(logging.ERROR, logger="jobs"):
+        asyncio.run(main())
+    
+    assert "job-1" in caplog.text
+    assert "backend unavailable" in caplog.text
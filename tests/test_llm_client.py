@@ -0,0 +1,163 @@
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from agents.schemas import BillData
+from config import settings
+from llm_client import LLMAPIError, LLMClient
+from llm_router import LLMRouter, Provider
+from rate_limiter import RateLimiter
+
+USAGE = {"prompt_tokens": 40, "completion_tokens": 12, "total_tokens": 52}
+
+def sse(*chunks):
+    lines = [f"data: {json.dumps(chunk)}\n\n" for chunk in chunks] + ["data: [DONE]\n\n"]
+    return httpx.Response(200, content="".join(lines).encode(), headers={"content-type": "text/event-stream"})
+
+def delta(content):
+    return {"choices": [{"index": 0, "delta": {"content": content}}]}
+
+def make_client(handler, providers):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return LLMClient(http_client, router=LLMRouter(providers, strategy="latency")), http_client
+
+def stream_json(client, http_client):
+    async def main():
+        try:
+            return await client.generate_json_stream("extract", caller="bill_agent")
+        finally:
+            await http_client.aclose()
+    return asyncio.run(main())
+
+@pytest.fixture
+def recorded_usage(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(LLMClient, "_record_usage", staticmethod(lambda usage, caller: recorded.append((caller, usage))))
+    return recorded
+
+def test_streamed_call_records_reported_usage(recorded_usage):
+    bodies = []
+    
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        return sse(delta('{"total": '), delta("12}"), {"choices": [], "usage": USAGE})
+    
+    provider = Provider("groq", "http://groq/v1", "key", "model", RateLimiter(tokens_per_minute=10000))
+    client, http_client = make_client(handler, [provider])
+    
+    assert stream_json(client, http_client) == {"total": 12}
+    assert bodies[0]["stream_options"] == {"include_usage": True}
+    assert recorded_usage == [("bill_agent", USAGE)]
+    assert 10000 - 52 <= provider.rate_limiter.token_bucket.tokens < 10000 - 51
+    assert client.stats["streams_stopped_early"] == 0
+
+def test_stream_stopped_early_records_estimated_usage(recorded_usage):
+    def handler(request):
+        return sse(delta('{"total": 12}'), delta(" and some trailing text"), {"choices": [], "usage": USAGE})
+    
+    client, http_client = make_client(handler, [Provider("groq", "http://groq/v1", "key", "model")])
+    
+    assert stream_json(client, http_client) == {"total": 12}
+    assert client.stats["streams_stopped_early"] == 1
+    caller, usage = recorded_usage[0]
+    assert caller == "bill_agent"
+    assert usage["completion_tokens"] > 0
+    assert usage["total_tokens"] == usage["prompt_tokens"] + usage["completion_tokens"]
+
+def test_streamed_calls_leave_out_json_mode_unless_supported():
+    bodies = []
+    
+    def handler(request):
+        body = json.loads(request.content)
+        bodies.append(body)
+        if body.get("stream"):
+            return sse(delta('{"patient_name": "John Doe"}'))
+        return httpx.Response(200, json={"choices": [{"message": {"content": '{"patient_name": "John Doe"}'}}]})
+    
+    groq = Provider("groq", "http://groq/v1", "key", "model", json_mode="json_object")
+    streaming = Provider("streaming", "http://streaming/v1", "key", "model", json_mode="json_object", json_mode_streaming=True)
+    
+    async def main():
+        for provider in (groq, streaming):
+            client, http_client = make_client(handler, [provider])
+            try:
+                await client.generate_json("extract", schema=BillData)
+                await client.generate_json_stream("extract", schema=BillData)
+            finally:
+                await http_client.aclose()
+    
+    asyncio.run(main())
+    assert [body.get("response_format") for body in bodies] == [
+        {"type": "json_object"}, None, {"type": "json_object"}, {"type": "json_object"}
+    ]
+
+def completion(content):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}], "usage": USAGE})
+
+def generate(client, http_client):
+    async def main():
+        try:
+            return await client.generate("extract", caller="bill_agent")
+        finally:
+            await http_client.aclose()
+    return asyncio.run(main())
+
+def test_rate_limited_call_waits_for_retry_after():
+    sent = []
+    
+    def handler(request):
+        sent.append(time.monotonic())
+        if len(sent) == 1:
+            return httpx.Response(429, headers={"retry-after": "0.2"}, json={"error": "rate limited"})
+        return completion("ok")
+    
+    provider = Provider("groq", "http://groq/v1", "key", "model")
+    client, http_client = make_client(handler, [provider])
+    
+    assert generate(client, http_client) == "ok"
+    assert sent[1] - sent[0] >= 0.2
+    assert provider.rate_limiter.stats["rate_limited"] == 1
+    assert client.stats["errors"] == {"rate_limited": 1}
+    assert client.stats["retries"] == 1
+
+def test_server_errors_exhaust_retries(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "LLM_BACKOFF_BASE_SECONDS", 0.01)
+    sent = []
+    
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(503, json={"error": "unavailable"})
+    
+    client, http_client = make_client(handler, [Provider("groq", "http://groq/v1", "key", "model")])
+    
+    with pytest.raises(LLMAPIError) as error:
+        generate(client, http_client)
+    assert error.value.status_code == 503
+    assert len(sent) == 3
+    assert client.stats["errors"] == {"server_error": 3}
+    assert client.stats["retries"] == 2
+
+def test_hedge_beats_a_slow_primary(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_DELAY_SECONDS", 0.05)
+    sent = []
+    
+    async def handler(request):
+        sent.append(request.url.host)
+        if request.url.host == "primary":
+            await asyncio.sleep(2)
+            return completion("primary")
+        return completion("hedge")
+    
+    primary = Provider("primary", "http://primary/v1", "key", "model")
+    backup = Provider("backup", "http://backup/v1", "key", "model")
+    client, http_client = make_client(handler, [primary, backup])
+    
+    started = time.monotonic()
+    assert generate(client, http_client) == "hedge"
+    assert time.monotonic() - started < 1
+    assert sent == ["primary", "backup"]
+    assert (client.stats["hedges"], client.stats["hedge_wins"]) == (1, 1)
+    assert primary.rate_limiter.semaphore._value == settings.LLM_MAX_CONCURRENCY
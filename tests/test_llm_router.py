@@ -0,0 +1,95 @@
+import asyncio
+import httpx
+import pytest
+from llm_client import LLMAPIError, LLMClient
+from llm_router import LLMRouter, Provider
+
+def completion(content="ok"):
+    return httpx.Response(200, json={
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}
+    })
+
+def make_client(handler, providers, routes=None):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return LLMClient(http_client, router=LLMRouter(providers, routes, strategy="latency")), http_client
+
+def test_unproven_and_failing_providers_rank_after_proven_ones():
+    proven, unproven, failing = (Provider(name, f"http://{name}/v1", "key", "model") for name in ("proven", "unproven", "failing"))
+    proven.record_success(2.0)
+    failing.record_failure("provider_error")
+    
+    router = LLMRouter([failing, unproven, proven])
+    assert [provider.name for provider in router.candidates("default")] == ["proven", "unproven", "failing"]
+
+def test_unauthorized_provider_fails_over_and_cools_down():
+    hosts = []
+    
+    def handler(request):
+        hosts.append(request.url.host)
+        if request.url.host == "bad":
+            return httpx.Response(401, json={"error": {"message": "invalid api key"}})
+        return completion()
+    
+    bad = Provider("bad", "http://bad/v1", "key", "model")
+    good = Provider("good", "http://good/v1", "key", "model")
+    client, http_client = make_client(handler, [bad, good])
+    
+    async def main():
+        try:
+            return [await client.generate("hi") for _ in range(10)]
+        finally:
+            await http_client.aclose()
+    
+    assert asyncio.run(main()) == ["ok"] * 10
+    assert hosts.count("bad") == 1
+    assert client.stats["failovers"] == 1
+
+def test_repeated_auth_failures_put_provider_in_cooldown():
+    provider = Provider("bad", "http://bad/v1", "key", "model")
+    for _ in range(3):
+        provider.record_failure("provider_error")
+    assert not provider.available
+    
+    provider = Provider("client", "http://client/v1", "key", "model")
+    for _ in range(3):
+        provider.record_failure("client_error")
+    assert provider.available
+
+def test_bad_request_is_not_failed_over():
+    hosts = []
+    
+    def handler(request):
+        hosts.append(request.url.host)
+        return httpx.Response(400, json={"error": {"message": "bad request"}})
+    
+    client, http_client = make_client(handler, [
+        Provider("first", "http://first/v1", "key", "model"),
+        Provider("second", "http://second/v1", "key", "model")
+    ])
+    
+    async def main():
+        try:
+            await client.generate("hi")
+        finally:
+            await http_client.aclose()
+    
+    with pytest.raises(LLMAPIError):
+        asyncio.run(main())
+    assert hosts == ["first"]
+
+def test_unauthorized_without_alternative_raises():
+    def handler(request):
+        return httpx.Response(403, json={"error": {"message": "forbidden"}})
+    
+    client, http_client = make_client(handler, [Provider("only", "http://only/v1", "key", "model")])
+    
+    async def main():
+        try:
+            await client.generate("hi")
+        finally:
+            await http_client.aclose()
+    
+    with pytest.raises(LLMAPIError):
+        asyncio.run(main())
+    assert client.stats["attempts"] == 1
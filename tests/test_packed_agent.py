@@ -0,0 +1,74 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from agents.packed_agent import PackedAgent
+from cache import ResultCache
+from config import settings
+from llm_client import LLMClient
+from mock_llm_server import MockLLMConfig, create_app
+from models import DocumentType
+from orchestrator import ClaimOrchestrator
+from pdf_extractor import PDFExtractor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = ("sample_medical_bill.pdf", "sample_discharge_summary.pdf", "sample_insurance_id.pdf")
+
+def pdf_files():
+    files = []
+    for name in SAMPLES:
+        with open(os.path.join(ROOT, name), "rb") as f:
+            files.append({"filename": name, "content": f.read()})
+    return files
+
+def process(pipeline_mode, monkeypatch, runs=1):
+    monkeypatch.setattr(settings, "PIPELINE_MODE", pipeline_mode)
+    
+    async def main():
+        mock_app = create_app(MockLLMConfig(latency_ms=0, seed=0))
+        http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_app))
+        pdf_extractor = PDFExtractor(ThreadPoolExecutor(max_workers=2))
+        orchestrator = ClaimOrchestrator(LLMClient(http_client), ResultCache(), pdf_extractor)
+        try:
+            results = []
+            for _ in range(runs):
+                requests_before = mock_app.state.stats["requests"]
+                result = await orchestrator.process_claim(pdf_files())
+                results.append((result, mock_app.state.stats["requests"] - requests_before))
+            return results, orchestrator.stats
+        finally:
+            await http_client.aclose()
+            pdf_extractor.shutdown()
+    return asyncio.run(main())
+
+def documents(result):
+    return {doc["filename"]: (doc["document_type"], doc["extracted_data"]["patient_name"]) for doc in result["documents"]}
+
+def test_known_type_documents_share_one_extraction_call(monkeypatch):
+    [(two_stage, two_stage_requests)], _ = process("two_stage", monkeypatch)
+    [(packed, packed_requests)], stats = process("packed", monkeypatch)
+    
+    assert documents(packed) == documents(two_stage)
+    assert packed["claim_decision"]["status"] == two_stage["claim_decision"]["status"]
+    assert (stats["packed_calls"], stats["packed_known_documents"]) == (1, 2)
+    assert packed_requests == 2
+    assert two_stage_requests == 3
+
+def test_packed_extractions_are_cached_per_document(monkeypatch):
+    [_, (result, requests)], stats = process("packed", monkeypatch, runs=2)
+    
+    assert stats["packed_calls"] == 1
+    assert requests == 1
+    assert all(doc["classification_method"] == "rules" for doc in result["documents"])
+
+def test_known_types_override_the_packed_classification():
+    agent = PackedAgent({})
+    prompt = agent.format_documents([("a.pdf", "text a"), ("b.pdf", "text b")], [DocumentType.BILL, None])
+    results = agent.parse_results({"documents": [
+        {"document_index": 1, "document_type": "other", "extracted_data": {}},
+        {"document_index": 2, "document_type": "id_card", "extracted_data": {}}
+    ]}, 2, [DocumentType.BILL, None])
+    
+    assert "Filename: a.pdf\nDocument type: bill\n\ntext a" in prompt
+    assert "Filename: b.pdf\n\ntext b" in prompt
+    assert [classification.document_type for classification, _ in results] == [DocumentType.BILL, DocumentType.ID_CARD]
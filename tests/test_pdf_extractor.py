@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+import pdf_extractor
+from config import settings
+from pdf_extractor import PDFExtractor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _sleep(seconds, deadline=None):
+    time.sleep(seconds)
+    return seconds
+
+def _spin(seconds, deadline=None):
+    finish = time.monotonic() + seconds
+    while time.monotonic() < finish:
+        pass
+    return seconds
+
+def test_queue_wait_does_not_count_towards_the_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_TIMEOUT_SECONDS", 0.5)
+    extractor = PDFExtractor(ThreadPoolExecutor(max_workers=1))
+    
+    async def main():
+        return await asyncio.gather(*(extractor._run(_sleep, 0.3) for _ in range(3)))
+    
+    try:
+        assert asyncio.run(main()) == [0.3, 0.3, 0.3]
+    finally:
+        extractor.shutdown()
+
+def test_process_worker_stops_at_its_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_TIMEOUT_SECONDS", 0.3)
+    extractor = PDFExtractor(ProcessPoolExecutor(max_workers=1))
+    
+    async def main():
+        started = time.monotonic()
+        with pytest.raises(Exception, match="timed out after 0.3s"):
+            await extractor._run(_spin, 5.0)
+        return time.monotonic() - started, await extractor._run(_sleep, 0.01)
+    
+    try:
+        elapsed, result = asyncio.run(main())
+        assert elapsed < 2.0
+        assert result == 0.01
+    finally:
+        extractor.shutdown()
+
+def test_stuck_parse_recycles_the_pool(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "PDF_EXECUTOR", "thread")
+    monkeypatch.setattr(settings, "PDF_WORKERS", 1)
+    monkeypatch.setattr(pdf_extractor, "HARD_TIMEOUT_GRACE_SECONDS", 0.1)
+    extractor = PDFExtractor()
+    
+    async def main():
+        stuck_pool = extractor.executor
+        with pytest.raises(Exception, match="timed out"):
+            await extractor._run(_sleep, 1.0)
+        assert extractor.executor is not stuck_pool
+        return await extractor._run(_sleep, 0.01)
+    
+    try:
+        assert asyncio.run(main()) == 0.01
+    finally:
+        extractor.shutdown()
+
+def test_sample_pdf_extracts_within_the_deadline():
+    extractor = PDFExtractor(ThreadPoolExecutor(max_workers=1))
+    try:
+        text = asyncio.run(extractor.extract_text(os.path.join(ROOT, "sample_medical_bill.pdf")))
+    finally:
+        extractor.shutdown()
+    assert "Total Amount" in text
+
+def test_page_batches_reuse_the_worker_reader(monkeypatch, tmp_path):
+    path = tmp_path / "bill.pdf"
+    path.write_bytes(open(os.path.join(ROOT, "sample_medical_bill.pdf"), "rb").read())
+    opened = []
+    reader_class = pdf_extractor.PyPDF2.PdfReader
+    monkeypatch.setattr(pdf_extractor.PyPDF2, "PdfReader", lambda stream: opened.append(stream) or reader_class(stream))
+    extractor = PDFExtractor(ThreadPoolExecutor(max_workers=1))
+    
+    async def main():
+        reader = extractor.open(str(path), batch_size=1)
+        return [text async for _, text in reader.iter_pages()], await extractor.extract_text(str(path))
+    
+    try:
+        pages, text = asyncio.run(main())
+        assert "\n".join(page for page in pages if page).strip() == text
+        assert len(opened) == 1
+        
+        path.write_bytes(open(os.path.join(ROOT, "sample_insurance_id.pdf"), "rb").read())
+        assert asyncio.run(extractor.extract_text(str(path))) != text
+        assert len(opened) == 2
+    finally:
+        extractor.shutdown()
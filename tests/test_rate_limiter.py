@@ -0,0 +1,40 @@
+import asyncio
+import time
+from rate_limiter import RateLimiter, parse_retry_after
+
+def test_waiting_callers_acquire_in_arrival_order():
+    limiter = RateLimiter(max_concurrency=4, tokens_per_minute=6000)
+    limiter.token_bucket.consume(limiter.token_bucket.tokens)
+    acquired = []
+    
+    async def call(index, tokens):
+        async with limiter.acquire(tokens):
+            acquired.append(index)
+    
+    async def main():
+        tasks = []
+        for index, tokens in enumerate((20, 1, 1, 1)):
+            tasks.append(asyncio.create_task(call(index, tokens)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+    
+    asyncio.run(main())
+    assert acquired == [0, 1, 2, 3]
+    assert limiter.stats["waits"] == 4
+
+def test_pause_holds_back_new_requests():
+    limiter = RateLimiter(max_concurrency=4)
+    limiter.pause(0.1)
+    
+    async def main():
+        started = time.monotonic()
+        async with limiter.acquire(1):
+            return time.monotonic() - started
+    
+    assert asyncio.run(main()) >= 0.1
+    assert limiter.stats["rate_limited"] == 1
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
@@ -0,0 +1,25 @@
+import pytest
+from config import settings
+from models import DocumentType
+from rule_classifier import RuleBasedClassifier
+
+@pytest.mark.parametrize("text, filename, expected", [
+    ("DISCHARGE SUMMARY\nCity Hospital", "upload_1.pdf", DocumentType.DISCHARGE_SUMMARY),
+    ("Pharmacy\nGreen Cross", "scan.pdf", DocumentType.PHARMACY_BILL),
+    ("", "insurance_id.pdf", DocumentType.ID_CARD),
+    ("", "medical_bill.pdf", DocumentType.BILL),
+    ("CLAIM FORM", "document.pdf", DocumentType.CLAIM_FORM)
+])
+def test_obvious_documents_clear_the_fast_path(text, filename, expected):
+    doc_type, confidence = RuleBasedClassifier().classify(text, filename)
+    assert doc_type == expected
+    assert confidence >= settings.CLASSIFIER_FAST_PATH_THRESHOLD
+
+@pytest.mark.parametrize("text, filename", [
+    ("DISCHARGE SUMMARY\nAdmission Date: 2024-01-01", "medical_bill.pdf"),
+    ("Total Amount: $100.00", "scan.pdf"),
+    ("Some unrelated letter", "document.pdf")
+])
+def test_conflicting_or_weak_signals_go_to_the_llm(text, filename):
+    _, confidence = RuleBasedClassifier().classify(text, filename)
+    assert confidence < settings.CLASSIFIER_FAST_PATH_THRESHOLD
@@ -0,0 +1,17 @@
+from models import DocumentType
+from rule_extractor import RuleExtractor
+
+def test_patient_number_is_not_taken_as_patient_name():
+    text = "Patient No: P12345\nPatient Name: John Doe\nBill Number: B-2024-001"
+    extracted = RuleExtractor().extract(DocumentType.BILL, text)
+    assert extracted["patient_name"] == "John Doe"
+    assert extracted["patient_id"] == "P12345"
+
+def test_patient_number_without_name_leaves_name_to_llm():
+    extracted = RuleExtractor().extract(DocumentType.DISCHARGE_SUMMARY, "Patient No. P12345\nPatient ID: P12345")
+    assert "patient_name" not in extracted
+
+def test_bare_patient_label_still_matches():
+    extracted = RuleExtractor().extract(DocumentType.CLAIM_FORM, "Patient: Jane Roe\nClaim No: C-2024-9")
+    assert extracted["patient_name"] == "Jane Roe"
+    assert extracted["claim_number"] == "C-2024-9"
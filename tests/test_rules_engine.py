@@ -0,0 +1,72 @@
+import os
+from config import settings
+from models import ClaimStatus, DecisionMethod, Document, DocumentType
+from rules_engine import RulesEngine, create_rules_engine, load_policy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def claim(total="45000", payment_status="paid", hospital="Example General Hospital"):
+    return [
+        Document(filename="bill.pdf", document_type=DocumentType.BILL, extracted_data={
+            "total_amount": total, "payment_status": payment_status, "hospital_name": hospital
+        }),
+        Document(filename="discharge.pdf", document_type=DocumentType.DISCHARGE_SUMMARY, extracted_data={
+            "diagnosis": "Acute Appendicitis",
+            "procedures": ["Laparoscopic Appendectomy"],
+            "admission_date": "2024-03-01",
+            "hospital_name": hospital
+        }),
+        Document(filename="id.pdf", document_type=DocumentType.ID_CARD, extracted_data={
+            "valid_from": "2024-01-01", "valid_until": "2024-12-31"
+        })
+    ]
+
+def example_engine():
+    return RulesEngine(load_policy(os.path.join(ROOT, "decision_policy.example.json")))
+
+def test_rules_are_off_without_a_policy_path(monkeypatch):
+    monkeypatch.setattr(settings, "DECISION_RULES_ENABLED", True)
+    monkeypatch.setattr(settings, "DECISION_POLICY_PATH", None)
+    
+    assert create_rules_engine() is None
+
+def test_clean_claim_within_limits_is_approved():
+    decision, findings = example_engine().decide(claim())
+    
+    assert decision.status == ClaimStatus.APPROVED
+    assert decision.method == DecisionMethod.RULES
+    assert [finding["action"] for finding in findings] == ["pass"] * 4
+
+def test_strictest_matching_amount_limit_applies():
+    decision, findings = example_engine().decide(claim(total="55000"))
+    
+    assert decision.status == ClaimStatus.MANUAL_REVIEW
+    assert findings[0]["description"] == "Amount 55000.00 exceeds the 50000.00 limit for appendicitis"
+
+def test_pending_bill_goes_to_manual_review():
+    decision, _ = example_engine().decide(claim(payment_status="Pending"))
+    
+    assert decision.status == ClaimStatus.MANUAL_REVIEW
+    assert "pending" in decision.reason
+
+def test_id_card_expired_before_admission_is_rejected():
+    documents = claim()
+    documents[2].extracted_data["valid_until"] = "2024-02-01"
+    
+    decision, _ = example_engine().decide(documents)
+    
+    assert decision.status == ClaimStatus.REJECTED
+
+def test_unknown_provider_leaves_the_decision_to_the_llm():
+    decision, findings = example_engine().decide(claim(hospital="Unlisted Clinic"))
+    
+    assert decision is None
+    assert findings[-1]["action"] == "undecided"
+
+def test_blocked_provider_is_rejected():
+    policy = load_policy(os.path.join(ROOT, "decision_policy.example.json"))
+    policy.providers.blocked = ["Example General Hospital"]
+    
+    decision, _ = RulesEngine(policy).decide(claim())
+    
+    assert decision.status == ClaimStatus.REJECTED
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import os
+from agents import BillAgent
+from agents.schemas import BillData
+from cache import ResultCache
+from config import settings
+from generate_samples import claim_documents, synthetic_claim, write_pdf
+from llm_client import LLMClient
+from mock_llm_server import MockLLMConfig, create_app
+from models import DocumentType
+from orchestrator import ClaimOrchestrator
+from pdf_extractor import PDFExtractor
+from structured_output import is_salvaged, mark_salvaged
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TruncatedBillAgent(BillAgent):
+    async def extract(self, text, on_field=None):
+        return mark_salvaged(await super().extract(text, on_field))
+
+def test_sixty_item_bill_is_not_truncated(tmp_path):
+    claim = synthetic_claim(random.Random(7), 0, 60)
+    claim["items"] = [(f"Lab tests #{index + 1}", 100.0 + index) for index in range(60)]
+    claim["id_name"] = claim["patient_name"]
+    pdf_files = []
+    for filename, (header, title, lines) in claim_documents(claim).items():
+        path = str(tmp_path / filename)
+        write_pdf(path, header, title, lines)
+        pdf_files.append({"filename": filename, "path": path, "content": b""})
+    
+    async def main():
+        mock_app = create_app(MockLLMConfig(latency_ms=0, seed=0))
+        http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_app))
+        pdf_extractor = PDFExtractor(ThreadPoolExecutor(max_workers=2))
+        orchestrator = ClaimOrchestrator(LLMClient(http_client), ResultCache(), pdf_extractor)
+        try:
+            return await orchestrator.process_claim(pdf_files), mock_app.state.stats
+        finally:
+            await http_client.aclose()
+            pdf_extractor.shutdown()
+    
+    result, stats = asyncio.run(main())
+    bill = next(doc for doc in result["documents"] if doc["document_type"] == "bill")
+    assert stats["truncated"] == 0
+    assert len(bill["extracted_data"]["items"]) == 60
+
+def test_truncated_response_keeps_completed_fields():
+    truncated = json.dumps({
+        "patient_name": "John Doe",
+        "total_amount": 250.0,
+        "items": [{"description": "Room charges", "amount": 250.0}]
+    })[:-30]
+    requests = []
+    
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": truncated}, "finish_reason": "length"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10}
+        })
+    
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            return await LLMClient(http_client).generate_json("Extract", schema=BillData, max_tokens=500)
+    
+    result = asyncio.run(main())
+    assert result["patient_name"] == "John Doe"
+    assert result["total_amount"] == 250.0
+    assert result["items"] == []
+    assert is_salvaged(result)
+    assert [request["max_tokens"] for request in requests] == [500, 1000]
+
+def test_salvaged_extraction_is_not_cached_and_goes_to_manual_review(monkeypatch):
+    monkeypatch.setattr(settings, "PIPELINE_MODE", "two_stage")
+    pdf_files = []
+    for name in ("sample_medical_bill.pdf", "sample_discharge_summary.pdf", "sample_insurance_id.pdf"):
+        with open(os.path.join(ROOT, name), "rb") as f:
+            pdf_files.append({"filename": name, "content": f.read()})
+    
+    async def main():
+        mock_app = create_app(MockLLMConfig(latency_ms=0, seed=0))
+        http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_app))
+        pdf_extractor = PDFExtractor(ThreadPoolExecutor(max_workers=2))
+        orchestrator = ClaimOrchestrator(LLMClient(http_client), ResultCache(), pdf_extractor)
+        orchestrator.agents[DocumentType.BILL] = TruncatedBillAgent(orchestrator.llm_client)
+        cached = []
+        cache_set = orchestrator.cache.set
+        
+        async def record_set(namespace, key, value):
+            cached.append((namespace, value))
+            await cache_set(namespace, key, value)
+        
+        orchestrator.cache.set = record_set
+        try:
+            return await orchestrator.process_claim(pdf_files), cached
+        finally:
+            await http_client.aclose()
+            pdf_extractor.shutdown()
+    
+    result, cached = asyncio.run(main())
+    bill = next(doc for doc in result["documents"] if doc["document_type"] == "bill")
+    assert is_salvaged(bill["extracted_data"])
+    assert not any(is_salvaged(value) for namespace, value in cached if namespace == "extraction")
+    assert len([namespace for namespace, _ in cached if namespace == "extraction"]) == 2
+    assert result["claim_decision"]["status"] == "manual_review"
+    assert "sample_medical_bill.pdf" in result["claim_decision"]["reason"]
@@ -0,0 +1,70 @@
+import asyncio
+import hashlib
+import httpx
+import pytest
+from starlette.requests import Request
+from config import settings
+from uploads import MEGABYTE, InvalidUploadError, MultipartSpooler, UploadTooLargeError
+
+def upload_request(files, data=None, chunk_size=64 * 1024):
+    encoded = httpx.Request("POST", "http://test/claims", files=files, data=data)
+    body = encoded.read()
+    chunks = [body[index:index + chunk_size] for index in range(0, len(body), chunk_size)]
+    received = []
+    
+    async def receive():
+        chunk = chunks[len(received)]
+        received.append(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": len(received) < len(chunks)}
+    
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(b"content-type", encoded.headers["content-type"].encode())]
+    }
+    return Request(scope, receive), received, len(chunks)
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_TMP_DIR", str(tmp_path))
+    return tmp_path
+
+def test_files_are_spooled_once_with_their_hash(spool_dir):
+    content = b"%PDF-1.4 " + b"x" * (3 * MEGABYTE)
+    request, _, _ = upload_request(
+        [("files", ("bill.pdf", content, "application/pdf")), ("files", ("id.pdf", b"%PDF id", "application/pdf"))],
+        {"webhook_url": "https://example.com/hook"}
+    )
+    
+    upload = asyncio.run(MultipartSpooler({"files": 10 * MEGABYTE}, ("files",)).parse(request))
+    
+    bill, card = upload.files["files"]
+    assert (bill["filename"], bill["size"]) == ("bill.pdf", len(content))
+    assert bill["sha256"] == hashlib.sha256(content).hexdigest()
+    assert open(bill["path"], "rb").read() == content
+    assert card["filename"] == "id.pdf"
+    assert upload.fields == {"webhook_url": ["https://example.com/hook"]}
+    assert sorted(path.name for path in spool_dir.iterdir()) == sorted(
+        spooled["path"].rsplit("/", 1)[1] for spooled in upload.files["files"]
+    )
+
+def test_oversized_file_is_rejected_before_the_body_is_received(spool_dir, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_REQUEST_SIZE_MB", 100)
+    request, received, chunks = upload_request([("files", ("scan.pdf", b"x" * (8 * MEGABYTE), "application/pdf"))])
+    
+    with pytest.raises(UploadTooLargeError, match="2 MB per-file upload limit"):
+        asyncio.run(MultipartSpooler({"files": 2 * MEGABYTE}, ("files",)).parse(request))
+    
+    assert len(received) < chunks / 2
+    assert list(spool_dir.iterdir()) == []
+
+def test_non_pdf_and_duplicate_names_are_rejected(spool_dir):
+    for files, message in (
+        ([("files", ("notes.txt", b"text", "text/plain"))], "not a PDF"),
+        ([("files", ("scan.pdf", b"one", "application/pdf")), ("files", ("scan.pdf", b"two", "application/pdf"))], "share")
+    ):
+        request, _, _ = upload_request(files)
+        with pytest.raises(InvalidUploadError, match=message):
+            asyncio.run(MultipartSpooler({"files": MEGABYTE}, ("files",)).parse(request))
+    
+    assert list(spool_dir.iterdir()) == []
@@ -0,0 +1,107 @@
+import re
+from collections import Counter
+from typing import List, Optional
+from config import settings
+from models import DocumentType
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+INLINE_WHITESPACE = re.compile(r"[ \t ]+")
+PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r"^this is a (computer|system)[- ]generated",
+        r"^(strictly )?(private (and|&) )?confidential$",
+        r"^(continued|contd\.?)( on next page)?\.?$",
+        r"^printed (on|by)\b",
+        r"^thank you for choosing\b"
+    ]
+]
+
+def estimate_tokens(text: str) -> int:
+    return sum(1 + (len(token) - 1) // 4 for token in TOKEN_PATTERN.findall(text))
+
+def normalize_page(page: str) -> List[str]:
+    lines = []
+    previous_blank = True
+    for raw_line in page.splitlines():
+        line = INLINE_WHITESPACE.sub(" ", raw_line).strip()
+        if not line:
+            if not previous_blank:
+                lines.append("")
+            previous_blank = True
+            continue
+        lines.append(line)
+        previous_blank = False
+    
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+def is_boilerplate(line: str) -> bool:
+    return bool(PAGE_NUMBER.match(line)) or any(pattern.search(line) for pattern in BOILERPLATE_PATTERNS)
+
+def find_repeated_lines(pages: List[List[str]], edge_lines: int = 3) -> set:
+    if len(pages) < 2:
+        return set()
+    
+    counts: Counter = Counter()
+    for lines in pages:
+        content = [line for line in lines if line]
+        counts.update(set(content[:edge_lines] + content[-edge_lines:]))
+    
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {line for line, count in counts.items() if count >= threshold}
+
+def compact_pages(pages: List[str]) -> str:
+    normalized = [normalize_page(page) for page in pages]
+    repeated = find_repeated_lines(normalized)
+    
+    seen_repeated = set()
+    output: List[str] = []
+    for lines in normalized:
+        for line in lines:
+            if line and is_boilerplate(line):
+                continue
+            if line in repeated:
+                if line in seen_repeated:
+                    continue
+                seen_repeated.add(line)
+            if not line and (not output or not output[-1]):
+                continue
+            output.append(line)
+        if output and output[-1]:
+            output.append("")
+    
+    return "\n".join(output).strip()
+
+def trim_to_budget(text: str, budget: Optional[int]) -> str:
+    if not budget or estimate_tokens(text) <= budget:
+        return text
+    
+    lines = text.splitlines()
+    line_tokens = [estimate_tokens(line) + 1 for line in lines]
+    head_budget = int(budget * settings.TEXT_HEAD_RATIO)
+    tail_budget = budget - head_budget
+    
+    head_end = 0
+    used = 0
+    while head_end < len(lines) and used + line_tokens[head_end] <= head_budget:
+        used += line_tokens[head_end]
+        head_end += 1
+    
+    tail_start = len(lines)
+    used = 0
+    while tail_start > head_end and used + line_tokens[tail_start - 1] <= tail_budget:
+        used += line_tokens[tail_start - 1]
+        tail_start -= 1
+    
+    omitted = tail_start - head_end
+    if head_end == 0 and tail_start == len(lines):
+        return text[:budget * 4]
+    
+    return "\n".join(lines[:head_end] + [f"[... {omitted} lines omitted ...]"] + lines[tail_start:])
+
+def token_budget(doc_type: Optional[DocumentType]) -> int:
+    if doc_type is None:
+        return settings.COMBINED_TOKEN_BUDGET
+    return settings.TEXT_TOKEN_BUDGETS.get(doc_type.value, settings.TEXT_TOKEN_BUDGETS.get("other", 0))
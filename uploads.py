@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
+from fastapi import Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from config import settings
+
+CHUNK_SIZE = 1024 * 1024
+MEGABYTE = 1024 * 1024
+MAX_FIELD_BYTES = 64 * 1024
+
+class UploadTooLargeError(Exception):
+    pass
+
+class InvalidUploadError(Exception):
+    pass
+
+def _open_spool_file():
+    return tempfile.NamedTemporaryFile(prefix="claim-", suffix=".upload", dir=settings.UPLOAD_TMP_DIR, delete=False)
+
+def remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def remove_files(pdf_files: List[Dict[str, Any]]) -> None:
+    for pdf_file in pdf_files:
+        if pdf_file.get("path"):
+            remove_file(pdf_file["path"])
+
+def duplicate_filenames(filenames: List[str]) -> List[str]:
+    seen = set()
+    duplicates = set()
+    for filename in filenames:
+        if filename in seen:
+            duplicates.add(filename)
+        seen.add(filename)
+    return sorted(duplicates)
+
+def spool_stream(stream: BinaryIO, filename: str, max_bytes: int, limit_description: str) -> Dict[str, Any]:
+    digest = hashlib.sha256()
+    size = 0
+    spool = _open_spool_file()
+    
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"File {filename} exceeds the {limit_description}")
+            
+            digest.update(chunk)
+            spool.write(chunk)
+        spool.close()
+    except BaseException:
+        spool.close()
+        remove_file(spool.name)
+        raise
+    
+    return {
+        "filename": filename,
+        "path": spool.name,
+        "sha256": digest.hexdigest(),
+        "size": size
+    }
+
+class MultipartSpooler:
+    def __init__(self, file_limits: Dict[str, int], pdf_fields: Iterable[str] = ()):
+        self.file_limits = file_limits
+        self.pdf_fields = set(pdf_fields)
+        self.request_limit = settings.MAX_REQUEST_SIZE_MB * MEGABYTE
+        self.received = 0
+        self.files: Dict[str, List[Dict[str, Any]]] = {}
+        self.fields: Dict[str, List[str]] = {}
+        self._header_name = b""
+        self._header_value = b""
+        self.on_part_begin()
+    
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+        self._field: Optional[str] = None
+        self._data = bytearray()
+        self._file: Optional[Dict[str, Any]] = None
+        self._spool: Optional[Any] = None
+        self._digest: Optional[Any] = None
+        self._skip = False
+    
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+    
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+    
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+    
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise InvalidUploadError('Form part is missing the Content-Disposition "name"')
+        self._field = options[b"name"].decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            return
+        
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        if self._field not in self.file_limits:
+            self._skip = True
+            return
+        if self._field in self.pdf_fields and not filename.endswith(".pdf"):
+            raise InvalidUploadError(f"File {filename} is not a PDF")
+        if any(spooled["filename"] == filename for spooled in self.files.get(self._field, [])):
+            raise InvalidUploadError(f"Files share a filename: {filename}")
+        
+        self._spool = _open_spool_file()
+        self._digest = hashlib.sha256()
+        self._file = {"filename": filename, "path": self._spool.name, "sha256": None, "size": 0}
+        self.files.setdefault(self._field, []).append(self._file)
+    
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        chunk = data[start:end]
+        if self._skip:
+            return
+        if self._spool is None:
+            if len(self._data) + len(chunk) > MAX_FIELD_BYTES:
+                raise InvalidUploadError(f"Form field {self._field} exceeds {MAX_FIELD_BYTES // 1024} KB")
+            self._data.extend(chunk)
+            return
+        
+        self._file["size"] += len(chunk)
+        self.received += len(chunk)
+        file_limit = self.file_limits[self._field]
+        if self.received > self.request_limit:
+            raise UploadTooLargeError(
+                f"File {self._file['filename']} exceeds the {settings.MAX_REQUEST_SIZE_MB} MB per-request upload limit"
+            )
+        if self._file["size"] > file_limit:
+            raise UploadTooLargeError(
+                f"File {self._file['filename']} exceeds the {file_limit // MEGABYTE} MB per-file upload limit"
+            )
+        self._digest.update(chunk)
+        self._spool.write(chunk)
+    
+    def on_part_end(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+            self._file["sha256"] = self._digest.hexdigest()
+        elif self._field is not None and not self._skip:
+            self.fields.setdefault(self._field, []).append(self._data.decode("utf-8", errors="replace"))
+        self.on_part_begin()
+    
+    async def parse(self, request: Request) -> "MultipartSpooler":
+        content_type, options = parse_options_header(request.headers.get("content-type"))
+        if content_type == b"application/x-www-form-urlencoded":
+            for field, value in (await request.form()).multi_items():
+                self.fields.setdefault(field, []).append(value)
+            return self
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            raise InvalidUploadError("Expected a multipart/form-data upload")
+        
+        parser = MultipartParser(options[b"boundary"], {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished
+        })
+        buffered: List[bytes] = []
+        buffered_size = 0
+        try:
+            async for chunk in request.stream():
+                buffered.append(chunk)
+                buffered_size += len(chunk)
+                if buffered_size >= CHUNK_SIZE:
+                    await asyncio.to_thread(parser.write, b"".join(buffered))
+                    buffered, buffered_size = [], 0
+            await asyncio.to_thread(parser.write, b"".join(buffered))
+            parser.finalize()
+            if self._spool is not None:
+                raise InvalidUploadError("Upload ended in the middle of a file")
+        except MultipartParseError as e:
+            self.remove()
+            raise InvalidUploadError(f"Malformed multipart upload: {e}")
+        except BaseException:
+            self.remove()
+            raise
+        return self
+    
+    def remove(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        for spooled in self.files.values():
+            remove_files(spooled)
@@ -1,17 +1,45 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 from models import Document, ValidationResult, DocumentType
+from claims_store import ClaimsStore, field_amount, field_text
+
+AMOUNT_TOLERANCE = 0.01
+
+def mismatch_record(kind: str, label: str, values: Iterable[str]) -> Dict[str, Any]:
+    return {
+        "type": f"{kind}_mismatch",
+        "description": f"{label} do not match across documents",
+        "values": list(values)
+    }
+
+def date_sequence_record(admission: Any, discharge: Any) -> Dict[str, Any]:
+    return {
+        "type": "date_sequence_error",
+        "description": "Admission date is after discharge date",
+        "admission_date": admission,
+        "discharge_date": discharge
+    }
+
+def amount_mismatch_record(total_bill: float, total_claimed: float) -> Dict[str, Any]:
+    return {
+        "type": "amount_mismatch",
+        "description": "Claimed amount does not match total bill amount",
+        "total_bill_amount": total_bill,
+        "total_claimed_amount": total_claimed
+    }
 
 class ClaimValidator:
-    def __init__(self):
+    def __init__(self, claims_store: Optional[ClaimsStore] = None):
+        self.claims_store = claims_store
         self.required_documents = [
             DocumentType.BILL,
             DocumentType.ID_CARD,
             DocumentType.DISCHARGE_SUMMARY
         ]
     
-    async def validate(self, documents: List[Document]) -> ValidationResult:
+    async def validate(self, documents: List[Document], claim_id: Optional[str] = None) -> ValidationResult:
         missing_docs = await self._check_missing_documents(documents)
         discrepancies = await self._check_discrepancies(documents)
+        discrepancies.extend(await self._check_duplicates(documents, claim_id))
         
         return ValidationResult(
             missing_documents=missing_docs,
@@ -19,8 +47,11 @@ class ClaimValidator:
         )
     
     async def _check_missing_documents(self, documents: List[Document]) -> List[str]:
+        return self.find_missing_documents(doc.document_type for doc in documents)
+    
+    def find_missing_documents(self, document_types: Iterable[DocumentType]) -> List[str]:
         missing = []
-        doc_types = {doc.document_type for doc in documents}
+        doc_types = set(document_types)
         
         for required_type in self.required_documents:
             if required_type not in doc_types:
@@ -29,23 +60,7 @@ class ClaimValidator:
         return missing
     
     async def _check_discrepancies(self, documents: List[Document]) -> List[Dict[str, Any]]:
-        discrepancies = []
-        
-        patient_names = self._extract_field(documents, "patient_name")
-        if len(set(patient_names)) > 1:
-            discrepancies.append({
-                "type": "name_mismatch",
-                "description": "Patient names do not match across documents",
-                "values": list(set(patient_names))
-            })
-        
-        patient_ids = self._extract_field(documents, "patient_id")
-        if len(set(patient_ids)) > 1:
-            discrepancies.append({
-                "type": "id_mismatch",
-                "description": "Patient IDs do not match across documents",
-                "values": list(set(patient_ids))
-            })
+        discrepancies = self.check_identity_fields(doc.extracted_data for doc in documents)
         
         dates = self._extract_dates(documents)
         date_issues = self._validate_date_sequence(dates)
@@ -58,13 +73,39 @@ class ClaimValidator:
         
         return discrepancies
     
-    def _extract_field(self, documents: List[Document], field: str) -> List[str]:
-        values = []
-        for doc in documents:
-            value = doc.extracted_data.get(field)
-            if value and value != "null" and value is not None:
-                values.append(str(value).strip().lower())
-        return [v for v in values if v]
+    async def _check_duplicates(self, documents: List[Document], claim_id: Optional[str]) -> List[Dict[str, Any]]:
+        if self.claims_store is None:
+            return []
+        
+        duplicates = await self.claims_store.find_duplicates(documents, claim_id)
+        return [
+            {
+                "type": "duplicate_claim",
+                "description": f"{field.replace('_', ' ').capitalize()} {value} was already claimed",
+                "field": field,
+                "value": value,
+                "claim_ids": claim_ids
+            }
+            for (field, value), claim_ids in duplicates.items()
+        ]
+    
+    def check_identity_fields(self, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        records = list(records)
+        discrepancies = []
+        
+        patient_names = self._collect_values(records, "patient_name")
+        if len(set(patient_names)) > 1:
+            discrepancies.append(mismatch_record("name", "Patient names", set(patient_names)))
+        
+        patient_ids = self._collect_values(records, "patient_id")
+        if len(set(patient_ids)) > 1:
+            discrepancies.append(mismatch_record("id", "Patient IDs", set(patient_ids)))
+        
+        return discrepancies
+    
+    def _collect_values(self, records: Iterable[Dict[str, Any]], field: str) -> List[str]:
+        values = (field_text(data.get(field)) for data in records)
+        return [value.strip().lower() for value in values if value is not None]
     
     def _extract_dates(self, documents: List[Document]) -> Dict[str, List[str]]:
         dates = {
@@ -78,18 +119,18 @@ class ClaimValidator:
             data = doc.extracted_data
             
             if doc.document_type == DocumentType.DISCHARGE_SUMMARY:
-                if data.get("admission_date"):
-                    dates["admission"].append(data["admission_date"])
-                if data.get("discharge_date"):
-                    dates["discharge"].append(data["discharge_date"])
+                if field_text(data.get("admission_date")) is not None:
+                    dates["admission"].append(field_text(data["admission_date"]))
+                if field_text(data.get("discharge_date")) is not None:
+                    dates["discharge"].append(field_text(data["discharge_date"]))
             
             elif doc.document_type == DocumentType.BILL:
-                if data.get("bill_date"):
-                    dates["bill"].append(data["bill_date"])
+                if field_text(data.get("bill_date")) is not None:
+                    dates["bill"].append(field_text(data["bill_date"]))
             
             elif doc.document_type == DocumentType.CLAIM_FORM:
-                if data.get("treatment_date"):
-                    dates["treatment"].append(data["treatment_date"])
+                if field_text(data.get("treatment_date")) is not None:
+                    dates["treatment"].append(field_text(data["treatment_date"]))
         
         return dates
     
@@ -101,12 +142,7 @@ class ClaimValidator:
             discharge = dates["discharge"][0]
             
             if admission > discharge:
-                issues.append({
-                    "type": "date_sequence_error",
-                    "description": "Admission date is after discharge date",
-                    "admission_date": admission,
-                    "discharge_date": discharge
-                })
+                issues.append(date_sequence_record(admission, discharge))
         
         return issues
     
@@ -120,23 +156,18 @@ class ClaimValidator:
             data = doc.extracted_data
             
             if doc.document_type == DocumentType.BILL:
-                if data.get("total_amount"):
-                    bill_amounts.append(float(data["total_amount"]))
+                if field_amount(data.get("total_amount")) is not None:
+                    bill_amounts.append(field_amount(data["total_amount"]))
             
             if doc.document_type == DocumentType.CLAIM_FORM:
-                if data.get("claimed_amount"):
-                    claimed_amounts.append(float(data["claimed_amount"]))
+                if field_amount(data.get("claimed_amount")) is not None:
+                    claimed_amounts.append(field_amount(data["claimed_amount"]))
         
         if bill_amounts and claimed_amounts:
             total_bill = sum(bill_amounts)
             total_claimed = sum(claimed_amounts)
             
-            if abs(total_bill - total_claimed) > 0.01:
-                issues.append({
-                    "type": "amount_mismatch",
-                    "description": "Claimed amount does not match total bill amount",
-                    "total_bill_amount": total_bill,
-                    "total_claimed_amount": total_claimed
-                })
+            if abs(total_bill - total_claimed) > AMOUNT_TOLERANCE:
+                issues.append(amount_mismatch_record(total_bill, total_claimed))
         
         return issues